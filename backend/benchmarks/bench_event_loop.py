@@ -0,0 +1,75 @@
+"""
+Event-loop responsiveness benchmark.
+
+Measures /topics latency on its own, then again while several /chat requests
+are in flight. With non-blocking handlers the two distributions should be
+roughly the same; a blocked event loop shows up as /topics latency jumping to
+the duration of a Groq completion.
+
+Usage (against a running server):
+    python benchmarks/bench_event_loop.py --base-url http://localhost:8000 --token <access_token>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+async def timed_get(client: httpx.AsyncClient, path: str) -> float:
+    start = time.perf_counter()
+    await client.get(path)
+    return (time.perf_counter() - start) * 1000
+
+async def probe_topics(client: httpx.AsyncClient, count: int, interval: float):
+    latencies = []
+    for _ in range(count):
+        latencies.append(await timed_get(client, "/topics"))
+        await asyncio.sleep(interval)
+    return latencies
+
+async def send_chat(client: httpx.AsyncClient, token: str, message: str):
+    start = time.perf_counter()
+    resp = await client.post(
+        "/chat",
+        json={"message": message},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    return resp.status_code, (time.perf_counter() - start) * 1000
+
+def summarize(label: str, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(f"{label:<28} n={len(latencies):<4} p50={statistics.median(latencies):8.1f} ms  p95={p95:8.1f} ms  max={latencies[-1]:8.1f} ms")
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120) as client:
+        baseline = await probe_topics(client, args.probes, args.interval)
+        summarize("/topics (idle)", baseline)
+
+        if not args.token:
+            print("No --token given; skipping the /chat load phase.")
+            return
+
+        chats = [
+            asyncio.create_task(send_chat(client, args.token, f"What does Article {21 + i} say?"))
+            for i in range(args.chats)
+        ]
+        # Give the chat requests a moment to reach the LLM call
+        await asyncio.sleep(0.2)
+        loaded = await probe_topics(client, args.probes, args.interval)
+        results = await asyncio.gather(*chats)
+
+        summarize(f"/topics ({args.chats} chats in flight)", loaded)
+        summarize("/chat", [ms for _, ms in results])
+        statuses = sorted({code for code, _ in results})
+        print(f"/chat status codes: {statuses}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that /chat load does not stall other routes")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", help="Access token used for /chat requests")
+    parser.add_argument("--chats", type=int, default=5, help="Concurrent /chat requests")
+    parser.add_argument("--probes", type=int, default=40, help="Number of /topics probes per phase")
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between /topics probes")
+    asyncio.run(main(parser.parse_args()))
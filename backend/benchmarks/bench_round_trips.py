@@ -0,0 +1,111 @@
+"""
+Mongo round-trip benchmark for list endpoints.
+
+Seeds N related rows, calls the inbox, appointment and admin-query handlers
+directly and counts the commands pymongo sends while each one runs. With
+batched user lookups the count stays flat as N grows; an N+1 loop shows up
+as a count that grows with N. (Cursor getMore batches still add one command
+per ~100 rows of the primary listing itself.)
+
+Writes tagged documents to the configured MONGO_URI database and removes them afterwards.
+
+Usage:
+    python benchmarks/bench_round_trips.py --sizes 10 100 1000
+"""
+import argparse
+import os
+import sys
+import uuid
+from datetime import datetime
+
+from pymongo import monitoring
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "buildInfo"}
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# Must be registered before database.py creates its MongoClient
+counter = CommandCounter()
+monitoring.register(counter)
+os.environ.setdefault("GROQ_API_KEY", "gsk_benchmark")  # main.py builds a Groq client at import
+
+from database import (  # noqa: E402
+    users_collection, lawyer_chat_collection, appointments_collection, queries_collection
+)
+from services.conversation_service import ConversationService  # noqa: E402
+import main  # noqa: E402
+
+def seed(tag: str, n: int):
+    people = users_collection.insert_many([
+        {"username": f"bench_{tag}_{i}", "email": f"bench_{tag}_{i}@example.com", "role": "lawyer", "bench_tag": tag}
+        for i in range(n)
+    ]).inserted_ids
+    me = str(users_collection.insert_one({"username": f"bench_{tag}_me", "email": f"bench_{tag}@example.com",
+                                          "role": "lawyer", "bench_tag": tag}).inserted_id)
+    now = datetime.utcnow()
+    lawyer_chat_collection.insert_many([
+        {"sender_id": str(p), "receiver_id": me, "message": "hi", "timestamp": now, "is_read": False, "bench_tag": tag}
+        for p in people
+    ])
+    for i, p in enumerate(people):
+        ConversationService.record_message({"user_id": str(p), "username": f"bench_{tag}_{i}", "role": "lawyer"}, me, "hi", now)
+    appointments_collection.insert_many(
+        [{"user_id": me, "lawyer_id": str(p), "date": "2030-01-01", "time_slot": "10:00", "status": "pending", "bench_tag": tag} for p in people] +
+        [{"user_id": str(p), "lawyer_id": me, "date": "2030-01-01", "time_slot": "11:00", "status": "pending", "bench_tag": tag} for p in people]
+    )
+    queries_collection.insert_many([
+        {"user_id": str(p), "subject": "bench", "message": "bench", "status": "pending", "created_at": now, "bench_tag": tag}
+        for p in people
+    ])
+    return {"user_id": me, "role": "lawyer", "username": f"bench_{tag}_me"}
+
+def cleanup(tag: str):
+    for user in users_collection.find({"bench_tag": tag}, {"_id": 1}):
+        ConversationService.remove_user(str(user["_id"]))
+    for collection in (users_collection, lawyer_chat_collection, appointments_collection, queries_collection):
+        collection.delete_many({"bench_tag": tag})
+
+def count_commands(func, *args) -> int:
+    counter.count = 0
+    func(*args)
+    return counter.count
+
+def main_bench(sizes):
+    endpoints = {
+        "GET /chat-inbox": main.get_chat_inbox,
+        "GET /appointments/user": main.get_user_appointments,
+        "GET /appointments/lawyer": main.get_lawyer_appointments,
+        "GET /admin/queries": main.admin_get_queries
+    }
+    print(f"{'endpoint':<28}" + "".join(f"{f'N={n}':>10}" for n in sizes))
+    results = {name: [] for name in endpoints}
+    for n in sizes:
+        tag = uuid.uuid4().hex[:8]
+        try:
+            current_user = seed(tag, n)
+            for name, handler in endpoints.items():
+                results[name].append(count_commands(handler, current_user))
+        finally:
+            cleanup(tag)
+    for name, counts in results.items():
+        print(f"{name:<28}" + "".join(f"{c:>10}" for c in counts))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count Mongo round trips per list endpoint")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000], help="Rows seeded per run")
+    args = parser.parse_args()
+    main_bench(args.sizes)
@@ -1,5 +1,5 @@
 from database import users_collection
-import bcrypt
+from services.password_hasher import PasswordHasher
 import sys
 
 def change_password(username, new_password):
@@ -10,7 +10,7 @@ def change_password(username, new_password):
         return
 
     # Hash new password
-    password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
+    password_hash = PasswordHasher.hash(new_password)
     
     # Update in database
     users_collection.update_one(
@@ -1,5 +1,5 @@
 from database import users_collection, User
-import bcrypt
+from services.password_hasher import PasswordHasher
 from datetime import datetime
 
 def create_admin():
@@ -13,8 +13,7 @@ def create_admin():
         return
 
     # Create admin user
-    # Using the constructor which hashes the password
-    admin_user = User(username, email, password, role="admin")
+    admin_user = User(username, email, PasswordHasher.hash(password), role="admin")
     
     admin_data = {
         "username": admin_user.username,
@@ -1,7 +1,6 @@
 from pymongo import MongoClient
 from datetime import datetime
 from typing import Optional, List, Dict
-import bcrypt
 
 import os
 from dotenv import load_dotenv
@@ -25,12 +24,16 @@ reviews_collection = db["reviews"]
 appointments_collection = db["appointments"]
 queries_collection = db["queries"]
 notifications_collection = db["notifications"]
+conversations_collection = db["conversations"]
+rate_limits_collection = db["rate_limits"]
+blobs_collection = db["blobs"]
 
 class User:
-    def __init__(self, username: str, email: str, password: str, role: str = "user", phone: str = None, address: str = None, city: str = None, lawyer_id_proof: str = None, lawyer_proof_file: str = None, consultation_fee: float = 0.0, specialization: str = None, years_of_experience: int = 0):
+    # password_hash comes from PasswordHasher so the bcrypt work runs in its pool, not here
+    def __init__(self, username: str, email: str, password_hash: bytes, role: str = "user", phone: str = None, address: str = None, city: str = None, lawyer_id_proof: str = None, lawyer_proof_file: str = None, consultation_fee: float = 0.0, specialization: str = None, years_of_experience: int = 0):
         self.username = username
         self.email = email
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        self.password_hash = password_hash
         self.role = role # user, lawyer, admin
         self.phone = phone
         self.address = address
@@ -0,0 +1,205 @@
+"""
+Index migrations for every collection in database.py.
+
+apply_indexes() is idempotent and runs at startup, where it only creates indexes.
+`python db_indexes.py` also rebuilds changed and drops obsolete ones (run it once per
+deploy, e.g. as Render's preDeployCommand). `python db_indexes.py --check`
+explains each hot query against the live database and exits non-zero if any of
+them would fall back to a collection scan or an in-memory sort.
+"""
+import sys
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from database import db
+
+INDEXES = {
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("role", ASCENDING), ("_id", DESCENDING)], name="role_id"),
+        # /lawyers: equality fields, then the sort key, then the _id tie-breaker; one index per sort.
+        # city_key and specialization are optional filters, so each has its own index for the default sort.
+        IndexModel(
+            [("is_verified", ASCENDING), ("avg_rating", DESCENDING), ("_id", ASCENDING)],
+            name="lawyer_by_rating", partialFilterExpression={"role": "lawyer"}
+        ),
+        IndexModel(
+            [("is_verified", ASCENDING), ("consultation_fee", ASCENDING), ("_id", ASCENDING)],
+            name="lawyer_by_fee", partialFilterExpression={"role": "lawyer"}
+        ),
+        IndexModel(
+            [("is_verified", ASCENDING), ("years_of_experience", DESCENDING), ("_id", ASCENDING)],
+            name="lawyer_by_experience", partialFilterExpression={"role": "lawyer"}
+        ),
+        IndexModel(
+            [("is_verified", ASCENDING), ("city_key", ASCENDING), ("avg_rating", DESCENDING), ("_id", ASCENDING)],
+            name="lawyer_city", partialFilterExpression={"role": "lawyer"}
+        ),
+        IndexModel(
+            [("is_verified", ASCENDING), ("specialization", ASCENDING), ("avg_rating", DESCENDING), ("_id", ASCENDING)],
+            name="lawyer_specialization", partialFilterExpression={"role": "lawyer"}
+        )
+    ],
+    "chats": [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="user_timestamp")
+    ],
+    "lawyer_chats": [
+        IndexModel([("sender_id", ASCENDING), ("receiver_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)], name="sender_receiver_timestamp"),
+        IndexModel([("receiver_id", ASCENDING), ("is_read", ASCENDING)], name="receiver_unread")
+    ],
+    "refresh_tokens": [
+        IndexModel([("token", ASCENDING)], name="token_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+    ],
+    "reset_tokens": [
+        IndexModel([("token_hash", ASCENDING)], name="token_hash_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("used", ASCENDING)], name="user_used"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+    ],
+    "reviews": [
+        IndexModel([("lawyer_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="lawyer_created_at")
+    ],
+    "appointments": [
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)], name="user_date"),
+        IndexModel([("lawyer_id", ASCENDING), ("date", ASCENDING)], name="lawyer_date")
+    ],
+    "queries": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at")
+    ],
+    "notifications": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created_at")
+    ],
+    "topics": [
+        IndexModel([("title", ASCENDING)], name="title")
+    ],
+    "conversations": [
+        IndexModel([("participants", ASCENDING), ("timestamp", DESCENDING)], name="participants_timestamp")
+    ],
+    # Only used with RATE_LIMIT_BACKEND=mongo; counters are looked up by _id
+    "rate_limits": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+    ]
+}
+
+# Indexes replaced by the ones above; dropped if still present
+OBSOLETE_INDEXES = {
+    "users": ["lawyer_directory"]
+}
+
+INDEX_CONFLICT_CODES = {85, 86}  # IndexOptionsConflict, IndexKeySpecsConflict
+
+SAMPLE_ID = "000000000000000000000000"
+
+# (collection, filter, sort) for every query on a request path
+HOT_QUERIES = [
+    ("users", {"username": "admin"}, None),
+    ("users", {"$or": [{"username": "admin"}, {"email": "admin"}]}, None),
+    ("users", {"role": "lawyer"}, [("_id", -1)]),
+    ("users", {"role": "lawyer", "is_verified": True}, [("avg_rating", -1), ("_id", 1)]),
+    ("users", {"role": "lawyer", "is_verified": True}, [("consultation_fee", 1), ("_id", 1)]),
+    ("users", {"role": "lawyer", "is_verified": True}, [("years_of_experience", -1), ("_id", 1)]),
+    ("users", {"role": "lawyer", "is_verified": True, "city_key": "pune"}, [("avg_rating", -1), ("_id", 1)]),
+    ("users", {"role": "lawyer", "is_verified": True, "specialization": "Criminal"}, [("avg_rating", -1), ("_id", 1)]),
+    ("chats", {"user_id": SAMPLE_ID}, [("timestamp", -1), ("_id", -1)]),
+    ("lawyer_chats", {"$or": [
+        {"sender_id": SAMPLE_ID, "receiver_id": SAMPLE_ID},
+        {"sender_id": SAMPLE_ID, "receiver_id": SAMPLE_ID}
+    ]}, [("timestamp", -1), ("_id", -1)]),
+    ("lawyer_chats", {"sender_id": SAMPLE_ID, "receiver_id": SAMPLE_ID, "is_read": False}, None),
+    ("refresh_tokens", {"token": "token"}, None),
+    ("reset_tokens", {"token_hash": "hash", "used": False, "expires_at": {"$gt": datetime.utcnow()}}, None),
+    ("reset_tokens", {"user_id": SAMPLE_ID, "used": False}, None),
+    ("reviews", {"lawyer_id": SAMPLE_ID}, [("created_at", -1), ("_id", -1)]),
+    ("appointments", {"user_id": SAMPLE_ID}, [("date", 1)]),
+    ("appointments", {"lawyer_id": SAMPLE_ID}, [("date", 1)]),
+    ("queries", {}, [("created_at", -1), ("_id", -1)]),
+    ("notifications", {"user_id": SAMPLE_ID}, [("created_at", -1)]),
+    ("topics", {}, [("title", 1)]),
+    ("conversations", {"participants": SAMPLE_ID}, [("timestamp", -1)])
+]
+
+def apply_indexes(migrate: bool = False) -> dict:
+    """
+    Create every declared index. Existing identical indexes are a no-op; conflicts are reported, not fatal.
+
+    Startup calls this with migrate=False: every worker may run it at once, and concurrent
+    creates of the same index are safe, but drops are not (they race and leave the
+    collection unindexed mid-deploy). Rebuilding changed indexes and dropping obsolete
+    ones happens only with migrate=True, i.e. `python db_indexes.py` run once per deploy.
+    """
+    created, failed = 0, []
+    for collection_name, models in INDEXES.items():
+        for model in models:
+            name = model.document["name"]
+            try:
+                try:
+                    db[collection_name].create_indexes([model])
+                except OperationFailure as e:
+                    if e.code not in INDEX_CONFLICT_CODES or not migrate:
+                        raise
+                    # The declaration changed since the index was built: rebuild it under the same name
+                    print(f"Rebuilding index {collection_name}.{name} with its new definition")
+                    db[collection_name].drop_index(name)
+                    db[collection_name].create_indexes([model])
+                created += 1
+            except OperationFailure as e:
+                # e.g. duplicate usernames blocking a unique index, or an older index with the same name
+                failed.append(f"{collection_name}.{name}: {e}")
+                hint = " (run `python db_indexes.py` to migrate it)" if e.code in INDEX_CONFLICT_CODES else ""
+                print(f"WARN: Could not apply index {collection_name}.{name}{hint}: {e}")
+    if migrate:
+        for collection_name, names in OBSOLETE_INDEXES.items():
+            existing = db[collection_name].index_information()
+            for name in names:
+                if name in existing:
+                    print(f"Dropping obsolete index {collection_name}.{name}")
+                    db[collection_name].drop_index(name)
+    print(f"Indexes applied: {created} ok, {len(failed)} failed")
+    return {"success": not failed, "applied": created, "failed": failed}
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+def check_query_plans() -> list:
+    """
+    Explain every HOT_QUERIES entry; returns descriptions of the ones whose winning plan
+    is a COLLSCAN, or sorts in memory (a SORT stage) when the query has a sort.
+    """
+    offenders = []
+    for collection_name, query, sort in HOT_QUERIES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning = cursor.explain()["queryPlanner"]["winningPlan"]
+        stages = set(_plan_stages(winning))
+        if "COLLSCAN" in stages:
+            status = "COLLSCAN"
+        elif sort and "SORT" in stages:
+            status = "SORT"
+        else:
+            status = "ok"
+        print(f"{status:>8}  {collection_name} {query} sort={sort}")
+        if status != "ok":
+            offenders.append(f"{collection_name} {query} sort={sort}: {status}")
+    return offenders
+
+def main(argv: list) -> int:
+    # Usage: python db_indexes.py [--check]
+    apply_indexes(migrate=True)
+    if "--check" in argv:
+        offenders = check_query_plans()
+        if offenders:
+            print(f"FAILED: {len(offenders)} hot queries use a collection scan or an in-memory sort")
+            return 1
+        print("All hot queries are index-backed.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,74 +1,262 @@
 import os
 import sys
+import json
+import time
 import argparse
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Tuple
 
 # Add current directory to path so we can import services
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from langchain_community.document_loaders import PyPDFLoader
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from pypdf import PdfReader
     from services.rag_service import RAGService
+    from services.constitution_index import ConstitutionIndex
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError as e:
     print(f"FAILED: Missing dependencies: {e}")
-    print("Please run: pip install chromadb langchain langchain-community pypdf")
+    print("Please run: pip install chromadb langchain-text-splitters pypdf")
     sys.exit(1)
 
-def ingest_pdfs(pdf_paths: List[str]):
+DATA_DIR = os.getenv("DATA_DIR", ".")
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "ingest_checkpoint.json")
+
+# ---------------------------------------------------------------------------
+# Stage 1: page extraction (runs in worker processes)
+# ---------------------------------------------------------------------------
+def extract_pages(path: str, page_numbers: List[int]) -> List[Tuple[int, str]]:
+    reader = PdfReader(path)
+    return [(n, reader.pages[n].extract_text() or "") for n in page_numbers]
+
+# ---------------------------------------------------------------------------
+# Checkpointing
+# ---------------------------------------------------------------------------
+def load_checkpoint() -> Dict:
+    if not os.path.exists(CHECKPOINT_PATH):
+        return {}
+    try:
+        with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"WARN: Ignoring unreadable checkpoint {CHECKPOINT_PATH}: {e}")
+        return {}
+
+def save_checkpoint(checkpoint: Dict):
+    # Write-then-rename so a crash mid-write never corrupts the checkpoint
+    tmp_path = CHECKPOINT_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+def file_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+# ---------------------------------------------------------------------------
+# Stages 2-4: chunk -> embed -> upsert
+# ---------------------------------------------------------------------------
+def chunk_pages(source: str, pages: List[Tuple[int, str]]) -> List[Dict]:
+    return RAGService.build_chunks([
+        {"content": text, "metadata": {"source": source, "page": page_no}}
+        for page_no, text in pages
+    ])
+
+class EmbedQueue:
+    """
+    Packs chunks from any number of extraction results into full batch_size batches and
+    keeps up to max_in_flight embedding calls running, so an 8-page task (fewer chunks
+    than one batch) no longer means one small, serial embedding call.
+    Upserts stay on the calling thread, in submission order. on_pages_done(pages) fires
+    once every chunk of those pages is stored, which is when the checkpoint may record them.
+    """
+
+    def __init__(self, embed_pool: ThreadPoolExecutor, batch_size: int, max_in_flight: int, on_pages_done):
+        self.embed_pool = embed_pool
+        self.batch_size = batch_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.on_pages_done = on_pages_done
+        self.buffer: List[Dict] = []
+        self.in_flight = deque()  # (batch, future)
+        self.markers = deque()  # (chunks queued when the pages were added, pages)
+        self.queued = 0
+        self.upserted = 0
+
+    def add(self, chunks: List[Dict], pages: List[int]):
+        self.buffer.extend(chunks)
+        self.queued += len(chunks)
+        self.markers.append((self.queued, pages))
+        while len(self.buffer) >= self.batch_size:
+            self._submit(self.buffer[:self.batch_size])
+            del self.buffer[:self.batch_size]
+        # Collect whatever already finished without waiting on the rest
+        while self.in_flight and self.in_flight[0][1].done():
+            self._complete_oldest()
+        self._commit_pages()
+
+    def flush(self):
+        if self.buffer:
+            self._submit(self.buffer)
+            self.buffer = []
+        while self.in_flight:
+            self._complete_oldest()
+        self._commit_pages()
+
+    def _submit(self, batch: List[Dict]):
+        if len(self.in_flight) >= self.max_in_flight:
+            self._complete_oldest()
+        self.in_flight.append((batch, self.embed_pool.submit(RAGService.embed_documents, [c["text"] for c in batch])))
+
+    def _complete_oldest(self):
+        batch, future = self.in_flight.popleft()
+        RAGService.upsert_chunks(
+            ids=[c["id"] for c in batch],
+            texts=[c["text"] for c in batch],
+            metadatas=[c["metadata"] for c in batch],
+            embeddings=future.result()
+        )
+        self.upserted += len(batch)
+
+    def _commit_pages(self):
+        while self.markers and self.markers[0][0] <= self.upserted:
+            self.on_pages_done(self.markers.popleft()[1])
+
+class Progress:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.pages = 0
+        self.chunks = 0
+        self.embedded = 0
+
+    def report(self, label: str):
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        print(f"{label}: {self.pages} pages ({self.pages / elapsed:.1f} pages/s), "
+              f"{self.chunks} chunks ({self.chunks / elapsed:.1f} chunks/s, {self.embedded} embedded) in {elapsed:.1f}s")
+
+def ingest_pdf(path: str, checkpoint: Dict, progress: Progress, workers: int, embed_concurrency: int,
+               batch_size: int, pages_per_task: int, incremental: bool = False):
+    source = os.path.basename(path)
+    total_pages = len(PdfReader(path).pages)
+
+    state = checkpoint.get(source)
+    if not state or state.get("fingerprint") != file_fingerprint(path):
+        if state:
+            # The PDF changed since the last run: diff every page so stale chunks get removed
+            print(f"{source} changed since the last run; switching to incremental re-index.")
+            incremental = True
+        state = {"fingerprint": file_fingerprint(path), "pages_done": []}
+        checkpoint[source] = state
+    if state.get("incremental_pending"):
+        # A previous incremental run died before deleting stale chunks; run it again in full
+        print(f"Resuming the unfinished incremental re-index of {source}.")
+        incremental = True
+    if incremental:
+        # Stale detection needs every page's chunk IDs, so incremental runs always cover all pages.
+        # The flag stays set until the stale chunks are gone, so a crash cannot skip that step.
+        state["pages_done"] = []
+        state["incremental_pending"] = True
+        save_checkpoint(checkpoint)
+    done = set(state["pages_done"])
+    pending = [n for n in range(total_pages) if n not in done]
+
+    if not pending:
+        print(f"SKIP: {source} already fully ingested ({total_pages} pages).")
+        return
+    print(f"Ingesting {source}: {len(pending)}/{total_pages} pages remaining...")
+
+    # Content-hash IDs let us skip chunks that are already stored without embedding them again
+    existing = RAGService.get_existing_ids(source=source)
+    seen = set()
+
+    def pages_done(pages: List[int]):
+        state["pages_done"].extend(pages)
+        save_checkpoint(checkpoint)
+        progress.pages += len(pages)
+
+    tasks = [pending[i:i + pages_per_task] for i in range(0, len(pending), pages_per_task)]
+    with ProcessPoolExecutor(max_workers=workers) as extract_pool, \
+         ThreadPoolExecutor(max_workers=embed_concurrency) as embed_pool:
+        embed_queue = EmbedQueue(embed_pool, batch_size, embed_concurrency, pages_done)
+        in_flight = set()
+        task_iter = iter(tasks)
+        while True:
+            # Keep a bounded number of extraction tasks in flight to cap memory
+            while len(in_flight) < workers * 2:
+                page_numbers = next(task_iter, None)
+                if page_numbers is None:
+                    break
+                in_flight.add(extract_pool.submit(extract_pages, path, page_numbers))
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pages = future.result()
+                chunks = chunk_pages(source, pages)
+                seen.update(c["id"] for c in chunks)
+                new_chunks = [c for c in chunks if c["id"] not in existing]
+                embed_queue.add(new_chunks, [n for n, _ in pages])
+                progress.chunks += len(chunks)
+                progress.embedded += len(new_chunks)
+            progress.report(f"   - {source}")
+        embed_queue.flush()
+
+    if incremental:
+        stale = sorted(existing - seen)
+        RAGService.delete_chunks(stale)
+        print(f"Removed {len(stale)} stale chunks from {source}")
+        state.pop("incremental_pending", None)
+        save_checkpoint(checkpoint)
+
+    print(f"Finished indexing {source}")
+
+def ingest_pdfs(pdf_paths: List[str], workers: int = 2, embed_concurrency: int = 4, batch_size: int = 64,
+                pages_per_task: int = 8, reset: bool = False, incremental: bool = False):
     print(f"--- Starting ingestion for {len(pdf_paths)} files ---")
-    
-    all_docs = []
-    
+
+    if not RAGService.get_collection():
+        print("ERROR: Vector database is not available (check EMBEDDING_MODE / OPENAI_API_KEY).")
+        return
+
+    checkpoint = {} if reset else load_checkpoint()
+    progress = Progress()
+
     for path in pdf_paths:
         if not os.path.exists(path):
             print(f"WARN: File not found at {path}")
             continue
-            
-        print(f"Loading {os.path.basename(path)}...")
         try:
-            loader = PyPDFLoader(path)
-            # metadata will automatically include the source path
-            docs = loader.load()
-            print(f"LOADED: {len(docs)} pages from {os.path.basename(path)}")
-            
-            # Simple manual formatting to include file info in content if needed
-            for doc in docs:
-                all_docs.append({
-                    "content": doc.page_content,
-                    "metadata": {
-                        "source": os.path.basename(path),
-                        "page": doc.metadata.get("page", 0)
-                    }
-                })
+            ingest_pdf(path, checkpoint, progress, workers, embed_concurrency, batch_size, pages_per_task, incremental)
         except Exception as e:
-            print(f"ERROR: Failed to load {path}: {e}")
-
-    if not all_docs:
-        print("Empty document list. Nothing to index.")
-        return
+            print(f"ERROR: Failed to ingest {path}: {e}")
+            print("Progress is checkpointed; re-run the same command to resume.")
 
-    print(f"Adding {len(all_docs)} sections to ChromaDB (this may take a few minutes)...")
-    try:
-        # RAGService.add_documents handles splitting and adding
-        RAGService.add_documents(all_docs)
-        print("SUCCESS: Ingestion complete! RAG is now ready with PDF data.")
-    except Exception as e:
-        print(f"ERROR: Failed to add documents to ChromaDB: {e}")
+    progress.report("DONE: Ingestion finished")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ingest Constitution PDFs into ChromaDB")
     parser.add_argument("--langs", nargs="+", default=["eng", "hindi"], help="Languages to ingest (eng, hindi)")
+    parser.add_argument("--workers", type=int, default=max(1, min(4, (os.cpu_count() or 1))), help="Processes used for page extraction")
+    parser.add_argument("--embed-concurrency", type=int, default=4, help="Concurrent embedding requests")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per embedding/upsert batch")
+    parser.add_argument("--pages-per-task", type=int, default=8, help="Pages handed to a worker at a time")
+    parser.add_argument("--reset", action="store_true", help="Ignore the checkpoint and re-ingest every page")
+    parser.add_argument("--incremental", action="store_true", help="Diff every page against the stored chunks: embed only changed chunks and delete stale ones")
+    parser.add_argument("--skip-structure", action="store_true", help="Do not rebuild the Part/Article structure index")
     args = parser.parse_args()
 
     base_path = os.path.join(os.path.dirname(__file__), "constitution_db")
     target_pdfs = []
-    
+
     if "eng" in args.langs:
         target_pdfs.append(os.path.join(base_path, "constitution_eng.pdf"))
     if "hindi" in args.langs:
         target_pdfs.append(os.path.join(base_path, "constitution_hindi.pdf"))
 
-    ingest_pdfs(target_pdfs)
+    if not args.skip_structure and "eng" in args.langs:
+        # Article/Part lookup table used for direct "Article 21"-style questions
+        ConstitutionIndex.build(os.path.join(base_path, "constitution_eng.pdf"))
+
+    ingest_pdfs(target_pdfs, args.workers, args.embed_concurrency, args.batch_size, args.pages_per_task, args.reset, args.incremental)
@@ -1,23 +1,44 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, File, UploadFile, Form
+from fastapi import FastAPI, HTTPException, Depends, Request, File, UploadFile, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional
 import openai
-from groq import Groq
+from groq import AsyncGroq
 from dotenv import load_dotenv
 import os
+import json
 import time
-from collections import defaultdict
+import asyncio
 import threading
 from services.auth_service import AuthService
 from services.chat_service import ChatService
 from services.topics_service import TopicsService
 from services.rag_service import RAGService
+from services.lexical_index import LexicalIndex
+from services.constitution_index import ConstitutionIndex
+from services.embedding_service import EmbeddingService
 from services.speech_service import SpeechService
-from services.gcs_service import GCSService
+from services.text_to_speech import TTSCache
+from services.speech_stream import (
+    transcribe_stream, limit_stream, TranscriptionSession, AudioFormatError, StreamTooLargeError, STT_MAX_STREAM_MB
+)
+from services.blob_store import BlobStore
+from services.executor import run_blocking, configure_threadpool
+from services.answer_cache import AnswerCache, ANSWER_CACHE_SEMANTIC
+from services.lawyer_stats import LawyerStatsService, normalize_city
+from db_indexes import apply_indexes
+from services.user_loader import UserLoader
+from services.conversation_service import ConversationService
+from services.pagination import keyset_page, DEFAULT_PAGE_SIZE
+from services.realtime import RealtimeService
+from services.context_assembler import assemble_context, count_tokens, ChatUsage
+from services.rate_limiter import RateLimiter, rate_limit, client_ip
+from services.user_cache import UserCache
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+from services.translate import TranslationService
 
 load_dotenv()
 
@@ -52,31 +73,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Simple Rate Limiting Middleware
-user_requests = defaultdict(list)
+# Global per-IP rate limit; stricter per-route limits are declared with Depends(rate_limit(...))
 RATE_LIMIT = 60 # requests
 TIME_WINDOW = 60 # seconds
+RATE_LIMIT_EXEMPT_PATHS = {"/health", "/"}
+global_rate_limiter = RateLimiter("global", RATE_LIMIT, TIME_WINDOW)
 
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
-    client_ip = request.client.host if request.client else "unknown"
-    now = time.time()
-    
-    # Filter out requests older than the time window
-    user_requests[client_ip] = [t for t in user_requests[client_ip] if now - t < TIME_WINDOW]
-    
-    if len(user_requests[client_ip]) >= RATE_LIMIT:
+    if request.url.path in RATE_LIMIT_EXEMPT_PATHS:
+        return await call_next(request)
+
+    allowed, retry_after = await run_blocking(global_rate_limiter.hit, client_ip(request))
+    if not allowed:
         return JSONResponse(
             status_code=429, 
-            content={"detail": "Too many requests. Please try again later."}
+            content={"detail": "Too many requests. Please try again later."},
+            headers={"Retry-After": str(retry_after)}
         )
-    
-    # Exempt health check and root routes from rate limiting
-    if request.url.path in ["/health", "/"]:
-        return await call_next(request)
 
     try:
-        user_requests[client_ip].append(now)
         return await call_next(request)
     except Exception as e:
         print(f"Middleware Error: {str(e)}")
@@ -93,6 +109,14 @@ async def openai_rate_limit_handler(request: Request, exc: openai.RateLimitError
         content={"detail": "OpenAI API Quota Exceeded. Please check your billing/plan."}
     )
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "The server is busy. Please try again in a few seconds."},
+        headers={"Retry-After": "5"}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     print(f"Global Error: {str(exc)}")
@@ -101,7 +125,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": f"An unexpected error occurred: {str(exc)}"}
     )
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
 security = HTTPBearer()
 
 # Initialize default topics on startup
@@ -116,7 +140,14 @@ async def startup_event():
     if not openai_key or "sk-" not in openai_key:
         print("\nWARNING: OPENAI_API_KEY is missing or invalid in backend/.env")
 
-    TopicsService.initialize_default_topics()
+    configure_threadpool()
+    await RealtimeService.start()
+    await run_blocking(apply_indexes)
+    await run_blocking(TopicsService.initialize_default_topics)
+    await run_blocking(LexicalIndex.build_topics)
+    await run_blocking(LawyerStatsService.backfill_missing)
+    await run_blocking(LawyerStatsService.backfill_city_keys)
+    await run_blocking(ConversationService.backfill_missing)
     
     # Initialize RAG in a separate thread to prevent blocking server startup
     def run_rag_init():
@@ -124,6 +155,9 @@ async def startup_event():
             # Wait a bit for the server to stabilize and pass health checks
             print("Waiting 10s for server stabilization before RAG init...")
             time.sleep(10)
+
+            ConstitutionIndex.load()
+            LexicalIndex.build_pdfs()
             
             if os.getenv("SKIP_RAG_AUTO_INGEST", "false").lower() == "true":
                 print("RAG Auto-Ingest is DISABLED via environment variable.")
@@ -135,6 +169,12 @@ async def startup_event():
             print(f"RAG Initialization failed: {str(e)}")
 
     threading.Thread(target=run_rag_init, daemon=True).start()
+    # Hindi replies then only pay for translating the answer itself
+    threading.Thread(target=TranslationService.pretranslate, args=([LEGAL_DISCLAIMER], ["hi"]), daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await RealtimeService.stop()
 
 # Pydantic Models
 class ChatRequest(BaseModel):
@@ -206,26 +246,17 @@ class UserQueryRequest(BaseModel):
     subject: str
     message: str
 
-# Dependency to verify JWT token
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    from database import users_collection
-    from bson import ObjectId
-    
+# Dependency to verify JWT token (sync: FastAPI resolves it in the threadpool since a cache miss hits Mongo)
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     payload = AuthService.verify_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
         
-    # Fetch fresh user data to ensure profile changes are reflected
-    user = users_collection.find_one({"_id": ObjectId(payload["user_id"])})
-    if user:
-        payload["city"] = user.get("city")
-        payload["phone"] = user.get("phone")
-        payload["address"] = user.get("address")
-        payload["consultation_fee"] = user.get("consultation_fee")
-        payload["specialization"] = user.get("specialization")
-        payload["years_of_experience"] = user.get("years_of_experience")
-        payload["is_verified"] = user.get("is_verified", False)
+    # Current profile fields, so profile changes are reflected without a new token
+    profile = UserCache.get_profile(payload["user_id"])
+    if profile:
+        payload.update(profile)
         
     return payload
 
@@ -245,6 +276,7 @@ async def check_admin(current_user: dict = Depends(get_current_user)):
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
+
 # Authentication endpoints
 @app.post("/register")
 async def register(
@@ -272,31 +304,37 @@ async def register(
     # Handle file upload if lawyer
     proof_filename = None
     if role == "lawyer" and lawyer_proof_file:
-        file_bytes = await lawyer_proof_file.read()
-        try:
-            public_url = GCSService.upload_file(file_bytes, lawyer_proof_file.filename, lawyer_proof_file.content_type)
-            proof_filename = public_url
-        except Exception as e:
-            print(f"\nExecuting local upload fallback! GCS Upload Failed. Quick Reason: {e}")
-            # Fallback to local if GCS not configured properly yet
-            filename = f"{int(time.time())}_{lawyer_proof_file.filename}"
-            local_path = os.path.join(UPLOADS_DIR, "lawyer_proofs", filename)
-            with open(local_path, "wb") as f:
-                f.write(file_bytes)
-            proof_filename = f"lawyer_proofs/{filename}"
-
-    result = AuthService.register_user(
-        username, email, password, 
-        role, phone, address, city,
-        lawyer_id_proof, proof_filename,
-        consultation_fee, specialization,
-        years_of_experience
-    )
-    if not result["success"]:
+        stored = await BlobStore.put_async(
+            lawyer_proof_file.file, lawyer_proof_file.filename, lawyer_proof_file.content_type
+        )
+        # Local blobs are stored relative to /uploads, like the old lawyer_proofs/ paths
+        proof_filename = stored["url"] if stored["url"].startswith("http") else stored["key"]
+
+    registered = False
+    try:
+        result = await run_blocking(
+            AuthService.register_user,
+            username, email, password, 
+            role, phone, address, city,
+            lawyer_id_proof, proof_filename,
+            consultation_fee, specialization,
+            years_of_experience
+        )
+        registered = result["success"]
+    finally:
+        if proof_filename and not registered:
+            # Rejected, shed (PasswordHasherBusy) or failed: no user holds this proof,
+            # so drop the reference put() took for it
+            await run_blocking(BlobStore.release, proof_filename)
+    if not registered:
         raise HTTPException(status_code=400, detail=result["message"])
     return result
 
-@app.post("/login")
+LOGIN_LIMIT = 10 # attempts per IP
+LOGIN_WINDOW = 60 # seconds
+
+@app.post("/login", dependencies=[Depends(rate_limit("login", LOGIN_LIMIT, LOGIN_WINDOW,
+                                                     detail="Too many login attempts. Please try again later."))])
 def login(req: LoginRequest):
     result = AuthService.login_user(req.username, req.password)
     if not result["success"]:
@@ -310,22 +348,19 @@ def refresh(req: RefreshRequest):
         raise HTTPException(status_code=401, detail=result["message"])
     return result
 
-forgot_rate_limits = defaultdict(list)
 FORGOT_LIMIT = 5
 FORGOT_WINDOW = 3600 # 1 hour
+forgot_rate_limiter = RateLimiter("forgot_password", FORGOT_LIMIT, FORGOT_WINDOW,
+                                  detail="Too many reset requests. Please try again later.")
 
 @app.post("/forgot-password")
-async def forgot_password(req: ForgotPasswordRequest):
+def forgot_password(req: ForgotPasswordRequest):
     from database import users_collection
     from services.email_service import send_reset_email
     
     email_query = req.email.lower().strip()
-    now = time.time()
-    
-    forgot_rate_limits[email_query] = [t for t in forgot_rate_limits.get(email_query, []) if now - t < FORGOT_WINDOW]
-    if len(forgot_rate_limits.get(email_query, [])) >= FORGOT_LIMIT:
-        raise HTTPException(status_code=429, detail="Too many reset requests. Please try again later.")
-    forgot_rate_limits[email_query].append(now)
+    # Keyed by the request body, so checked here rather than through a route dependency
+    forgot_rate_limiter.check(email_query)
     
     # Case-insensitive lookup for the user
     user = users_collection.find_one({"email": {"$regex": f"^{req.email}$", "$options": "i"}})
@@ -344,10 +379,9 @@ async def forgot_password(req: ForgotPasswordRequest):
     return {"success": True, "message": "If that email is registered, a reset link has been sent."}
 
 @app.post("/reset-password")
-async def reset_password(req: ResetPasswordRequest):
+def reset_password(req: ResetPasswordRequest):
     from database import users_collection
     from bson import ObjectId
-    import bcrypt
     
     if len(req.new_password) < 8:
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters long")
@@ -360,14 +394,15 @@ async def reset_password(req: ResetPasswordRequest):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
         
-    if bcrypt.checkpw(req.new_password.encode('utf-8'), user["password_hash"]):
+    if PasswordHasher.verify(req.new_password, user["password_hash"]):
         raise HTTPException(status_code=400, detail="New password cannot be the same as the old password")
         
-    new_hash = bcrypt.hashpw(req.new_password.encode('utf-8'), bcrypt.gensalt())
+    new_hash = PasswordHasher.hash(req.new_password)
     users_collection.update_one(
         {"_id": ObjectId(user_id)},
         {"$set": {"password_hash": new_hash}}
     )
+    UserCache.invalidate(user_id)
     return {"success": True, "message": "Password reset successfully"}
 
 @app.get("/verify-token")
@@ -375,146 +410,298 @@ async def verify_token(current_user: dict = Depends(get_current_user)):
     return {"valid": True, "user": current_user}
 
 # User-specific chat rate limiting
-chat_rate_limits = defaultdict(list)
 CHAT_LIMIT = 5 # messages
 CHAT_WINDOW = 60 # seconds
 
-# Chat endpoints
-@app.post("/chat")
-async def chat(req: ChatRequest, current_user: dict = Depends(get_current_user)):
-    # Rate limit check
-    user_id = current_user["user_id"]
-    now = time.time()
+def current_user_id(current_user: dict = Depends(get_current_user)) -> str:
+    return current_user["user_id"]
+
+chat_rate_limit = rate_limit("chat", CHAT_LIMIT, CHAT_WINDOW, key=current_user_id,
+                             detail="Rate limit reached. Please wait a minute before sending more messages.")
+
+CHAT_MODEL = "llama-3.3-70b-versatile"
+
+# Professional legal disclaimer and lawyer redirection appended to every answer
+LEGAL_DISCLAIMER = (
+    "<br/><br/><hr/>"
+    "<div style='margin-top: 15px; padding: 15px; background-color: rgba(255, 193, 7, 0.1); border-left: 4px solid #ffc107; border-radius: 4px; color: #664d03;'>"
+    "<strong>Disclaimer:</strong> <em>This tool is built for educational purposes only and does not provide legal advice. "
+    "For professional legal assistance, please consult a qualified legal professional.</em>"
+    "<br/><br/><a href='/connect-lawyer' class='btn btn-warning btn-sm fw-bold' style='text-decoration: none; color: black;'>Connect with Verified Lawyers</a>"
+    "</div>"
+)
+
+# Kept byte-for-byte identical across requests so provider-side prompt caching can reuse it;
+# the retrieved context goes in a separate message after it.
+SYSTEM_PROMPT = (
+    "You are 'ConstitutionGPT', an expert AI specialized in the Indian Constitution and the Indian Legal System.\n\n"
+    "SCOPE GUIDELINES:\n"
+    "1. IN-SCOPE: Any query related to Indian law, rights, duties, crimes, punishments, police procedures, court systems, or government regulations. This includes natural language questions (e.g., 'What happens if I lose my ID?' or 'Can police enter my house?') even if they don't use technical words like 'Article' or 'Statute'.\n"
+    "2. OUT-OF-SCOPE: Topics that have zero connection to legal, constitutional, or civic matters (e.g., entertainment, recipes, coding, or general science).\n\n"
+    "HOW TO RESPOND:\n"
+    "- IF IN-SCOPE: Use the 'CONTEXT' provided in the next message if available. If 'CONTEXT' is empty, use your internal expert knowledge of the Indian Legal System to provide a helpful, professional answer. Cite specific Articles or Sections if you know them.\n"
+    "- IF OUT-OF-SCOPE: Politely explain that you are a specialized legal assistant and cannot answer that specific question, then briefly list the types of legal topics you CAN help with (e.g., Fundamental Rights, BNS, or police procedures).\n"
+)
+
+def build_chat_messages(context_docs: list, message: str):
+    """Returns (messages, context_tokens) with the retrieved chunks packed under CONTEXT_TOKEN_BUDGET."""
+    context_text, context_tokens = assemble_context(context_docs)
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": f"CONTEXT FROM CONSTITUTIONAL DOCUMENTS (May be empty):\n{context_text}"},
+        {"role": "user", "content": message}
+    ]
+    return messages, context_tokens
+
+def estimate_prompt_tokens(messages: list) -> int:
+    return sum(count_tokens(m["content"]) for m in messages)
+
+def chat_error_to_http(e: Exception) -> HTTPException:
+    err_str = str(e).lower()
+    print(f"Chat Error: {err_str}")
     
-    # Clean up old timestamps
-    chat_rate_limits[user_id] = [t for t in chat_rate_limits[user_id] if now - t < CHAT_WINDOW]
+    if "rate_limit_exceeded" in err_str:
+        return HTTPException(status_code=429, detail="Groq API Rate Limit Exceeded.")
     
-    if len(chat_rate_limits[user_id]) >= CHAT_LIMIT:
-        raise HTTPException(
-            status_code=429, 
-            detail="Rate limit reached. Please wait a minute before sending more messages."
+    if "api_key" in err_str or "unauthorized" in err_str or "401" in err_str:
+        return HTTPException(
+            status_code=401, 
+            detail="Your AI API key is invalid or expired. Please update backend/.env"
         )
-    
-    chat_rate_limits[user_id].append(now)
+        
+    return HTTPException(status_code=500, detail="The AI service is currently unavailable. Please try again later.")
 
+# Keyset pagination (see services/pagination.py)
+MESSAGES_PAGE_SIZE = int(os.getenv("MESSAGES_PAGE_SIZE", "100"))
+
+def paginate_or_400(*args, **kwargs) -> dict:
     try:
-        # Retrieve context from RAG
-        context_docs = RAGService.query(req.message)
-        context_text = "\n".join(context_docs)
-        
-        system_prompt = (
-            "You are 'ConstitutionGPT', an expert AI specialized in the Indian Constitution and the Indian Legal System.\n\n"
-            "SCOPE GUIDELINES:\n"
-            "1. IN-SCOPE: Any query related to Indian law, rights, duties, crimes, punishments, police procedures, court systems, or government regulations. This includes natural language questions (e.g., 'What happens if I lose my ID?' or 'Can police enter my house?') even if they don't use technical words like 'Article' or 'Statute'.\n"
-            "2. OUT-OF-SCOPE: Topics that have zero connection to legal, constitutional, or civic matters (e.g., entertainment, recipes, coding, or general science).\n\n"
-            "HOW TO RESPOND:\n"
-            "- IF IN-SCOPE: Use the 'CONTEXT' provided below if available. If 'CONTEXT' is empty, use your internal expert knowledge of the Indian Legal System to provide a helpful, professional answer. Cite specific Articles or Sections if you know them.\n"
-            "- IF OUT-OF-SCOPE: Politely explain that you are a specialized legal assistant and cannot answer that specific question, then briefly list the types of legal topics you CAN help with (e.g., Fundamental Rights, BNS, or police procedures).\n\n"
-            "CONTEXT FROM CONSTITUTIONAL DOCUMENTS (May be empty):\n"
-            f"{context_text}\n"
-        )
+        return keyset_page(*args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": req.message}
-            ]
-        )
-        
-        reply = response.choices[0].message.content
-        
-        # Append professional legal disclaimer and lawyer redirection
-        disclaimer = (
-            "<br/><br/><hr/>"
-            "<div style='margin-top: 15px; padding: 15px; background-color: rgba(255, 193, 7, 0.1); border-left: 4px solid #ffc107; border-radius: 4px; color: #664d03;'>"
-            "<strong>Disclaimer:</strong> <em>This tool is built for educational purposes only and does not provide legal advice. "
-            "For professional legal assistance, please consult a qualified legal professional.</em>"
-            "<br/><br/><a href='/connect-lawyer' class='btn btn-warning btn-sm fw-bold' style='text-decoration: none; color: black;'>Connect with Verified Lawyers</a>"
-            "</div>"
-        )
-        reply += disclaimer
-        
-        # Translate if needed
-        if req.lang == "hi":
-            try:
-                from services.translate import translate_text
-                reply = translate_text(reply, "hi")
-            except Exception as e:
-                print(f"Translation error: {e}")
+def page_links(page: dict) -> dict:
+    return {"has_more": page["has_more"], "next_before": page["next_before"], "next_after": page["next_after"]}
+
+# Chat endpoints
+@app.post("/chat", dependencies=[Depends(chat_rate_limit)])
+async def chat(req: ChatRequest, current_user: dict = Depends(get_current_user)):
+    try:
+        # Retrieve context from RAG
+        context_docs, chunk_ids, cached, query_embedding = await retrieve_with_cache(req.message, req.lang)
+        if cached:
+            reply = cached["reply"]
+        else:
+            messages, context_tokens = build_chat_messages(context_docs, req.message)
+
+            started = time.perf_counter()
+            response = await client.chat.completions.create(model=CHAT_MODEL, messages=messages)
+            latency_ms = (time.perf_counter() - started) * 1000
+            
+            answer = response.choices[0].message.content
+            reply = await finalize_reply(answer, req.lang)
+
+            usage = getattr(response, "usage", None)
+            ChatUsage.record(
+                getattr(usage, "prompt_tokens", None) or estimate_prompt_tokens(messages),
+                getattr(usage, "completion_tokens", None) or count_tokens(answer),
+                context_tokens, latency_ms
+            )
+            AnswerCache.put(
+                req.message, req.lang, chunk_ids, answer, reply,
+                embedding=query_embedding, latency_ms=latency_ms,
+                total_tokens=getattr(usage, "total_tokens", 0) or 0
+            )
         
         # Save chat to database
-        res = ChatService.save_chat_message(current_user["user_id"], req.message, reply)
+        res = await run_blocking(ChatService.save_chat_message, current_user["user_id"], req.message, reply)
         
         return {"reply": reply, "chat_id": res["chat_id"]}
     except Exception as e:
-        err_str = str(e).lower()
-        print(f"Chat Error: {err_str}")
-        
-        if "rate_limit_exceeded" in err_str:
-            raise HTTPException(status_code=429, detail="Groq API Rate Limit Exceeded.")
-        
-        if "api_key" in err_str or "unauthorized" in err_str or "401" in err_str:
-            raise HTTPException(
-                status_code=401, 
-                detail="Your AI API key is invalid or expired. Please update backend/.env"
+        raise chat_error_to_http(e)
+
+async def retrieve_with_cache(message: str, lang: str):
+    """Runs retrieval, then checks the answer cache. Returns (context_docs, chunk_ids, cached_entry, query_embedding)."""
+    docs = await run_blocking(RAGService.retrieve, message)
+    chunk_ids = [d["id"] for d in docs]
+    query_embedding = None
+    if ANSWER_CACHE_SEMANTIC:
+        query_embedding = await run_blocking(RAGService.embed_query, message)
+    cached = AnswerCache.get(message, lang, chunk_ids, embedding=query_embedding)
+    return [d["text"] for d in docs], chunk_ids, cached, query_embedding
+
+async def finalize_reply(answer: str, lang: str) -> str:
+    # Append professional legal disclaimer and lawyer redirection
+    reply = answer + LEGAL_DISCLAIMER
+    
+    # Translate if needed
+    if lang == "hi":
+        try:
+            reply = await run_blocking(TranslationService.translate, reply, "hi")
+        except Exception as e:
+            print(f"Translation error: {e}")
+    return reply
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/chat/stream", dependencies=[Depends(chat_rate_limit)])
+async def chat_stream(req: ChatRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Streaming variant of /chat. Emits Server-Sent Events:
+      token      -> {"content": "..."} for every delta produced by Groq
+      disclaimer -> {"content": "<html>"} once the completion has finished
+      done       -> {"chat_id": "...", "reply": "..."} after the chat is saved
+      error      -> {"status": 500, "detail": "..."} if generation fails
+    For lang == "hi" the tokens arrive in English and the translated reply is sent in 'done'.
+    A cached answer is sent as a single token event.
+    """
+    async def event_stream():
+        parts = []
+        try:
+            context_docs, chunk_ids, cached, query_embedding = await retrieve_with_cache(req.message, req.lang)
+            if cached:
+                parts.append(cached["answer"])
+                yield sse_event("token", {"content": cached["answer"]})
+            else:
+                messages, context_tokens = build_chat_messages(context_docs, req.message)
+
+                started = time.perf_counter()
+                stream = await client.chat.completions.create(model=CHAT_MODEL, messages=messages, stream=True)
+                usage = None
+                async for chunk in stream:
+                    # Groq reports usage on the final chunk under x_groq
+                    x_groq = getattr(chunk, "x_groq", None)
+                    if x_groq is not None and getattr(x_groq, "usage", None):
+                        usage = x_groq.usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield sse_event("token", {"content": delta})
+                latency_ms = (time.perf_counter() - started) * 1000
+                ChatUsage.record(
+                    getattr(usage, "prompt_tokens", None) or estimate_prompt_tokens(messages),
+                    getattr(usage, "completion_tokens", None) or count_tokens("".join(parts)),
+                    context_tokens, latency_ms
+                )
+        except Exception as e:
+            err = chat_error_to_http(e)
+            yield sse_event("error", {"status": err.status_code, "detail": err.detail})
+            return
+
+        yield sse_event("disclaimer", {"content": LEGAL_DISCLAIMER})
+
+        answer = "".join(parts)
+        if cached:
+            reply = cached["reply"]
+        else:
+            reply = await finalize_reply(answer, req.lang)
+            AnswerCache.put(
+                req.message, req.lang, chunk_ids, answer, reply,
+                embedding=query_embedding, latency_ms=latency_ms,
+                total_tokens=getattr(usage, "total_tokens", 0) or 0
             )
-            
-        raise HTTPException(status_code=500, detail="The AI service is currently unavailable. Please try again later.")
+
+        # Persist only once the stream has closed successfully
+        try:
+            res = await run_blocking(ChatService.save_chat_message, current_user["user_id"], req.message, reply)
+            yield sse_event("done", {"chat_id": res["chat_id"], "reply": reply})
+        except Exception as e:
+            print(f"Chat save error: {e}")
+            yield sse_event("error", {"status": 500, "detail": "Failed to save chat history."})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/admin/metrics")
+def admin_metrics(current_user: dict = Depends(check_role(["admin"]))):
+    """Hit-rate and savings counters for the in-process caches."""
+    return {
+        "answer_cache": AnswerCache.stats(),
+        "lexical_index": LexicalIndex.stats(),
+        "constitution_index": ConstitutionIndex.stats(),
+        "embeddings": EmbeddingService.stats(),
+        "chat_usage": ChatUsage.stats(),
+        "realtime": RealtimeService.stats(),
+        "rate_limits": RateLimiter.stats(),
+        "user_cache": UserCache.stats(),
+        "password_hasher": PasswordHasher.stats(),
+        "translation": TranslationService.stats(),
+        "tts_cache": TTSCache.stats(),
+        "blob_store": BlobStore.stats()
+    }
 
 @app.get("/history")
-async def get_history(current_user: dict = Depends(get_current_user)):
-    history = ChatService.get_user_chat_history(current_user["user_id"])
-    return {"history": history}
+def get_history(before: str = None, after: str = None, limit: int = 50, current_user: dict = Depends(get_current_user)):
+    try:
+        return ChatService.get_user_chat_history(current_user["user_id"], limit, before, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/chat/{chat_id}")
-async def get_chat(chat_id: str, current_user: dict = Depends(get_current_user)):
+def get_chat(chat_id: str, current_user: dict = Depends(get_current_user)):
     chat = ChatService.get_chat_by_id(chat_id, current_user["user_id"])
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
     return chat
 
 @app.delete("/chat/{chat_id}")
-async def delete_chat(chat_id: str, current_user: dict = Depends(get_current_user)):
+def delete_chat(chat_id: str, current_user: dict = Depends(get_current_user)):
     result = ChatService.delete_chat(chat_id, current_user["user_id"])
     if not result["success"]:
         raise HTTPException(status_code=404, detail=result["message"])
     return result
 
+# Constitution structure endpoints
+@app.get("/articles/{number}")
+def get_article(number: str):
+    if not ConstitutionIndex.is_ready():
+        raise HTTPException(status_code=503, detail="Constitution index is still loading")
+    article = ConstitutionIndex.get_article(number)
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return article
+
 # Topics endpoints
 @app.get("/topics")
-async def get_topics():
+def get_topics():
     topics = TopicsService.get_all_topics()
     return {"topics": topics}
 
 @app.get("/topics/{topic_id}")
-async def get_topic(topic_id: str):
+def get_topic(topic_id: str):
     topic = TopicsService.get_topic_by_id(topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
     return topic
 
 @app.get("/topics/search/{query}")
-async def search_topics(query: str):
+def search_topics(query: str):
     topics = TopicsService.search_topics(query)
     return {"topics": topics}
 
 @app.post("/topics")
-async def add_topic(req: TopicRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
+def add_topic(req: TopicRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
     result = TopicsService.add_topic(req.title, req.description, req.content)
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
     return result
 
 @app.put("/topics/{topic_id}")
-async def update_topic(topic_id: str, req: TopicRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
+def update_topic(topic_id: str, req: TopicRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
     result = TopicsService.update_topic(topic_id, req.title, req.description, req.content)
     if not result["success"]:
         raise HTTPException(status_code=404, detail=result["message"])
     return result
 
 @app.delete("/topics/{topic_id}")
-async def delete_topic(topic_id: str, current_user: dict = Depends(check_role(["admin", "moderator"]))):
+def delete_topic(topic_id: str, current_user: dict = Depends(check_role(["admin", "moderator"]))):
     result = TopicsService.delete_topic(topic_id)
     if not result["success"]:
         raise HTTPException(status_code=404, detail=result["message"])
@@ -529,35 +716,49 @@ class UpdateLawyerProfileRequest(BaseModel):
     years_of_experience: int = None
 
 # Lawyer Directory & Admin Verification
+LAWYER_SORTS = {
+    "fee_asc": [("consultation_fee", 1)],
+    "exp_desc": [("years_of_experience", -1)],
+    "rating_desc": [("avg_rating", -1)]
+}
+LAWYERS_PAGE_SIZE = int(os.getenv("LAWYERS_PAGE_SIZE", "50"))
+LAWYERS_MAX_PAGE_SIZE = 100
+LAWYER_DIRECTORY_PROJECTION = {
+    "username": 1, "email": 1, "phone": 1, "address": 1, "city": 1, "specialization": 1,
+    "consultation_fee": 1, "years_of_experience": 1, "avg_rating": 1, "review_count": 1, "is_verified": 1
+}
+
 @app.get("/lawyers")
-async def get_lawyers(city: str = None, min_rating: float = 0.0, specialization: str = None, sort: str = None, name: str = None):
-    from database import users_collection, reviews_collection
+def get_lawyers(city: str = None, min_rating: float = 0.0, specialization: str = None, sort: str = None, name: str = None,
+                offset: int = 0, limit: int = LAWYERS_PAGE_SIZE):
+    from database import users_collection
     query = {"role": "lawyer", "is_verified": True}
     if city:
-        query["city"] = {"$regex": city, "$options": "i"}
+        # Exact match on the normalized key so the lawyer_city index can seek on it
+        query["city_key"] = normalize_city(city)
     if specialization:
         query["specialization"] = specialization
     if name:
         query["username"] = {"$regex": name, "$options": "i"}
-    
-    lawyers = []
-    for l in users_collection.find(query):
-        lawyer_id = str(l["_id"])
-        
-        # Calculate average rating
-        pipeline = [
-            {"$match": {"lawyer_id": lawyer_id}},
-            {"$group": {"_id": "$lawyer_id", "avg_rating": {"$avg": "$rating"}, "count": {"$sum": 1}}}
-        ]
-        rating_stats = list(reviews_collection.aggregate(pipeline))
-        avg_rating = rating_stats[0]["avg_rating"] if rating_stats else 0.0
-        review_count = rating_stats[0]["count"] if rating_stats else 0
-        
-        if avg_rating < min_rating:
-            continue
 
-        lawyers.append({
-            "id": lawyer_id,
+    if min_rating > 0:
+        query["avg_rating"] = {"$gte": min_rating}
+
+    offset = max(offset, 0)
+    limit = min(max(limit, 1), LAWYERS_MAX_PAGE_SIZE)
+    # avg_rating/review_count are materialized by LawyerStatsService, so this is a plain indexed find.
+    # _id tie-breaker keeps pages stable between requests; limit + 1 tells us whether there is a next page.
+    rows = list(
+        users_collection.find(query, LAWYER_DIRECTORY_PROJECTION)
+        .sort(LAWYER_SORTS.get(sort, LAWYER_SORTS["rating_desc"]) + [("_id", 1)])
+        .skip(offset)
+        .limit(limit + 1)
+    )
+    has_more = len(rows) > limit
+
+    lawyers = [
+        {
+            "id": str(l["_id"]),
             "username": l["username"],
             "email": l["email"],
             "phone": l.get("phone"),
@@ -566,33 +767,31 @@ async def get_lawyers(city: str = None, min_rating: float = 0.0, specialization:
             "specialization": l.get("specialization"),
             "consultation_fee": l.get("consultation_fee", 0.0),
             "years_of_experience": l.get("years_of_experience", 0),
-            "avg_rating": round(avg_rating, 1),
-            "review_count": review_count,
+            "avg_rating": round(l.get("avg_rating", 0.0), 1),
+            "review_count": l.get("review_count", 0),
             "is_verified": l.get("is_verified", False)
-        })
-    
-    # Sorting logic
-    if sort == "fee_asc":
-        lawyers.sort(key=lambda x: x["consultation_fee"])
-    elif sort == "exp_desc":
-        lawyers.sort(key=lambda x: x["years_of_experience"], reverse=True)
-    elif sort == "rating_desc":
-        lawyers.sort(key=lambda x: x["avg_rating"], reverse=True)
-    else:
-        # Default sort by rating
-        lawyers.sort(key=lambda x: x["avg_rating"], reverse=True)
-        
-    return {"lawyers": lawyers}
+        }
+        for l in rows[:limit]
+    ]
+    return {
+        "lawyers": lawyers,
+        "offset": offset,
+        "limit": limit,
+        "has_more": has_more,
+        "next_offset": offset + limit if has_more else None
+    }
 
 @app.put("/profile/lawyer")
-async def update_lawyer_profile(req: UpdateLawyerProfileRequest, current_user: dict = Depends(check_role(["lawyer"]))):
+def update_lawyer_profile(req: UpdateLawyerProfileRequest, current_user: dict = Depends(check_role(["lawyer"]))):
     from database import users_collection
     from bson import ObjectId
     
     update_data = {}
     if req.phone is not None: update_data["phone"] = req.phone
     if req.address is not None: update_data["address"] = req.address
-    if req.city is not None: update_data["city"] = req.city
+    if req.city is not None:
+        update_data["city"] = req.city
+        update_data["city_key"] = normalize_city(req.city)
     if req.consultation_fee is not None: update_data["consultation_fee"] = float(req.consultation_fee)
     if req.specialization is not None: update_data["specialization"] = req.specialization
     if req.years_of_experience is not None: update_data["years_of_experience"] = int(req.years_of_experience)
@@ -604,6 +803,7 @@ async def update_lawyer_profile(req: UpdateLawyerProfileRequest, current_user: d
         {"_id": ObjectId(current_user["user_id"])},
         {"$set": update_data}
     )
+    UserCache.invalidate(current_user["user_id"])
     
     # Fetch updated user to return for React state sync
     u = users_collection.find_one({"_id": ObjectId(current_user["user_id"])})
@@ -626,11 +826,15 @@ async def update_lawyer_profile(req: UpdateLawyerProfileRequest, current_user: d
     }
 
 @app.post("/lawyer/{lawyer_id}/review")
-async def add_review(lawyer_id: str, rating: int = Form(...), comment: str = Form(None), current_user: dict = Depends(get_current_user)):
-    from database import reviews_collection, Review
+def add_review(lawyer_id: str, rating: int = Form(...), comment: str = Form(None), current_user: dict = Depends(get_current_user)):
+    from database import users_collection, reviews_collection, Review
+    from bson import ObjectId
     if rating < 1 or rating > 5:
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
     
+    if not ObjectId.is_valid(lawyer_id) or not users_collection.find_one({"_id": ObjectId(lawyer_id), "role": "lawyer"}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Lawyer not found")
+
     review = Review(current_user["user_id"], lawyer_id, rating, comment)
     review_doc = {
         "user_id": review.user_id,
@@ -640,13 +844,16 @@ async def add_review(lawyer_id: str, rating: int = Form(...), comment: str = For
         "created_at": review.created_at
     }
     reviews_collection.insert_one(review_doc)
+    # Only once the review exists, so a failed insert can't leave it counted in the aggregates
+    LawyerStatsService.record_review(lawyer_id, rating)
     return {"success": True, "message": "Review submitted successfully"}
 
 @app.get("/lawyer/{lawyer_id}/reviews")
-async def get_lawyer_reviews(lawyer_id: str):
+def get_lawyer_reviews(lawyer_id: str, before: str = None, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
     from database import reviews_collection
+    page = paginate_or_400(reviews_collection, {"lawyer_id": lawyer_id}, "created_at", limit, before, after)
     reviews = []
-    for r in reviews_collection.find({"lawyer_id": lawyer_id}).sort("created_at", -1):
+    for r in page["items"]:
         reviews.append({
             "id": str(r["_id"]),
             "user_id": r["user_id"],
@@ -654,13 +861,17 @@ async def get_lawyer_reviews(lawyer_id: str):
             "comment": r.get("comment"),
             "created_at": r["created_at"]
         })
-    return {"reviews": reviews}
+    return {"reviews": reviews, **page_links(page)}
 
 @app.get("/admin/lawyers")
-async def admin_get_lawyers(current_user: dict = Depends(check_role(["admin", "moderator"]))):
+def admin_get_lawyers(before: str = None, after: str = None, limit: int = DEFAULT_PAGE_SIZE,
+                      current_user: dict = Depends(check_role(["admin", "moderator"]))):
     from database import users_collection
+    # Newest registrations first; _id order is creation order
+    page = paginate_or_400(users_collection, {"role": "lawyer"}, "_id", limit, before, after,
+                           projection={"password_hash": 0})
     lawyers = []
-    for l in users_collection.find({"role": "lawyer"}):
+    for l in page["items"]:
         lawyers.append({
             "id": str(l["_id"]),
             "username": l["username"],
@@ -675,10 +886,10 @@ async def admin_get_lawyers(current_user: dict = Depends(check_role(["admin", "m
             "lawyer_proof_file": l.get("lawyer_proof_file"),
             "is_verified": l.get("is_verified", False)
         })
-    return {"lawyers": lawyers}
+    return {"lawyers": lawyers, **page_links(page)}
 
 @app.post("/admin/verify")
-async def admin_verify_lawyer(req: VerificationRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
+def admin_verify_lawyer(req: VerificationRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
     from database import users_collection
     from bson import ObjectId
     result = users_collection.update_one(
@@ -687,17 +898,24 @@ async def admin_verify_lawyer(req: VerificationRequest, current_user: dict = Dep
     )
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Lawyer not found")
+    UserCache.invalidate(req.lawyer_id)
     return {"success": True, "message": f"Lawyer {'verified' if req.is_verified else 'unverified'} successfully"}
 
 @app.delete("/admin/lawyers/{lawyer_id}")
-async def admin_delete_lawyer(lawyer_id: str, current_user: dict = Depends(check_role(["admin", "moderator"]))):
+def admin_delete_lawyer(lawyer_id: str, current_user: dict = Depends(check_role(["admin", "moderator"]))):
     from database import users_collection
     from bson import ObjectId
     
-    result = users_collection.delete_one({"_id": ObjectId(lawyer_id), "role": "lawyer"})
-    if result.deleted_count == 0:
+    lawyer = users_collection.find_one_and_delete(
+        {"_id": ObjectId(lawyer_id), "role": "lawyer"}, projection={"lawyer_proof_file": 1}
+    )
+    if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found or user is not a lawyer")
-        
+
+    BlobStore.release(lawyer.get("lawyer_proof_file"))
+
+    UserCache.invalidate(lawyer_id)
+    ConversationService.remove_user(lawyer_id)
     return {"success": True, "message": "Lawyer removed completely from the system"}
 
 # Person-to-Person Messaging
@@ -709,29 +927,17 @@ async def send_message(
     current_user: dict = Depends(get_current_user)
 ):
     from database import lawyer_chat_collection, LawyerChatMessage
-    import time
     
     file_url = None
     file_name = None
     file_type = None
     
     if file:
-        file_bytes = await file.read()
         file_name = file.filename
         file_type = file.content_type
-        try:
-            public_url = GCSService.upload_file(file_bytes, file_name, file_type)
-            file_url = public_url
-        except Exception as e:
-            # Fallback to local
-            file_ext = os.path.splitext(file_name)[1]
-            unique_filename = f"{int(time.time())}_{file_name}"
-            file_path = os.path.join(UPLOADS_DIR, "chats", unique_filename)
-            
-            with open(file_path, "wb") as buffer:
-                buffer.write(file_bytes)
-            
-            file_url = f"/uploads/chats/{unique_filename}"
+        # Identical attachments share one blob; repeats only bump its reference count
+        stored = await BlobStore.put_async(file.file, file_name, file_type)
+        file_url = stored["url"]
     
     new_msg = LawyerChatMessage(
         sender_id=current_user["user_id"],
@@ -753,18 +959,64 @@ async def send_message(
         "is_read": new_msg.is_read
     }
     
-    result = lawyer_chat_collection.insert_one(msg_data)
+    result = await run_blocking(lawyer_chat_collection.insert_one, msg_data)
+    await run_blocking(ConversationService.record_message, current_user, receiver_id, msg_data["message"], msg_data["timestamp"])
+
+    event = {"id": str(result.inserted_id), **{k: v for k, v in msg_data.items() if k != "_id"}}
+    # Sender too, so their other open tabs stay in sync
+    RealtimeService.publish(receiver_id, "message", event)
+    RealtimeService.publish(current_user["user_id"], "message", event)
     return {"success": True, "message_id": str(result.inserted_id)}
 
+@app.websocket("/ws")
+async def realtime_socket(websocket: WebSocket, token: str = None):
+    """
+    Push channel for messaging. Authenticate with ?token=<access_token>.
+    Server -> client frames are JSON: {"type": "message" | "read" | "notification" | "pong", "data": {...}}.
+    Sending the text "ping" gets a pong back.
+    """
+    payload = AuthService.verify_token(token) if token else None
+    if not payload:
+        await websocket.close(code=4401)
+        return
+
+    await websocket.accept()
+    user_id = payload["user_id"]
+    queue = RealtimeService.connect(user_id)
+
+    async def pump():
+        # Only this task writes to the socket
+        while True:
+            await websocket.send_text(await queue.get())
+
+    sender = asyncio.create_task(pump())
+    try:
+        while True:
+            if await websocket.receive_text() == "ping":
+                queue.put_nowait(json.dumps({"type": "pong", "data": {}}))
+    except (WebSocketDisconnect, asyncio.QueueFull):
+        pass
+    finally:
+        sender.cancel()
+        RealtimeService.disconnect(user_id, queue)
+
 @app.get("/messages/{other_id}")
-async def get_messages(other_id: str, current_user: dict = Depends(get_current_user)):
+def get_messages(other_id: str, before: str = None, after: str = None, limit: int = MESSAGES_PAGE_SIZE,
+                 current_user: dict = Depends(get_current_user)):
+    """
+    The latest `limit` messages of a conversation in chronological order.
+    Pass next_before to load older messages and next_after to fetch new ones.
+    """
     from database import lawyer_chat_collection
     
     # Mark messages from other_user to current_user as read
-    lawyer_chat_collection.update_many(
+    marked = lawyer_chat_collection.update_many(
         {"sender_id": other_id, "receiver_id": current_user["user_id"], "is_read": False},
         {"$set": {"is_read": True}}
     )
+    if marked.modified_count:
+        ConversationService.mark_read(current_user["user_id"], other_id, marked.modified_count)
+        RealtimeService.publish(other_id, "read", {"reader_id": current_user["user_id"], "count": marked.modified_count})
     
     # Get messages where current_user is either sender or receiver
     query = {
@@ -774,8 +1026,10 @@ async def get_messages(other_id: str, current_user: dict = Depends(get_current_u
         ]
     }
     
+    page = paginate_or_400(lawyer_chat_collection, query, "timestamp", limit, before, after)
     messages = []
-    for msg in lawyer_chat_collection.find(query).sort("timestamp", 1):
+    # Pages come newest-first; the thread is displayed oldest-first
+    for msg in reversed(page["items"]):
         messages.append({
             "id": str(msg["_id"]),
             "sender_id": msg["sender_id"],
@@ -788,85 +1042,39 @@ async def get_messages(other_id: str, current_user: dict = Depends(get_current_u
             "is_read": msg.get("is_read", False)
         })
         
-    return {"messages": messages}
+    return {"messages": messages, **page_links(page)}
 
 @app.post("/change-password")
-async def change_password(req: ChangePasswordRequest, current_user: dict = Depends(get_current_user)):
+def change_password(req: ChangePasswordRequest, current_user: dict = Depends(get_current_user)):
     from database import users_collection
     from bson import ObjectId
-    import bcrypt
     
     user = users_collection.find_one({"_id": ObjectId(current_user["user_id"])})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
         
     # Verify current password
-    if not bcrypt.checkpw(req.current_password.encode('utf-8'), user["password_hash"]):
+    if not PasswordHasher.verify(req.current_password, user["password_hash"]):
         raise HTTPException(status_code=400, detail="Incorrect current password")
         
     # Hash and update new password
-    new_hash = bcrypt.hashpw(req.new_password.encode('utf-8'), bcrypt.gensalt())
+    new_hash = PasswordHasher.hash(req.new_password)
     users_collection.update_one(
         {"_id": ObjectId(current_user["user_id"])},
         {"$set": {"password_hash": new_hash}}
     )
+    UserCache.invalidate(current_user["user_id"])
     
     return {"success": True, "message": "Password updated successfully"}
 
 @app.get("/chat-inbox")
-async def get_chat_inbox(current_user: dict = Depends(get_current_user)):
-    from database import lawyer_chat_collection, users_collection
-    from bson import ObjectId
-    
-    # Find all unique people current_user has chatted with
-    user_id = current_user["user_id"]
-    
-    # Using aggregation to find unique conversation partners
-    pipeline = [
-        {"$match": {"$or": [{"sender_id": user_id}, {"receiver_id": user_id}]}},
-        {"$sort": {"timestamp": -1}},
-        {"$group": {
-            "_id": {
-                "$cond": [
-                    {"$eq": ["$sender_id", user_id]},
-                    "$receiver_id",
-                    "$sender_id"
-                ]
-            },
-            "last_message": {"$first": "$message"},
-            "timestamp": {"$first": "$timestamp"},
-            "unread_count": {
-                "$sum": {
-                    "$cond": [
-                        {"$and": [{"$eq": ["$receiver_id", user_id]}, {"$eq": ["$is_read", False]}]},
-                        1,
-                        0
-                    ]
-                }
-            }
-        }}
-    ]
-    
-    conversations = list(lawyer_chat_collection.aggregate(pipeline))
-    
-    result = []
-    for conv in conversations:
-        other_user = users_collection.find_one({"_id": ObjectId(conv["_id"])})
-        if other_user:
-            result.append({
-                "other_user_id": str(other_user["_id"]),
-                "other_username": other_user["username"],
-                "other_role": other_user.get("role", "user"),
-                "last_message": conv["last_message"],
-                "timestamp": conv["timestamp"],
-                "unread_count": conv["unread_count"]
-            })
-            
-    return {"conversations": result}
+def get_chat_inbox(current_user: dict = Depends(get_current_user)):
+    # One summary document per conversation, maintained by send_message / get_messages
+    return {"conversations": ConversationService.get_inbox(current_user["user_id"])}
 
 # Appointments
 @app.post("/appointments/book")
-async def book_appointment(req: AppointmentRequest, current_user: dict = Depends(get_current_user)):
+def book_appointment(req: AppointmentRequest, current_user: dict = Depends(get_current_user)):
     from database import appointments_collection, Appointment
     appt = Appointment(current_user["user_id"], req.lawyer_id, req.date, req.time_slot, req.notes)
     appt_doc = {
@@ -882,13 +1090,14 @@ async def book_appointment(req: AppointmentRequest, current_user: dict = Depends
     return {"success": True, "appointment_id": str(result.inserted_id)}
 
 @app.get("/appointments/user")
-async def get_user_appointments(current_user: dict = Depends(get_current_user)):
-    from database import appointments_collection, users_collection
-    from bson import ObjectId
+def get_user_appointments(current_user: dict = Depends(get_current_user)):
+    from database import appointments_collection
     query = {"user_id": current_user["user_id"]}
+    rows = list(appointments_collection.find(query).sort("date", 1))
+    lawyers = UserLoader().load_many(a["lawyer_id"] for a in rows)
     appts = []
-    for a in appointments_collection.find(query).sort("date", 1):
-        lawyer = users_collection.find_one({"_id": ObjectId(a["lawyer_id"])})
+    for a in rows:
+        lawyer = lawyers.get(a["lawyer_id"])
         appts.append({
             "id": str(a["_id"]),
             "lawyer_id": a["lawyer_id"],
@@ -901,13 +1110,14 @@ async def get_user_appointments(current_user: dict = Depends(get_current_user)):
     return {"appointments": appts}
 
 @app.get("/appointments/lawyer")
-async def get_lawyer_appointments(current_user: dict = Depends(check_role(["lawyer", "admin"]))):
-    from database import appointments_collection, users_collection
-    from bson import ObjectId
+def get_lawyer_appointments(current_user: dict = Depends(check_role(["lawyer", "admin"]))):
+    from database import appointments_collection
     query = {"lawyer_id": current_user["user_id"]}
+    rows = list(appointments_collection.find(query).sort("date", 1))
+    users = UserLoader().load_many(a["user_id"] for a in rows)
     appts = []
-    for a in appointments_collection.find(query).sort("date", 1):
-        user = users_collection.find_one({"_id": ObjectId(a["user_id"])})
+    for a in rows:
+        user = users.get(a["user_id"])
         appts.append({
             "id": str(a["_id"]),
             "user_id": a["user_id"],
@@ -920,7 +1130,7 @@ async def get_lawyer_appointments(current_user: dict = Depends(check_role(["lawy
     return {"appointments": appts}
 
 @app.post("/appointments/{appointment_id}/status")
-async def update_appointment_status(appointment_id: str, req: StatusUpdateRequest, current_user: dict = Depends(get_current_user)):
+def update_appointment_status(appointment_id: str, req: StatusUpdateRequest, current_user: dict = Depends(get_current_user)):
     from database import appointments_collection
     from bson import ObjectId
     result = appointments_collection.update_one(
@@ -933,7 +1143,7 @@ async def update_appointment_status(appointment_id: str, req: StatusUpdateReques
 
 # User Queries (to Admin)
 @app.post("/queries")
-async def submit_query(req: UserQueryRequest, current_user: dict = Depends(get_current_user)):
+def submit_query(req: UserQueryRequest, current_user: dict = Depends(get_current_user)):
     from database import queries_collection, UserQuery
     new_query = UserQuery(current_user["user_id"], req.subject, req.message)
     query_doc = {
@@ -947,12 +1157,14 @@ async def submit_query(req: UserQueryRequest, current_user: dict = Depends(get_c
     return {"success": True, "query_id": str(result.inserted_id)}
 
 @app.get("/admin/queries")
-async def admin_get_queries(current_user: dict = Depends(check_role(["admin", "moderator"]))):
-    from database import queries_collection, users_collection
-    from bson import ObjectId
+def admin_get_queries(before: str = None, after: str = None, limit: int = DEFAULT_PAGE_SIZE,
+                      current_user: dict = Depends(check_role(["admin", "moderator"]))):
+    from database import queries_collection
+    page = paginate_or_400(queries_collection, {}, "created_at", limit, before, after)
+    users = UserLoader().load_many(q["user_id"] for q in page["items"])
     queries = []
-    for q in queries_collection.find().sort("created_at", -1):
-        user = users_collection.find_one({"_id": ObjectId(q["user_id"])})
+    for q in page["items"]:
+        user = users.get(q["user_id"])
         queries.append({
             "id": str(q["_id"]),
             "user_id": q["user_id"],
@@ -963,10 +1175,10 @@ async def admin_get_queries(current_user: dict = Depends(check_role(["admin", "m
             "status": q.get("status", "pending"),
             "created_at": q["created_at"].isoformat() if q.get("created_at") else None
         })
-    return {"queries": queries}
+    return {"queries": queries, **page_links(page)}
 
 @app.put("/admin/queries/{query_id}/status")
-async def update_query_status(query_id: str, req: StatusUpdateRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
+def update_query_status(query_id: str, req: StatusUpdateRequest, current_user: dict = Depends(check_role(["admin", "moderator"]))):
     from database import queries_collection, notifications_collection, Notification
     from bson import ObjectId
     
@@ -991,13 +1203,19 @@ async def update_query_status(query_id: str, req: StatusUpdateRequest, current_u
             "is_read": new_notif.is_read,
             "created_at": new_notif.created_at
         }
-        notifications_collection.insert_one(notif_doc)
+        notif_result = notifications_collection.insert_one(notif_doc)
+        RealtimeService.publish(query["user_id"], "notification", {
+            "id": str(notif_result.inserted_id),
+            "message": notif_doc["message"],
+            "is_read": notif_doc["is_read"],
+            "created_at": notif_doc["created_at"]
+        })
         
     return {"success": True, "message": f"Query status updated to {req.status}"}
 
 # Notifications
 @app.get("/notifications")
-async def get_notifications(current_user: dict = Depends(get_current_user)):
+def get_notifications(current_user: dict = Depends(get_current_user)):
     from database import notifications_collection
     
     notifications = []
@@ -1013,7 +1231,7 @@ async def get_notifications(current_user: dict = Depends(get_current_user)):
     return {"notifications": notifications}
 
 @app.put("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: str, current_user: dict = Depends(get_current_user)):
+def mark_notification_read(notification_id: str, current_user: dict = Depends(get_current_user)):
     from database import notifications_collection
     from bson import ObjectId
     
@@ -1036,23 +1254,153 @@ class TranslateSpeakRequest(BaseModel):
     target_lang: str
 
 @app.post("/speech-to-text")
-async def speech_to_text(req: SpeechRequest):
+def speech_to_text(req: SpeechRequest):
     return SpeechService.speech_to_text(req.audio_data)
 
+@app.post("/speech-to-text/stream")
+async def speech_to_text_stream(request: Request, sample_rate: int = None, channels: int = 1, lang: str = "en-US",
+                                current_user: dict = Depends(get_current_user)):
+    """
+    Incremental transcription of a long recording. The body is either a multipart form
+    with a `file` field or the raw audio itself (chunked transfer is fine): 16-bit PCM WAV,
+    or raw 16-bit little-endian PCM with ?sample_rate=. Emits Server-Sent Events:
+      partial -> {"index", "text", "start_ms", "end_ms"} as each utterance is recognised
+      done    -> {"text": "..."} with the full transcript
+      error   -> {"status": 400 | 502, "detail": "..."}
+    Bodies over STT_MAX_STREAM_MB are rejected with 413.
+    """
+    if int(request.headers.get("content-length") or 0) > STT_MAX_STREAM_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"Audio stream exceeds {STT_MAX_STREAM_MB} MB")
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        # Starlette spools the upload to a temp file; read it back in chunks
+        form = await request.form()
+        upload = form.get("file")
+        if not upload or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing audio file")
+
+        async def chunks():
+            while chunk := await upload.read(64 * 1024):
+                yield chunk
+    else:
+        chunks = request.stream
+
+    # Segments are recognised while the body is still arriving
+    session = TranscriptionSession(sample_rate, channels, lang)
+    try:
+        async for chunk in limit_stream(chunks()):
+            if not await session.feed(chunk):
+                break
+        await session.close()
+    except BaseException as e:
+        # Too large, or the client went away mid-upload
+        session.cancel()
+        if isinstance(e, StreamTooLargeError):
+            raise HTTPException(status_code=413, detail=str(e))
+        raise
+
+    async def event_stream():
+        texts = []
+        try:
+            async for partial in session:
+                texts.append(partial["text"])
+                yield sse_event("partial", partial)
+        except AudioFormatError as e:
+            yield sse_event("error", {"status": 400, "detail": str(e)})
+            return
+        except Exception as e:
+            print(f"Speech stream error: {e}")
+            yield sse_event("error", {"status": 502, "detail": f"Speech recognition error: {e}"})
+            return
+        finally:
+            # Also runs when the client disconnects while results are streaming
+            session.cancel()
+        yield sse_event("done", {"text": " ".join(texts)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/speech-to-text")
+async def speech_to_text_socket(websocket: WebSocket, token: str = None, sample_rate: int = None,
+                                channels: int = 1, lang: str = "en-US"):
+    """
+    WebSocket variant of /speech-to-text/stream; authenticate with ?token=<access_token>.
+    The client sends binary audio frames (WAV or raw PCM as above) and the text "end" when
+    done. The server sends JSON frames: {"type": "partial", "data": {...}}, then
+    {"type": "done", "data": {"text": "..."}} or {"type": "error", "data": {"detail": "..."}}.
+    Streams over STT_MAX_STREAM_MB are closed with code 1009.
+    """
+    if not (AuthService.verify_token(token) if token else None):
+        await websocket.close(code=4401)
+        return
+    await websocket.accept()
+
+    async def chunks():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                yield message["bytes"]
+            elif message.get("text") == "end":
+                return
+
+    texts = []
+    partials = transcribe_stream(limit_stream(chunks()), sample_rate, channels, lang)
+    try:
+        async for partial in partials:
+            texts.append(partial["text"])
+            await websocket.send_json({"type": "partial", "data": partial})
+        await websocket.send_json({"type": "done", "data": {"text": " ".join(texts)}})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Speech socket error: {e}")
+        code = 1009 if isinstance(e, StreamTooLargeError) else 1003 if isinstance(e, AudioFormatError) else 1011
+        try:
+            await websocket.send_json({"type": "error", "data": {"detail": str(e)}})
+            await websocket.close(code=code)
+        except Exception:
+            pass  # Client already gone
+    finally:
+        # Cancels the reader and drops segments still being recognised
+        await partials.aclose()
+
 @app.post("/text-to-speech")
-async def text_to_speech(text: str = Form(...), lang: str = Form("en")):
+def text_to_speech(text: str = Form(...), lang: str = Form("en")):
     return SpeechService.text_to_speech(text, lang)
 
 @app.post("/translate-and-speak")
-async def translate_and_speak(req: TranslateSpeakRequest):
+def translate_and_speak(req: TranslateSpeakRequest):
     return SpeechService.translate_and_speak(req.text, req.target_lang)
 
 @app.get("/audio/{filename}")
 async def get_audio(filename: str):
     from fastapi.responses import FileResponse
-    file_path = os.path.join(UPLOADS_DIR, filename)
-    if not os.path.exists(file_path):
+    paths = TTSCache.paths(filename)
+    if not paths:
         raise HTTPException(status_code=404, detail="Audio file not found")
-    return FileResponse(file_path)
+    file_path, part_path = paths
+    if os.path.exists(file_path):
+        return FileResponse(file_path, media_type="audio/mpeg")
+    # Still being synthesised: stream what exists and follow the file as sentences are added
+    try:
+        stream = TTSCache.follow(part_path)
+        first = await stream.__anext__()
+    except (FileNotFoundError, StopAsyncIteration):
+        # Finished (or failed) between the two checks
+        if os.path.exists(file_path):
+            return FileResponse(file_path, media_type="audio/mpeg")
+        raise HTTPException(status_code=404, detail="Audio file not found")
+
+    async def body():
+        yield first
+        async for chunk in stream:
+            yield chunk
+
+    return StreamingResponse(body(), media_type="audio/mpeg", headers={"Cache-Control": "no-cache"})
 
 
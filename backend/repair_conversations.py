@@ -0,0 +1,9 @@
+from services.conversation_service import ConversationService
+
+def repair_conversations():
+    result = ConversationService.rebuild()
+    print(f"Rebuilt {result['conversations']} conversation summaries from message history.")
+
+if __name__ == "__main__":
+    # Usage: python repair_conversations.py
+    repair_conversations()
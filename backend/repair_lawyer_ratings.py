@@ -0,0 +1,10 @@
+from services.lawyer_stats import LawyerStatsService
+import sys
+
+def repair_lawyer_ratings(lawyer_id=None):
+    result = LawyerStatsService.recompute(lawyer_id)
+    print(f"Recomputed rating aggregates for {result['lawyers']} lawyer(s); {result['modified']} document(s) changed.")
+
+if __name__ == "__main__":
+    # Usage: python repair_lawyer_ratings.py [lawyer_id]
+    repair_lawyer_ratings(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,168 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional
+import numpy as np
+
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "21600"))  # seconds (6 hours)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+ANSWER_CACHE_SEMANTIC = os.getenv("ANSWER_CACHE_SEMANTIC", "false").lower() == "true"
+ANSWER_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95"))
+
+class AnswerCache:
+    """
+    In-process cache for /chat answers, checked before the LLM call.
+
+    Tier 1 (exact): key = normalized question + lang + IDs of the retrieved chunks.
+    Tier 2 (semantic, optional): cosine similarity between question embeddings
+    of the same lang, above ANSWER_CACHE_SIMILARITY_THRESHOLD.
+    Entries expire after ANSWER_CACHE_TTL and the least recently used entry is
+    evicted once ANSWER_CACHE_MAX_ENTRIES is reached.
+
+    The cache lives in one process: invalidate() only clears this worker's entries,
+    so with several workers the others keep serving old answers until their TTL.
+    """
+    _entries: "OrderedDict[str, Dict]" = OrderedDict()
+    _lock = threading.Lock()
+    # Bumped on every change to _entries; the semantic matrix is rebuilt when it moves
+    _version = 0
+    _matrices: Dict[str, tuple] = {}  # lang -> (version, keys, unit-vector matrix)
+    _stats = {
+        "exact_hits": 0,
+        "semantic_hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "invalidations": 0,
+        "saved_latency_ms": 0.0,
+        "saved_tokens": 0
+    }
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        text = re.sub(r"[^\w\s]", " ", question.lower())
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(cls, question: str, lang: str, chunk_ids: List[str]) -> str:
+        raw = "\x1f".join([cls.normalize(question), lang, *sorted(chunk_ids)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    @classmethod
+    def _matrix(cls, lang: str) -> tuple:
+        """(keys, matrix) of the unit embeddings cached for lang; rebuilt only after the cache changed."""
+        with cls._lock:
+            version = cls._version
+            cached = cls._matrices.get(lang)
+            if cached and cached[0] == version:
+                return cached[1], cached[2]
+            candidates = [(k, e["unit"]) for k, e in cls._entries.items()
+                          if e["lang"] == lang and e.get("unit") is not None]
+        # Stacking is O(n·d), so it happens outside the lock
+        keys = [k for k, _ in candidates]
+        matrix = np.stack([unit for _, unit in candidates]) if candidates else None
+        with cls._lock:
+            if cls._version == version:
+                cls._matrices[lang] = (version, keys, matrix)
+        return keys, matrix
+
+    @classmethod
+    def _semantic_match(cls, lang: str, embedding: List[float]) -> Optional[str]:
+        """Key of the most similar cached question above the threshold, or None."""
+        query = cls._unit(embedding)
+        keys, matrix = cls._matrix(lang)
+        if query is None or matrix is None or matrix.shape[1] != query.shape[0]:
+            return None
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= ANSWER_CACHE_SIMILARITY_THRESHOLD else None
+
+    @classmethod
+    def get(cls, question: str, lang: str, chunk_ids: List[str], embedding: Optional[List[float]] = None) -> Optional[Dict]:
+        """Returns the cached entry ({'answer', 'reply', ...}) or None."""
+        key = cls.make_key(question, lang, chunk_ids)
+        now = time.time()
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry and entry["expires_at"] <= now:
+                del cls._entries[key]
+                cls._version += 1
+                entry = None
+            if entry:
+                cls._entries.move_to_end(key)
+                cls._record_hit("exact_hits", entry)
+                return entry
+
+        if ANSWER_CACHE_SEMANTIC and embedding:
+            best_key = cls._semantic_match(lang, embedding)
+            with cls._lock:
+                # The entry may have been evicted while we were scoring
+                entry = cls._entries.get(best_key) if best_key else None
+                if entry and entry["expires_at"] > now:
+                    cls._entries.move_to_end(best_key)
+                    cls._record_hit("semantic_hits", entry)
+                    return entry
+
+        with cls._lock:
+            cls._stats["misses"] += 1
+        return None
+
+    @classmethod
+    def _record_hit(cls, counter: str, entry: Dict):
+        cls._stats[counter] += 1
+        cls._stats["saved_latency_ms"] += entry.get("latency_ms", 0.0)
+        cls._stats["saved_tokens"] += entry.get("total_tokens", 0)
+
+    @classmethod
+    def put(cls, question: str, lang: str, chunk_ids: List[str], answer: str, reply: str,
+            embedding: Optional[List[float]] = None, latency_ms: float = 0.0, total_tokens: int = 0):
+        """
+        answer: raw LLM text, reply: final text sent to the user (disclaimer/translation applied).
+        latency_ms/total_tokens describe the generation this entry saves on every hit.
+        """
+        key = cls.make_key(question, lang, chunk_ids)
+        with cls._lock:
+            cls._entries[key] = {
+                "answer": answer,
+                "reply": reply,
+                "lang": lang,
+                "unit": cls._unit(embedding) if ANSWER_CACHE_SEMANTIC and embedding else None,
+                "latency_ms": latency_ms,
+                "total_tokens": total_tokens,
+                "expires_at": time.time() + ANSWER_CACHE_TTL
+            }
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > ANSWER_CACHE_MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+                cls._stats["evictions"] += 1
+            cls._version += 1
+
+    @classmethod
+    def invalidate(cls):
+        """Drop every cached answer (called when the topic corpus changes)."""
+        with cls._lock:
+            cls._entries.clear()
+            cls._matrices.clear()
+            cls._version += 1
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            hits = cls._stats["exact_hits"] + cls._stats["semantic_hits"]
+            lookups = hits + cls._stats["misses"]
+            return {
+                **cls._stats,
+                "saved_latency_ms": round(cls._stats["saved_latency_ms"], 1),
+                "entries": len(cls._entries),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "semantic_enabled": ANSWER_CACHE_SEMANTIC
+            }
@@ -1,10 +1,12 @@
 from database import users_collection, refresh_tokens_collection, User
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+from services.lawyer_stats import normalize_city
 from typing import Optional, Dict
-import bcrypt
 import jwt
 from datetime import datetime, timedelta
 import os
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY", "your-refresh-secret-key-here")
@@ -53,7 +55,7 @@ class AuthService:
             return {"success": False, "message": "Email already exists"}
         
         # Create new user
-        user = User(username, email, password, role, phone, address, city, lawyer_id_proof, lawyer_proof_file, consultation_fee, specialization, years_of_experience)
+        user = User(username, email, PasswordHasher.hash(password), role, phone, address, city, lawyer_id_proof, lawyer_proof_file, consultation_fee, specialization, years_of_experience)
         user_data = {
             "username": user.username,
             "email": user.email,
@@ -71,8 +73,15 @@ class AuthService:
             "created_at": user.created_at,
             "is_active": user.is_active
         }
+        if role == "lawyer":
+            # Rating aggregates maintained by LawyerStatsService
+            user_data.update({"rating_sum": 0, "review_count": 0, "avg_rating": 0.0, "city_key": normalize_city(city)})
         
-        result = users_collection.insert_one(user_data)
+        try:
+            result = users_collection.insert_one(user_data)
+        except DuplicateKeyError:
+            # Lost a race with a concurrent registration; the unique indexes catch what the checks above missed
+            return {"success": False, "message": "Username or email already registered"}
         
         return {
             "success": True,
@@ -91,8 +100,19 @@ class AuthService:
             return {"success": False, "message": "Invalid credentials"}
         
         # Verify password
-        if not bcrypt.checkpw(password.encode('utf-8'), user["password_hash"]):
+        if not PasswordHasher.verify(password, user["password_hash"]):
             return {"success": False, "message": "Invalid credentials"}
+
+        # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the plaintext
+        if PasswordHasher.needs_rehash(user["password_hash"]):
+            try:
+                users_collection.update_one(
+                    {"_id": user["_id"], "password_hash": user["password_hash"]},
+                    {"$set": {"password_hash": PasswordHasher.hash(password)}}
+                )
+                PasswordHasher.record_rehash()
+            except PasswordHasherBusy:
+                pass  # Not worth failing a valid login over; retried on the next one
         
         # Generate tokens
         user_id = str(user["_id"])
@@ -0,0 +1,216 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Optional
+
+BLOB_DIR = os.path.join(os.getenv("DATA_DIR", "."), "uploads")
+BLOB_UPLOAD_WORKERS = int(os.getenv("BLOB_UPLOAD_WORKERS", os.getenv("GCS_UPLOAD_WORKERS", "4")))
+HASH_CHUNK_SIZE = 1024 * 1024
+# Blob names never change content, so clients and CDNs may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+SAFE_EXTENSION = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+BLOB_KEY = re.compile(r"blobs/[0-9a-f]{2}/([0-9a-f]{64})(\.[A-Za-z0-9]{1,10})?$")
+
+def hash_stream(fileobj: BinaryIO) -> tuple:
+    """(sha256 hex, size) of a file object, read in chunks; leaves it rewound."""
+    fileobj.seek(0)
+    digest, size = hashlib.sha256(), 0
+    while chunk := fileobj.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+def blob_key(sha256: str, filename: Optional[str]) -> str:
+    """blobs/<2 hex>/<sha256><ext>; the extension only helps browsers and StaticFiles pick a type."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if not SAFE_EXTENSION.match(ext):
+        ext = ""
+    return f"blobs/{sha256[:2]}/{sha256}{ext}"
+
+class LocalBlobBackend:
+    name = "local"
+
+    @staticmethod
+    def _path(key: str) -> str:
+        return os.path.join(BLOB_DIR, *key.split("/"))
+
+    @classmethod
+    def exists(cls, key: str) -> bool:
+        return os.path.exists(cls._path(key))
+
+    @classmethod
+    def write(cls, fileobj: BinaryIO, key: str, content_type: Optional[str], size: int) -> str:
+        import shutil
+        path = cls._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique .part per writer; the rename is atomic and every writer has the same bytes
+        part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        fileobj.seek(0)
+        try:
+            with open(part_path, "wb") as f:
+                shutil.copyfileobj(fileobj, f, HASH_CHUNK_SIZE)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        return cls.url(key)
+
+    @staticmethod
+    def url(key: str) -> str:
+        return f"/uploads/{key}"
+
+    @classmethod
+    def delete(cls, key: str):
+        try:
+            os.remove(cls._path(key))
+        except FileNotFoundError:
+            pass
+
+class GCSBlobBackend:
+    name = "gcs"
+
+    @staticmethod
+    def exists(key: str) -> bool:
+        from services.gcs_service import GCSService
+        return GCSService.exists(key)
+
+    @staticmethod
+    def write(fileobj: BinaryIO, key: str, content_type: Optional[str], size: int) -> str:
+        from services.gcs_service import GCSService
+        return GCSService.upload_object(fileobj, key, content_type, size, cache_control=IMMUTABLE_CACHE_CONTROL)
+
+    @staticmethod
+    def url(key: str) -> str:
+        from services.gcs_service import GCSService
+        return GCSService.public_url(key)
+
+    @staticmethod
+    def delete(key: str):
+        from services.gcs_service import GCSService
+        GCSService.delete(key)
+
+BACKENDS = {backend.name: backend for backend in (GCSBlobBackend, LocalBlobBackend)}
+
+class BlobStore:
+    """
+    Content-addressed attachment storage. Files are named by the sha256 of their bytes,
+    so the same PDF sent to ten lawyers is stored (and uploaded) once.
+    - put() hashes the spooled upload first, which is a local read; if the blob is already
+      known only its reference count is bumped and nothing is sent to GCS.
+    - New blobs go to GCS, falling back to the local uploads dir when GCS is unavailable.
+    - blobs_collection holds one document per blob: {_id: sha256, refs, backend, key, url, ...}.
+      release() drops a reference and deletes the blob when the last one is gone.
+    """
+    _executor = ThreadPoolExecutor(max_workers=BLOB_UPLOAD_WORKERS, thread_name_prefix="blob-upload")
+    _lock = threading.Lock()
+    _stats = {"stored": 0, "deduplicated": 0, "bytes_stored": 0, "bytes_deduplicated": 0,
+              "released": 0, "deleted": 0, "fallbacks": 0}
+
+    @classmethod
+    def _count(cls, **counts):
+        with cls._lock:
+            for key, n in counts.items():
+                cls._stats[key] += n
+
+    @classmethod
+    def put(cls, fileobj: BinaryIO, filename: str, content_type: str = None) -> Dict:
+        """Store a file object; returns {"sha256", "key", "url", "size", "deduplicated"}."""
+        from database import blobs_collection
+        from pymongo import ReturnDocument
+        sha256, size = hash_stream(fileobj)
+
+        # Only blobs that still have references count as present; a zero-ref document may be mid-delete
+        existing = blobs_collection.find_one_and_update(
+            {"_id": sha256, "refs": {"$gt": 0}},
+            {"$inc": {"refs": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if existing:
+            cls._count(deduplicated=1, bytes_deduplicated=size)
+            return {"sha256": sha256, "key": existing["key"], "url": existing["url"], "size": size, "deduplicated": True}
+
+        key = blob_key(sha256, filename)
+        backend, url, uploaded = cls._write(fileobj, key, content_type, size)
+        stored = blobs_collection.find_one_and_update(
+            {"_id": sha256},
+            {
+                "$inc": {"refs": 1},
+                "$set": {"backend": backend.name, "key": key, "url": url},
+                "$setOnInsert": {"size": size, "content_type": content_type, "created_at": time.time()}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if uploaded:
+            cls._count(stored=1, bytes_stored=size)
+        else:
+            cls._count(deduplicated=1, bytes_deduplicated=size)
+        return {"sha256": sha256, "key": stored["key"], "url": stored["url"], "size": size, "deduplicated": not uploaded}
+
+    @classmethod
+    def _write(cls, fileobj: BinaryIO, key: str, content_type: Optional[str], size: int) -> tuple:
+        """(backend, url, uploaded) for a blob with no live reference document."""
+        try:
+            if GCSBlobBackend.exists(key):
+                # e.g. uploaded before its reference document was written
+                return GCSBlobBackend, GCSBlobBackend.url(key), False
+            return GCSBlobBackend, GCSBlobBackend.write(fileobj, key, content_type, size), True
+        except Exception as e:
+            print(f"\nExecuting local blob fallback! GCS Upload Failed. Quick Reason: {e}")
+            cls._count(fallbacks=1)
+        if LocalBlobBackend.exists(key):
+            return LocalBlobBackend, LocalBlobBackend.url(key), False
+        return LocalBlobBackend, LocalBlobBackend.write(fileobj, key, content_type, size), True
+
+    @classmethod
+    async def put_async(cls, fileobj: BinaryIO, filename: str, content_type: str = None) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls._executor, cls.put, fileobj, filename, content_type)
+
+    @staticmethod
+    def sha256_of(reference: Optional[str]) -> Optional[str]:
+        """The blob hash in a stored URL or key, or None for files saved before the blob store."""
+        match = BLOB_KEY.search(reference or "")
+        return match.group(1) if match else None
+
+    @classmethod
+    def release(cls, reference: Optional[str]) -> bool:
+        """Drop one reference to the blob behind a URL or key; True if the blob was deleted."""
+        from database import blobs_collection
+        from pymongo import ReturnDocument
+        sha256 = cls.sha256_of(reference)
+        if not sha256:
+            return False
+
+        doc = blobs_collection.find_one_and_update(
+            {"_id": sha256, "refs": {"$gt": 0}},
+            {"$inc": {"refs": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if not doc:
+            return False
+        cls._count(released=1)
+        if doc["refs"] > 0:
+            return False
+
+        # Conditional, so a put() that revived the blob in the meantime keeps it
+        if blobs_collection.delete_one({"_id": sha256, "refs": {"$lte": 0}}).deleted_count == 0:
+            return False
+        try:
+            BACKENDS[doc.get("backend", LocalBlobBackend.name)].delete(doc["key"])
+        except Exception as e:
+            print(f"Blob delete error for {doc['key']}: {e}")
+            return False
+        cls._count(deleted=1)
+        return True
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            return dict(cls._stats)
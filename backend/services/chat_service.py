@@ -2,6 +2,7 @@ from database import chat_collection, ChatMessage
 from typing import List, Dict, Optional
 from datetime import datetime
 from bson import ObjectId
+from services.pagination import keyset_page
 
 class ChatService:
     @staticmethod
@@ -23,20 +24,23 @@ class ChatService:
         }
     
     @staticmethod
-    def get_user_chat_history(user_id: str, limit: int = 50) -> List[Dict]:
-        chats = chat_collection.find(
-            {"user_id": user_id}
-        ).sort("timestamp", -1).limit(limit)
-        
-        return [
-            {
-                "id": str(chat["_id"]),
-                "message": chat["message"],
-                "response": chat["response"],
-                "timestamp": chat["timestamp"]
-            }
-            for chat in chats
-        ]
+    def get_user_chat_history(user_id: str, limit: int = 50, before: Optional[str] = None, after: Optional[str] = None) -> Dict:
+        """Newest-first page of a user's chats. Raises ValueError for a malformed cursor."""
+        page = keyset_page(chat_collection, {"user_id": user_id}, "timestamp", limit, before, after)
+        return {
+            "history": [
+                {
+                    "id": str(chat["_id"]),
+                    "message": chat["message"],
+                    "response": chat["response"],
+                    "timestamp": chat["timestamp"]
+                }
+                for chat in page["items"]
+            ],
+            "has_more": page["has_more"],
+            "next_before": page["next_before"],
+            "next_after": page["next_after"]
+        }
     
     @staticmethod
     def get_chat_by_id(chat_id: str, user_id: str) -> Optional[Dict]:
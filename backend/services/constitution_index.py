@@ -0,0 +1,313 @@
+import os
+import re
+import json
+import threading
+from typing import List, Dict, Optional
+
+INDEX_PATH = os.path.join(os.getenv("DATA_DIR", "."), "constitution_index.json")
+PDF_PATH = os.path.join(os.path.dirname(__file__), "..", "constitution_db", "constitution_eng.pdf")
+MAX_CONTEXT_CHARS = 4000
+LAST_ARTICLE = 395
+ARTICLE_NUMBER_GAP = 6  # largest jump accepted between consecutive article headings
+TITLE_MAX_LINES = 3
+
+ORDINALS = ["FIRST", "SECOND", "THIRD", "FOURTH", "FIFTH", "SIXTH", "SEVENTH", "EIGHTH",
+            "NINTH", "TENTH", "ELEVENTH", "TWELFTH"]
+
+FOOTNOTE_RULE = re.compile(r"^_{10,}\s*$")
+RUNNING_HEADER = re.compile(r"^\s*THE\s+CONSTITUTION\s+OF\s+INDIA\s*$", re.IGNORECASE)
+PAGE_PART_HEADER = re.compile(r"^\s*\(Part\s+([IVXL]+[A-Z]?)\.?\s*[—-]+\s*(.+?)\)\s*$")
+PAGE_NUMBER = re.compile(r"^\s*\d{1,3}\s*$")
+PART_HEADING = re.compile(r"^\s*(?:\d+\s*\[)?\[?PART\s+([IVXL]+[A-Z]?)\s*$")
+CHAPTER_HEADING = re.compile(r"^\s*(?:\d+\s*\[)?\[?CHAPTER\s+([IVXL]+[A-Z]?)\.?\s*[—-]*\s*(.*)$")
+SCHEDULE_HEADING = re.compile(rf"^\s*(?:\d+\s*\[)?\[?({'|'.join(ORDINALS)})\s+SCHEDULE\s*$")
+ARTICLE_START = re.compile(r"^\s*(?:\d+\s*\[)?\[?(\d{1,3})((?:-?[A-Z]){0,3})\s?\.\s*(.*)$")
+CLAUSE_START = re.compile(r"^\s*(?:\d+\s*\[)?\[?\((\d+[A-Z]?)\)\s")
+
+ARTICLE_QUERY = re.compile(r"\b(?:article|art\.?|anuchhed)\s*(\d{1,3}(?:-?[A-Z]{1,3})?)\s*((?:\(\s*\w+\s*\))*)", re.IGNORECASE)
+PART_QUERY = re.compile(r"\bpart\s+([IVXL]+[A-Z]?|\d{1,2}[A-Z]?)\b", re.IGNORECASE)
+SCHEDULE_QUERY = re.compile(
+    rf"\b(?:({'|'.join(ORDINALS)})\s+schedule|schedule\s+(\d{{1,2}}))\b", re.IGNORECASE
+)
+
+def int_to_roman(value: int) -> str:
+    out = ""
+    for v, sym in [(50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]:
+        while value >= v:
+            out += sym
+            value -= v
+    return out
+
+def normalize_article_number(number: str) -> str:
+    # "371-I" in the PDF, "371I" in most questions
+    return re.sub(r"[\s-]", "", number.upper())
+
+def _clean_heading(text: str) -> str:
+    """Drop footnote markers like "1[", "1***" and brackets from a heading."""
+    text = re.sub(r"\d*\*+|\d+\[|[\[\]]", " ", text)
+    return " ".join(text.split()).strip(" .,").title()
+
+def _heading_continuation(lines: List[str], j: int) -> bool:
+    """Upper-case lines directly after a PART/CHAPTER heading continue its title."""
+    line = lines[j] if j < len(lines) else ""
+    return bool(line) and line == line.upper() and not line[0].isdigit() and not line.startswith("(") \
+        and not CHAPTER_HEADING.match(line) and not PART_HEADING.match(line)
+
+def _clean_page(text: str) -> List[str]:
+    """Strip the running header, page number and footnotes from one page."""
+    body = []
+    for i, line in enumerate(text.splitlines()):
+        if FOOTNOTE_RULE.match(line):
+            break
+        if i < 4 and (RUNNING_HEADER.match(line) or PAGE_PART_HEADER.match(line) or PAGE_NUMBER.match(line)):
+            continue
+        body.append(line)
+    return body
+
+def _article_heading(lines: List[str], i: int, last_number: int, seen: Dict):
+    """
+    Match an article heading starting at lines[i]. Titles may wrap over a few lines
+    before the "—" that separates them from the body. Returns (number, title, body, next_i) or None.
+    """
+    start = ARTICLE_START.match(lines[i])
+    if not start:
+        return None
+    numeric = int(start.group(1))
+    number = normalize_article_number(start.group(1) + start.group(2))
+    if not last_number <= numeric <= last_number + ARTICLE_NUMBER_GAP or number in seen:
+        return None
+    heading = start.group(3)
+    j = i + 1
+    while "—" not in heading and j < len(lines) and j - i <= TITLE_MAX_LINES:
+        heading += " " + lines[j]
+        j += 1
+    if "—" not in heading:
+        return None
+    title, _, body = heading.partition("—")
+    return number, " ".join(title.split()).strip(" .[]"), body.strip(), j
+
+def parse_constitution(pages: List[str]) -> Dict:
+    """
+    Parse page texts of the India Code constitution PDF into
+    {'parts': {roman: {...}}, 'articles': {number: {...}}, 'schedules': {n: {...}}}.
+    Article starts are accepted only in increasing numeric order, which filters out
+    numbered list items that look like article headings.
+    """
+    parts: Dict[str, Dict] = {}
+    articles: Dict[str, Dict] = {}
+    schedules: Dict[str, Dict] = {}
+
+    lines, line_pages = [], []
+    for page_no, raw in enumerate(pages):
+        if raw.lstrip().startswith("Contents"):
+            continue
+        for line in _clean_page(raw):
+            if line.strip():
+                lines.append(line.strip())
+                line_pages.append(page_no)
+
+    current_part = current_chapter = None
+    current_article = current_schedule = None
+    last_number = 0
+    i = 0
+    while i < len(lines):
+        line, page_no = lines[i], line_pages[i]
+
+        schedule = SCHEDULE_HEADING.match(line)
+        if schedule and last_number >= LAST_ARTICLE:
+            current_article = None
+            n = str(ORDINALS.index(schedule.group(1)) + 1)
+            current_schedule = schedules.setdefault(n, {
+                "number": n, "title": f"{schedule.group(1).title()} Schedule", "page_start": page_no, "lines": []
+            })
+            i += 1
+            continue
+        if current_schedule:
+            current_schedule["lines"].append(line)
+            current_schedule["page_end"] = page_no
+            i += 1
+            continue
+
+        part = PART_HEADING.match(line)
+        if part and i + 1 < len(lines):
+            title, i = lines[i + 1], i + 2
+            while _heading_continuation(lines, i):
+                title, i = f"{title} {lines[i]}", i + 1
+            current_part, current_chapter = part.group(1), None
+            parts.setdefault(current_part, {
+                "number": current_part, "title": _clean_heading(title),
+                "page_start": page_no, "chapters": [], "articles": []
+            })
+            continue
+
+        chapter = CHAPTER_HEADING.match(line)
+        if chapter and current_part:
+            title, i = chapter.group(2).strip(" .—-"), i + 1
+            while _heading_continuation(lines, i):
+                title, i = f"{title} {lines[i]}", i + 1
+            current_chapter = f"Chapter {chapter.group(1)}" + (f" — {_clean_heading(title)}" if title else "")
+            parts[current_part]["chapters"].append({"title": current_chapter, "page_start": page_no})
+            continue
+
+        heading = _article_heading(lines, i, last_number, articles)
+        if heading:
+            number, title, body, i = heading
+            current_article = {
+                "number": number,
+                "title": title,
+                "part": current_part,
+                "chapter": current_chapter,
+                "page_start": page_no,
+                "page_end": page_no,
+                "lines": [body] if body else []
+            }
+            articles[number] = current_article
+            if current_part:
+                parts[current_part]["articles"].append(number)
+            last_number = int(re.match(r"\d+", number).group(0))
+            continue
+
+        if current_article:
+            current_article["lines"].append(line)
+            current_article["page_end"] = page_no
+        i += 1
+
+    for article in articles.values():
+        article["text"] = "\n".join(article.pop("lines")).strip()
+        article["clauses"] = _split_clauses(article["text"])
+    for schedule in schedules.values():
+        schedule["text"] = "\n".join(schedule.pop("lines")).strip()
+    return {"parts": parts, "articles": articles, "schedules": schedules}
+
+def _split_clauses(text: str) -> Dict[str, str]:
+    clauses: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        match = CLAUSE_START.match(line)
+        if match:
+            current = match.group(1)
+            clauses.setdefault(current, [])
+        if current:
+            clauses[current].append(line)
+    return {k: "\n".join(v) for k, v in clauses.items()}
+
+class ConstitutionIndex:
+    """
+    Structured Part -> Chapter -> Article -> clause index of the constitution,
+    persisted at DATA_DIR/constitution_index.json. Lookups are plain dict reads.
+    """
+    _data: Optional[Dict] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def build(cls, pdf_path: str = PDF_PATH, save: bool = True) -> Dict:
+        from pypdf import PdfReader
+        reader = PdfReader(pdf_path)
+        data = parse_constitution([page.extract_text() or "" for page in reader.pages])
+        if save:
+            tmp_path = INDEX_PATH + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, INDEX_PATH)
+        with cls._lock:
+            cls._data = data
+        print(f"Constitution index: {len(data['articles'])} articles, {len(data['parts'])} parts, {len(data['schedules'])} schedules")
+        return data
+
+    @classmethod
+    def load(cls) -> bool:
+        """Load the persisted index, building it from the PDF if it does not exist yet."""
+        if cls._data is not None:
+            return True
+        try:
+            if os.path.exists(INDEX_PATH):
+                with open(INDEX_PATH, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                with cls._lock:
+                    cls._data = data
+                return True
+            if os.path.exists(PDF_PATH):
+                cls.build()
+                return True
+        except Exception as e:
+            print(f"Constitution index unavailable: {e}")
+        return False
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._data is not None
+
+    @classmethod
+    def get_article(cls, number: str) -> Optional[Dict]:
+        if not cls._data:
+            return None
+        return cls._data["articles"].get(normalize_article_number(number))
+
+    @classmethod
+    def get_part(cls, number: str) -> Optional[Dict]:
+        if not cls._data:
+            return None
+        key = number.upper()
+        if key[:2].isdigit() or key[:1].isdigit():
+            digits = re.match(r"\d+", key).group(0)
+            key = int_to_roman(int(digits)) + key[len(digits):]
+        return cls._data["parts"].get(key)
+
+    @classmethod
+    def get_schedule(cls, number: str) -> Optional[Dict]:
+        if not cls._data:
+            return None
+        return cls._data["schedules"].get(str(number))
+
+    @classmethod
+    def stats(cls) -> Dict:
+        if not cls._data:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "articles": len(cls._data["articles"]),
+            "parts": len(cls._data["parts"]),
+            "schedules": len(cls._data["schedules"])
+        }
+
+    @classmethod
+    def resolve(cls, question: str) -> List[Dict]:
+        """Context docs ({'id', 'text'}) for every Article/Part/Schedule referenced in the question."""
+        if not cls._data:
+            return []
+        docs = []
+        for number, clause_refs in ARTICLE_QUERY.findall(question):
+            article = cls.get_article(number)
+            if not article:
+                continue
+            clauses = re.findall(r"\(\s*(\w+)\s*\)", clause_refs)
+            text = article["text"]
+            doc_id = f"article:{article['number']}"
+            if clauses and clauses[0] in article["clauses"]:
+                text = article["clauses"][clauses[0]]
+                doc_id += f"({clauses[0]})"
+            location = f"Part {article['part']}" if article.get("part") else "Constitution of India"
+            if article.get("chapter"):
+                location += f", {article['chapter']}"
+            docs.append({
+                "id": doc_id,
+                "text": f"Article {article['number']} — {article['title']} ({location}):\n{text[:MAX_CONTEXT_CHARS]}"
+            })
+        for number in PART_QUERY.findall(question):
+            part = cls.get_part(number)
+            if not part:
+                continue
+            titles = [f"Article {n}: {cls._data['articles'][n]['title']}" for n in part["articles"]]
+            docs.append({
+                "id": f"part:{part['number']}",
+                "text": f"Part {part['number']} — {part['title']}:\n" + "\n".join(titles)[:MAX_CONTEXT_CHARS]
+            })
+        for ordinal, digits in SCHEDULE_QUERY.findall(question):
+            number = str(ORDINALS.index(ordinal.upper()) + 1) if ordinal else digits
+            schedule = cls.get_schedule(number)
+            if schedule:
+                docs.append({
+                    "id": f"schedule:{number}",
+                    "text": f"{schedule['title']}:\n{schedule['text'][:MAX_CONTEXT_CHARS]}"
+                })
+        return docs
@@ -0,0 +1,108 @@
+import os
+import threading
+from typing import List, Dict, Tuple
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 200  # splitter overlap is 100 chars; leave room for whitespace differences
+
+_encoder = None
+_encoder_loaded = False
+
+# tiktoken (requirements.txt) downloads the encoding on first use and caches it;
+# if it is missing or offline, counts fall back to a chars/4 estimate
+def _get_encoder():
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            print(f"tiktoken unavailable, estimating tokens as chars/4: {e}")
+        _encoder_loaded = True
+    return _encoder
+
+def count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text))
+    return (len(text) + 3) // 4
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoder = _get_encoder()
+    if encoder:
+        return encoder.decode(encoder.encode(text)[:max_tokens])
+    return text[:max_tokens * 4]
+
+def _suffix_prefix_overlap(previous: str, current: str) -> int:
+    """Length of the longest suffix of `previous` that is also a prefix of `current`."""
+    limit = min(len(previous), len(current), MAX_OVERLAP_CHARS)
+    for size in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(current[:size]):
+            return size
+    return 0
+
+def dedupe_chunks(texts: List[str]) -> List[str]:
+    """
+    Drop duplicate or contained chunks and trim the text a chunk shares with an
+    already-kept neighbour (RecursiveCharacterTextSplitter repeats up to 100 chars
+    between consecutive chunks). Order is preserved.
+    """
+    kept: List[str] = []
+    for text in texts:
+        text = text.strip()
+        if not text or any(text in k for k in kept):
+            continue
+        for k in kept:
+            overlap = _suffix_prefix_overlap(k, text)
+            if overlap:
+                text = text[overlap:].strip()
+                break
+        if text:
+            kept.append(text)
+    return kept
+
+def assemble_context(texts: List[str], budget: int = CONTEXT_TOKEN_BUDGET) -> Tuple[str, int]:
+    """
+    Pack ranked context chunks under `budget` tokens, highest-ranked first.
+    The top chunk is truncated rather than dropped if it alone exceeds the budget.
+    Returns (context_text, context_tokens).
+    """
+    packed, used = [], 0
+    for text in dedupe_chunks(texts):
+        tokens = count_tokens(text)
+        if used + tokens > budget:
+            if not packed:
+                text = truncate_to_tokens(text, budget)
+                packed.append(text)
+                used = count_tokens(text)
+            continue
+        packed.append(text)
+        used += tokens
+    return "\n\n".join(packed), used
+
+class ChatUsage:
+    """Running prompt/completion token totals for /admin/metrics."""
+    _lock = threading.Lock()
+    _totals = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "context_tokens": 0}
+
+    @classmethod
+    def record(cls, prompt_tokens: int, completion_tokens: int, context_tokens: int, latency_ms: float):
+        print(f"Chat usage: prompt={prompt_tokens} completion={completion_tokens} "
+              f"context={context_tokens} latency={latency_ms:.0f}ms")
+        with cls._lock:
+            cls._totals["requests"] += 1
+            cls._totals["prompt_tokens"] += prompt_tokens
+            cls._totals["completion_tokens"] += completion_tokens
+            cls._totals["context_tokens"] += context_tokens
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            requests = cls._totals["requests"]
+            return {
+                **cls._totals,
+                "context_token_budget": CONTEXT_TOKEN_BUDGET,
+                "avg_prompt_tokens": round(cls._totals["prompt_tokens"] / requests, 1) if requests else 0.0
+            }
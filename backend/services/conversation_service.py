@@ -0,0 +1,137 @@
+from datetime import datetime
+from typing import List, Dict, Optional
+from pymongo import ReplaceOne, ReturnDocument
+
+from database import conversations_collection, lawyer_chat_collection
+from services.user_loader import UserLoader
+
+class ConversationService:
+    """
+    One summary document per user pair in `conversations`:
+      {_id: "<a>:<b>", participants: [a, b], last_message, last_sender_id, timestamp,
+       unread: {<user_id>: n}, members: {<user_id>: {username, role}}}
+    Maintained on every send/read so the inbox is a single indexed find.
+    """
+
+    @staticmethod
+    def conversation_id(user_a: str, user_b: str) -> str:
+        return ":".join(sorted([user_a, user_b]))
+
+    @staticmethod
+    def record_message(sender: dict, receiver_id: str, message: str, timestamp: datetime):
+        """Atomically bump the pair's summary for a new message from `sender` (a current_user payload)."""
+        sender_id = sender["user_id"]
+        update = {
+            "$set": {
+                "participants": sorted([sender_id, receiver_id]),
+                "last_message": message,
+                "last_sender_id": sender_id,
+                "timestamp": timestamp,
+                f"members.{sender_id}": {"username": sender.get("username"), "role": sender.get("role", "user")}
+            },
+            "$inc": {f"unread.{receiver_id}": 1}
+        }
+        if sender_id != receiver_id:
+            update["$setOnInsert"] = {f"unread.{sender_id}": 0}
+        result = conversations_collection.update_one(
+            {"_id": ConversationService.conversation_id(sender_id, receiver_id)}, update, upsert=True
+        )
+        if result.upserted_id is not None:
+            # First message between the pair: fill in the receiver's display fields once
+            receiver = UserLoader().load_many([receiver_id]).get(receiver_id)
+            if receiver:
+                conversations_collection.update_one(
+                    {"_id": result.upserted_id},
+                    {"$set": {f"members.{receiver_id}": {"username": receiver["username"], "role": receiver.get("role", "user")}}}
+                )
+
+    @staticmethod
+    def mark_read(user_id: str, other_id: str, count: int) -> int:
+        """
+        Take `count` just-read messages off the user's unread counter; returns what is left.
+        Subtracting in one update (rather than resetting to 0) keeps messages that arrived
+        after they were marked read counted.
+        """
+        field = f"unread.{user_id}"
+        conv = conversations_collection.find_one_and_update(
+            {"_id": ConversationService.conversation_id(user_id, other_id)},
+            [{"$set": {field: {"$max": [0, {"$subtract": [{"$ifNull": [f"${field}", 0]}, count]}]}}}],
+            projection={"unread": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return conv.get("unread", {}).get(user_id, 0) if conv else 0
+
+    @staticmethod
+    def get_inbox(user_id: str, limit: int = 100) -> List[Dict]:
+        inbox = []
+        for conv in conversations_collection.find({"participants": user_id}).sort("timestamp", -1).limit(limit):
+            other_id = next((p for p in conv["participants"] if p != user_id), user_id)
+            other = conv.get("members", {}).get(other_id)
+            if not other:
+                continue
+            inbox.append({
+                "other_user_id": other_id,
+                "other_username": other["username"],
+                "other_role": other.get("role", "user"),
+                "last_message": conv["last_message"],
+                "timestamp": conv["timestamp"],
+                "unread_count": conv.get("unread", {}).get(user_id, 0)
+            })
+        return inbox
+
+    @staticmethod
+    def remove_user(user_id: str):
+        conversations_collection.delete_many({"participants": user_id})
+
+    @staticmethod
+    def rebuild() -> Dict:
+        """Recompute every summary from lawyer_chats (backfill / repair)."""
+        pair_key = {"$cond": [
+            {"$lt": ["$sender_id", "$receiver_id"]},
+            {"$concat": ["$sender_id", ":", "$receiver_id"]},
+            {"$concat": ["$receiver_id", ":", "$sender_id"]}
+        ]}
+        latest = lawyer_chat_collection.aggregate([
+            {"$sort": {"timestamp": -1}},
+            {"$group": {
+                "_id": pair_key,
+                "last_message": {"$first": "$message"},
+                "last_sender_id": {"$first": "$sender_id"},
+                "timestamp": {"$first": "$timestamp"}
+            }}
+        ], allowDiskUse=True)
+        unread = {}
+        for row in lawyer_chat_collection.aggregate([
+            {"$match": {"is_read": False}},
+            {"$group": {"_id": {"pair": pair_key, "receiver_id": "$receiver_id"}, "count": {"$sum": 1}}}
+        ], allowDiskUse=True):
+            unread.setdefault(row["_id"]["pair"], {})[row["_id"]["receiver_id"]] = row["count"]
+
+        summaries = list(latest)
+        users = UserLoader(fields=("username", "role")).load_many(
+            uid for s in summaries for uid in s["_id"].split(":")
+        )
+        operations = []
+        for s in summaries:
+            participants = s["_id"].split(":")
+            operations.append(ReplaceOne({"_id": s["_id"]}, {
+                "participants": participants,
+                "last_message": s["last_message"],
+                "last_sender_id": s["last_sender_id"],
+                "timestamp": s["timestamp"],
+                "unread": {p: unread.get(s["_id"], {}).get(p, 0) for p in participants},
+                "members": {
+                    p: {"username": users[p]["username"], "role": users[p].get("role", "user")}
+                    for p in participants if p in users
+                }
+            }, upsert=True))
+        for i in range(0, len(operations), 1000):
+            conversations_collection.bulk_write(operations[i:i + 1000], ordered=False)
+        return {"success": True, "conversations": len(operations)}
+
+    @staticmethod
+    def backfill_missing() -> Optional[Dict]:
+        """Build summaries once for deployments that have messages but no conversations yet."""
+        if conversations_collection.find_one({}, {"_id": 1}) is None and lawyer_chat_collection.find_one({}, {"_id": 1}):
+            return ConversationService.rebuild()
+        return None
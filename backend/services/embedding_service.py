@@ -0,0 +1,227 @@
+import os
+import time
+import queue
+import sqlite3
+import hashlib
+import threading
+from array import array
+from concurrent.futures import Future
+from typing import List, Dict
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.getenv("DATA_DIR", "."), "embedding_cache.sqlite3")
+)
+EMBEDDING_COALESCE_WINDOW_MS = float(os.getenv("EMBEDDING_COALESCE_WINDOW_MS", "10"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_API_BATCH = 256  # texts per direct API call for bulk (ingestion) requests
+
+HISTOGRAM_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """On-disk embedding store keyed by (model, sha256(text)), backed by SQLite."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, h, array("f", vector).tobytes()) for h, vector in items.items()]
+            )
+            self._conn.commit()
+
+class EmbeddingService:
+    """
+    OpenAI embedding client shared by retrieval and ingestion.
+    - Every vector is persisted in EmbeddingCache, so a text is embedded at most once per model.
+    - Small requests (query embeddings) are queued and coalesced by a background thread
+      into one API call per EMBEDDING_COALESCE_WINDOW_MS window.
+    - Bulk requests (ingestion batches) go straight to the API in large batches.
+    """
+    _client = None
+    _cache = None
+    _queue: "queue.Queue" = queue.Queue()
+    _batcher = None
+    _lock = threading.Lock()
+    _stats = {
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "api_calls": 0,
+        "api_texts": 0,
+        "coalesced_requests": 0
+    }
+    _histogram = {bucket: 0 for bucket in HISTOGRAM_BUCKETS + ["inf"]}
+
+    @classmethod
+    def _get_client(cls):
+        if cls._client is None:
+            from openai import OpenAI
+            cls._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return cls._client
+
+    @classmethod
+    def _get_cache(cls) -> EmbeddingCache:
+        with cls._lock:
+            if cls._cache is None:
+                cls._cache = EmbeddingCache(EMBEDDING_CACHE_PATH)
+            return cls._cache
+
+    @classmethod
+    def _record_batch(cls, size: int):
+        with cls._lock:
+            cls._stats["api_calls"] += 1
+            cls._stats["api_texts"] += size
+            bucket = next((b for b in HISTOGRAM_BUCKETS if size <= b), "inf")
+            cls._histogram[bucket] += 1
+
+    @classmethod
+    def _call_api(cls, texts: List[str]) -> List[List[float]]:
+        response = cls._get_client().embeddings.create(model=EMBEDDING_MODEL, input=texts)
+        cls._record_batch(len(texts))
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    @classmethod
+    def _ensure_batcher(cls):
+        with cls._lock:
+            if cls._batcher is None or not cls._batcher.is_alive():
+                cls._batcher = threading.Thread(target=cls._batch_loop, name="embedding-batcher", daemon=True)
+                cls._batcher.start()
+
+    @classmethod
+    def _batch_loop(cls):
+        window = EMBEDDING_COALESCE_WINDOW_MS / 1000
+        while True:
+            batch = [cls._queue.get()]
+            deadline = time.monotonic() + window
+            while len(batch) < EMBEDDING_MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(cls._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            unique = {}
+            for h, text, _ in batch:
+                unique.setdefault(h, text)
+            try:
+                vectors = dict(zip(unique.keys(), cls._call_api(list(unique.values()))))
+                cls._get_cache().put_many(EMBEDDING_MODEL, vectors)
+                for h, _, future in batch:
+                    future.set_result(vectors[h])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+
+    @classmethod
+    def embed(cls, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(t) for t in texts]
+        found = cls._get_cache().get_many(EMBEDDING_MODEL, list(set(hashes)))
+
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in found:
+                missing.setdefault(h, t)
+        with cls._lock:
+            cls._stats["cache_hits"] += len(texts) - sum(1 for h in hashes if h in missing)
+            cls._stats["cache_misses"] += len(missing)
+
+        if len(missing) > EMBEDDING_MAX_BATCH // 2:
+            # Bulk request: already a large batch, coalescing would only add latency
+            items = list(missing.items())
+            for i in range(0, len(items), EMBEDDING_API_BATCH):
+                batch = items[i:i + EMBEDDING_API_BATCH]
+                vectors = dict(zip([h for h, _ in batch], cls._call_api([t for _, t in batch])))
+                cls._get_cache().put_many(EMBEDDING_MODEL, vectors)
+                found.update(vectors)
+        elif missing:
+            cls._ensure_batcher()
+            futures = {}
+            for h, t in missing.items():
+                future = Future()
+                cls._queue.put((h, t, future))
+                futures[h] = future
+            with cls._lock:
+                cls._stats["coalesced_requests"] += len(futures)
+            for h, future in futures.items():
+                found[h] = future.result()
+
+        return [found[h] for h in hashes]
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            lookups = cls._stats["cache_hits"] + cls._stats["cache_misses"]
+            return {
+                **cls._stats,
+                "model": EMBEDDING_MODEL,
+                "hit_rate": round(cls._stats["cache_hits"] / lookups, 4) if lookups else 0.0,
+                "batch_size_histogram": {f"<={b}" if b != "inf" else f">{HISTOGRAM_BUCKETS[-1]}": n for b, n in cls._histogram.items()}
+            }
+
+def chroma_embedding_function():
+    """Wrap EmbeddingService in Chroma's EmbeddingFunction interface (imported lazily; chromadb is optional)."""
+    from chromadb import EmbeddingFunction
+
+    class CachedEmbeddingFunction(EmbeddingFunction):
+        """
+        Reports itself as Chroma's "openai" function with the same model, so collections
+        created with OpenAIEmbeddingFunction open without an embedding-function conflict.
+        """
+
+        def __init__(self):
+            pass
+
+        def __call__(self, input):
+            return EmbeddingService.embed(list(input))
+
+        @staticmethod
+        def name() -> str:
+            return "openai"
+
+        def get_config(self) -> Dict:
+            # Same keys as OpenAIEmbeddingFunction.get_config(), so either class can rebuild the other's config
+            return {"api_key_env_var": "OPENAI_API_KEY", "model_name": EMBEDDING_MODEL}
+
+        @staticmethod
+        def build_from_config(config: Dict) -> "CachedEmbeddingFunction":
+            return CachedEmbeddingFunction()
+
+        def default_space(self) -> str:
+            return "cosine"
+
+        def supported_spaces(self) -> List[str]:
+            return ["cosine", "l2", "ip"]
+
+    return CachedEmbeddingFunction()
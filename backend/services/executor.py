@@ -0,0 +1,23 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded pool for blocking calls (pymongo, GCS, googletrans, gTTS...) made from
+# async route handlers, so they never run on the event loop thread.
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "16"))
+
+# Size of the anyio threadpool FastAPI uses for plain `def` routes and dependencies.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable in the bounded I/O pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+def configure_threadpool():
+    """Cap the threadpool used by sync routes. Must be called from the event loop (startup)."""
+    import anyio.to_thread
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
@@ -1,6 +1,8 @@
 import os
-import time
+import io
 import json
+import threading
+from typing import BinaryIO, Optional
 from google.cloud import storage
 from google.oauth2 import service_account
 
@@ -8,45 +10,63 @@ from google.oauth2 import service_account
 # If GCS_BUCKET_NAME is not set, use a fallback (e.g. for testing)
 DEFAULT_BUCKET_NAME = "constitution-gpt-uploads"
 
+# Files above this size use a chunked resumable upload, so memory per upload stays at one chunk
+GCS_RESUMABLE_THRESHOLD = int(os.getenv("GCS_RESUMABLE_THRESHOLD_MB", "8")) * 1024 * 1024
+# Resumable chunk size; GCS requires a multiple of 256 KB
+GCS_CHUNK_SIZE = max(1, int(os.getenv("GCS_CHUNK_SIZE_MB", "8"))) * 1024 * 1024
+
 class GCSService:
+    """
+    Object storage for BlobStore. One storage.Client (and its authorized HTTP session)
+    is built per process and reused; uploads stream from a file object. Calls block, so
+    async callers go through BlobStore's upload pool.
+    """
+    _client = None
+    _lock = threading.Lock()
 
     @staticmethod
     def get_bucket_name():
         return os.getenv("GCS_BUCKET_NAME", DEFAULT_BUCKET_NAME)
 
-    @staticmethod
-    def upload_file(file_content: bytes, filename: str, content_type: str = None) -> str:
-        """
-        Uploads a file to Google Cloud Storage and returns the public URL.
-        """
-        bucket_name = GCSService.get_bucket_name()
+    @classmethod
+    def get_client(cls) -> storage.Client:
+        with cls._lock:
+            if cls._client is None:
+                # Check if GCP_CREDENTIALS_JSON is set (preferred for Render env vars)
+                credentials_json = os.getenv("GCP_CREDENTIALS_JSON")
+                if credentials_json:
+                    info = json.loads(credentials_json)
+                    credentials = service_account.Credentials.from_service_account_info(info)
+                    cls._client = storage.Client(credentials=credentials, project=info.get("project_id"))
+                else:
+                    # Default: uses GOOGLE_APPLICATION_CREDENTIALS path
+                    cls._client = storage.Client()
+            return cls._client
+
+    @classmethod
+    def upload_object(cls, fileobj: BinaryIO, object_name: str, content_type: str = None,
+                      size: Optional[int] = None, cache_control: Optional[str] = None) -> str:
+        """Uploads to a caller-chosen object name (overwriting it) and returns the public URL."""
+        bucket_name = cls.get_bucket_name()
         
         try:
-            # Check if GCP_CREDENTIALS_JSON is set (preferred for Render env vars)
-            credentials_json = os.getenv("GCP_CREDENTIALS_JSON")
-            
-            if credentials_json:
-                info = json.loads(credentials_json)
-                credentials = service_account.Credentials.from_service_account_info(info)
-                client = storage.Client(credentials=credentials, project=info.get("project_id"))
-            else:
-                # Default: uses GOOGLE_APPLICATION_CREDENTIALS path
-                client = storage.Client()
-                
-            bucket = client.bucket(bucket_name)
-
-            # Generate unique filename to avoid overwrites
-            unique_filename = f"{int(time.time())}_{filename}"
-            blob = bucket.blob(unique_filename)
-
-            # Upload from memory
-            blob.upload_from_string(file_content, content_type=content_type)
+            bucket = cls.get_client().bucket(bucket_name)
+
+            if size is None:
+                fileobj.seek(0, io.SEEK_END)
+                size = fileobj.tell()
+            fileobj.seek(0)
+
+            chunk_size = GCS_CHUNK_SIZE if size > GCS_RESUMABLE_THRESHOLD else None
+            blob = bucket.blob(object_name, chunk_size=chunk_size)
+            if cache_control:
+                blob.cache_control = cache_control
+            blob.upload_from_file(fileobj, size=size, content_type=content_type)
             
             # Since the bucket might not have fine-grained ACLs or public-read by default,
             # this makes the specific blob public if possible, or we just construct the URL.
             # Assuming uniform bucket-level access is configured to allUsers -> Storage Object Viewer
-            public_url = f"https://storage.googleapis.com/{bucket_name}/{unique_filename}"
-            return public_url
+            return cls.public_url(object_name)
 
         except Exception as e:
             import traceback
@@ -55,3 +75,19 @@ class GCSService:
             traceback.print_exc()
             print("="*50 + "\n")
             raise e
+
+    @classmethod
+    def public_url(cls, object_name: str) -> str:
+        return f"https://storage.googleapis.com/{cls.get_bucket_name()}/{object_name}"
+
+    @classmethod
+    def exists(cls, object_name: str) -> bool:
+        return cls.get_client().bucket(cls.get_bucket_name()).blob(object_name).exists()
+
+    @classmethod
+    def delete(cls, object_name: str):
+        from google.api_core.exceptions import NotFound
+        try:
+            cls.get_client().bucket(cls.get_bucket_name()).blob(object_name).delete()
+        except NotFound:
+            pass
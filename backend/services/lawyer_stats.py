@@ -0,0 +1,84 @@
+from typing import Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from database import users_collection, reviews_collection
+
+def normalize_city(city: Optional[str]) -> Optional[str]:
+    """Key the directory filters on, so "  New  Delhi" and "new delhi" match with an exact index seek."""
+    if not city:
+        return None
+    return " ".join(city.split()).casefold() or None
+
+class LawyerStatsService:
+    """
+    Keeps rating_sum / review_count / avg_rating materialized on lawyer user documents
+    so the directory never aggregates raw reviews at read time. city_key (normalize_city)
+    is materialized the same way for the city filter.
+    """
+
+    @staticmethod
+    def record_review(lawyer_id: str, rating: int) -> bool:
+        """Atomically fold one new rating into the lawyer's aggregates. Returns False if no such lawyer."""
+        if not ObjectId.is_valid(lawyer_id):
+            return False
+        # Pipeline update: sum, count and average are recomputed in one atomic write
+        result = users_collection.update_one(
+            {"_id": ObjectId(lawyer_id), "role": "lawyer"},
+            [
+                {"$set": {
+                    "rating_sum": {"$add": [{"$ifNull": ["$rating_sum", 0]}, rating]},
+                    "review_count": {"$add": [{"$ifNull": ["$review_count", 0]}, 1]}
+                }},
+                {"$set": {"avg_rating": {"$divide": ["$rating_sum", "$review_count"]}}}
+            ]
+        )
+        return result.matched_count == 1
+
+    @staticmethod
+    def recompute(lawyer_id: Optional[str] = None) -> dict:
+        """Rebuild the aggregates from reviews_collection, for one lawyer or all of them."""
+        review_match = {"lawyer_id": lawyer_id} if lawyer_id else {}
+        totals = {
+            doc["_id"]: doc
+            for doc in reviews_collection.aggregate([
+                {"$match": review_match},
+                {"$group": {"_id": "$lawyer_id", "rating_sum": {"$sum": "$rating"}, "review_count": {"$sum": 1}}}
+            ])
+        }
+
+        lawyer_match = {"role": "lawyer"}
+        if lawyer_id:
+            lawyer_match["_id"] = ObjectId(lawyer_id)
+        operations = []
+        for lawyer in users_collection.find(lawyer_match, {"_id": 1}):
+            stats = totals.get(str(lawyer["_id"]), {"rating_sum": 0, "review_count": 0})
+            operations.append(UpdateOne({"_id": lawyer["_id"]}, {"$set": {
+                "rating_sum": stats["rating_sum"],
+                "review_count": stats["review_count"],
+                "avg_rating": stats["rating_sum"] / stats["review_count"] if stats["review_count"] else 0.0
+            }}))
+
+        modified = 0
+        for i in range(0, len(operations), 1000):
+            modified += users_collection.bulk_write(operations[i:i + 1000], ordered=False).modified_count
+        return {"success": True, "lawyers": len(operations), "modified": modified}
+
+    @staticmethod
+    def backfill_missing() -> Optional[dict]:
+        """Run a full recompute once if any lawyer predates the materialized fields."""
+        if users_collection.find_one({"role": "lawyer", "review_count": {"$exists": False}}, {"_id": 1}):
+            return LawyerStatsService.recompute()
+        return None
+
+    @staticmethod
+    def backfill_city_keys() -> int:
+        """Set city_key on lawyers that predate it; returns how many were updated."""
+        operations = [
+            UpdateOne({"_id": lawyer["_id"]}, {"$set": {"city_key": normalize_city(lawyer.get("city"))}})
+            for lawyer in users_collection.find({"role": "lawyer", "city_key": {"$exists": False}}, {"city": 1})
+        ]
+        modified = 0
+        for i in range(0, len(operations), 1000):
+            modified += users_collection.bulk_write(operations[i:i + 1000], ordered=False).modified_count
+        return modified
@@ -0,0 +1,172 @@
+import os
+import re
+import math
+import heapq
+import threading
+from collections import Counter
+from typing import List, Dict, Optional
+
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u097F]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "i", "if", "in", "is", "it", "me", "my", "of", "on", "or", "that", "the",
+    "this", "to", "was", "what", "when", "where", "which", "who", "why", "will", "with",
+    "kya", "hai", "ka", "ki", "ke", "mein"
+}
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+class BM25Index:
+    """Incrementally updatable inverted index with Okapi BM25 scoring."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Dict] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id: str, text: str, index_text: Optional[str] = None, metadata: Optional[Dict] = None):
+        """Index `index_text` (defaults to `text`); `text` is what search results return."""
+        terms = Counter(tokenize(index_text if index_text is not None else text))
+        length = sum(terms.values())
+        with self._lock:
+            self.remove(doc_id)
+            self._docs[doc_id] = {"text": text, "terms": terms, "length": length, "metadata": metadata or {}}
+            self._total_length += length
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            if not doc:
+                return
+            self._total_length -= doc["length"]
+            for term in doc["terms"]:
+                posting = self._postings.get(term)
+                if posting is None:
+                    continue
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def remove_where(self, predicate):
+        """Remove every document whose metadata matches predicate(metadata)."""
+        with self._lock:
+            for doc_id in [d for d, doc in self._docs.items() if predicate(doc["metadata"])]:
+                self.remove(doc_id)
+
+    def search(self, query: str, k: int = 3) -> List[Dict]:
+        query_terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs or not query_terms:
+                return []
+            avg_length = self._total_length / n_docs
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._docs[doc_id]["length"] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [
+                {"id": doc_id, "text": self._docs[doc_id]["text"], "score": score, "metadata": self._docs[doc_id]["metadata"]}
+                for doc_id, score in top
+            ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"documents": len(self._docs), "terms": len(self._postings)}
+
+class LexicalIndex:
+    """
+    Process-wide BM25 index over Mongo topics and constitution PDF chunks.
+    Built once at startup and kept in sync by TopicsService add/update/delete,
+    so keyword retrieval never scans the topics collection.
+    """
+    _index = BM25Index()
+    _topics_ready = False
+    _pdfs_ready = False
+
+    @staticmethod
+    def topic_doc_id(topic_id: str) -> str:
+        return f"topic_{topic_id}"
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._topics_ready
+
+    @classmethod
+    def upsert_topic(cls, topic_id: str, title: str, description: str, content: str):
+        cls._index.add(
+            cls.topic_doc_id(topic_id),
+            text=f"{title}: {content}",
+            index_text=f"{title}\n{description}\n{content}",
+            metadata={"source": "topics", "title": title}
+        )
+
+    @classmethod
+    def remove_topic(cls, topic_id: str):
+        cls._index.remove(cls.topic_doc_id(topic_id))
+
+    @classmethod
+    def build_topics(cls):
+        from database import topics_collection
+        cls._index.remove_where(lambda meta: meta.get("source") == "topics")
+        for t in topics_collection.find({}):
+            cls.upsert_topic(str(t["_id"]), t["title"], t.get("description", ""), t["content"])
+        cls._topics_ready = True
+        print(f"Lexical index: {cls._index.stats()['documents']} documents after loading topics.")
+
+    @classmethod
+    def build_pdfs(cls):
+        """Chunk the constitution PDFs into the index (same splitter settings as the vector store)."""
+        if os.getenv("LEXICAL_INDEX_PDFS", "true").lower() != "true":
+            return
+        try:
+            from pypdf import PdfReader
+            from services.rag_service import RAGService
+            splitter = RAGService.get_text_splitter()
+        except ImportError as e:
+            print(f"Lexical index: PDF indexing skipped ({e})")
+            return
+
+        base_path = os.path.join(os.path.dirname(__file__), "..", "constitution_db")
+        for pdf_name in ["constitution_eng.pdf", "constitution_hindi.pdf"]:
+            path = os.path.join(base_path, pdf_name)
+            if not os.path.exists(path):
+                continue
+            try:
+                reader = PdfReader(path)
+                for page_no, page in enumerate(reader.pages):
+                    for chunk in splitter.split_text(page.extract_text() or ""):
+                        cls._index.add(
+                            RAGService.chunk_id(pdf_name, page_no, chunk),
+                            text=chunk,
+                            metadata={"source": pdf_name, "page": page_no}
+                        )
+                print(f"Lexical index: indexed {len(reader.pages)} pages from {pdf_name}")
+            except Exception as e:
+                print(f"Lexical index: failed to index {pdf_name}: {e}")
+        cls._pdfs_ready = True
+
+    @classmethod
+    def search(cls, query: str, k: int = 3) -> List[Dict]:
+        return cls._index.search(query, k)
+
+    @classmethod
+    def stats(cls) -> Dict:
+        return {**cls._index.stats(), "topics_ready": cls._topics_ready, "pdfs_ready": cls._pdfs_ready}
@@ -0,0 +1,70 @@
+import json
+import base64
+from datetime import datetime
+from typing import Optional, Dict, List
+from bson import ObjectId
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(doc: Dict, field: str) -> str:
+    """Opaque cursor for a document's position in a (field, _id) ordering."""
+    value = doc.get(field) if field != "_id" else None
+    payload = {"id": str(doc["_id"])}
+    if isinstance(value, datetime):
+        payload["t"] = value.isoformat()
+    elif value is not None:
+        payload["v"] = value
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Returns (value, ObjectId). Raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = datetime.fromisoformat(payload["t"]) if "t" in payload else payload.get("v")
+        return value, ObjectId(payload["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+def _keyset_filter(field: str, cursor: str, op: str) -> Dict:
+    value, doc_id = decode_cursor(cursor)
+    if field == "_id":
+        return {"_id": {op: doc_id}}
+    # Ties on `field` are broken by _id so no document is skipped or repeated between pages
+    return {"$or": [{field: {op: value}}, {field: value, "_id": {op: doc_id}}]}
+
+def keyset_page(collection, query: Dict, field: str, limit: int = DEFAULT_PAGE_SIZE,
+                before: Optional[str] = None, after: Optional[str] = None,
+                projection: Optional[Dict] = None) -> Dict:
+    """
+    Keyset pagination over (field, _id), newest first.
+      - no cursor: the newest `limit` documents
+      - before: the `limit` documents immediately older than the cursor
+      - after: the `limit` documents immediately newer than the cursor
+    Returns {"items", "has_more", "next_before", "next_after"}; pass next_before to
+    page further back and next_after to poll for newer documents.
+    Cost depends only on `limit`, given an index on (query fields..., field, _id).
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    conditions = [query] if query else []
+    if before:
+        conditions.append(_keyset_filter(field, before, "$lt"))
+    if after:
+        conditions.append(_keyset_filter(field, after, "$gt"))
+    full_query = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+
+    direction = 1 if after and not before else -1
+    sort = [(field, direction)] if field == "_id" else [(field, direction), ("_id", direction)]
+    items: List[Dict] = list(collection.find(full_query, projection).sort(sort).limit(limit + 1))
+    has_more = len(items) > limit
+    items = items[:limit]
+    if direction == 1:
+        items.reverse()
+
+    return {
+        "items": items,
+        "has_more": has_more,
+        "next_before": encode_cursor(items[-1], field) if items and (has_more or direction == 1) else None,
+        "next_after": encode_cursor(items[0], field) if items else after
+    }
@@ -0,0 +1,94 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict
+import bcrypt
+
+# bcrypt cost factor for new hashes; existing hashes with a different cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so one worker per core hashes in parallel without starving request threads
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# Hash/verify jobs allowed to wait or run at once; beyond this requests are shed with 429
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; main.py turns it into a 429."""
+
+class PasswordHasher:
+    """
+    Every bcrypt call goes through a dedicated pool sized to the cores, so a login
+    storm queues here (up to PASSWORD_HASH_MAX_PENDING) instead of tying up the
+    request threadpool. hash()/verify() block the calling thread, so call them from
+    sync routes or through run_blocking.
+    """
+    _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    _pending = 0
+    _lock = threading.Lock()
+    _stats = {"hashed": 0, "verified": 0, "rehashed": 0, "shed": 0}
+
+    @classmethod
+    def _submit(cls, stat: str, func, *args) -> Future:
+        with cls._lock:
+            if cls._pending >= PASSWORD_HASH_MAX_PENDING:
+                cls._stats["shed"] += 1
+                raise PasswordHasherBusy("Password hashing queue is full")
+            # Counted only once admitted, so shed calls don't show up as work done
+            cls._stats[stat] += 1
+            cls._pending += 1
+        future = cls._executor.submit(func, *args)
+        future.add_done_callback(cls._release)
+        return future
+
+    @classmethod
+    def _release(cls, _future):
+        with cls._lock:
+            cls._pending -= 1
+
+    @staticmethod
+    def _hash(password: str) -> bytes:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+    @staticmethod
+    def _verify(password: str, password_hash) -> bool:
+        if isinstance(password_hash, str):
+            password_hash = password_hash.encode('utf-8')
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash)
+        except ValueError:
+            # Malformed stored hash
+            return False
+
+    @classmethod
+    def hash(cls, password: str) -> bytes:
+        return cls._submit("hashed", cls._hash, password).result()
+
+    @classmethod
+    def verify(cls, password: str, password_hash) -> bool:
+        return cls._submit("verified", cls._verify, password, password_hash).result()
+
+    @staticmethod
+    def needs_rehash(password_hash) -> bool:
+        """True if the hash was made with a cost factor other than BCRYPT_ROUNDS."""
+        if isinstance(password_hash, str):
+            password_hash = password_hash.encode('utf-8')
+        try:
+            # $2b$12$<salt+hash>
+            return int(password_hash.split(b"$")[2]) != BCRYPT_ROUNDS
+        except (IndexError, ValueError):
+            return True
+
+    @classmethod
+    def record_rehash(cls):
+        with cls._lock:
+            cls._stats["rehashed"] += 1
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            return {
+                **cls._stats,
+                "pending": cls._pending,
+                "workers": PASSWORD_HASH_WORKERS,
+                "max_pending": PASSWORD_HASH_MAX_PENDING,
+                "rounds": BCRYPT_ROUNDS
+            }
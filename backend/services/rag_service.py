@@ -1,11 +1,21 @@
 import os
-import time
-from typing import List, Dict
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "3"))
+RAG_CANDIDATES = int(os.getenv("RAG_CANDIDATES", "10"))
+RAG_RELATIVE_CUTOFF = float(os.getenv("RAG_RELATIVE_CUTOFF", "0.5"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "15"))
+
+# Runs the vector half of hybrid retrieval while the lexical half runs on the caller's thread
+_search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-search")
 
 class RAGService:
     _collection = None
     _embedding_function = None
     _initialized_chroma = False
+    _text_splitter = None
 
     @classmethod
     def get_collection(cls):
@@ -31,12 +41,10 @@ class RAGService:
 
             if (embedding_mode == "openai" or (embedding_mode == "auto" and openai_key)) and openai_key:
                 try:
+                    from services.embedding_service import chroma_embedding_function
                     print("Attempting to use OpenAI Embeddings (Memory-Efficient Mode)...")
-                    cls._embedding_function = embedding_functions.OpenAIEmbeddingFunction(
-                        api_key=openai_key,
-                        model_name="text-embedding-3-small"
-                    )
-                    # Test if OpenAI key works
+                    cls._embedding_function = chroma_embedding_function()
+                    # Test if OpenAI key works (served from the on-disk cache after the first success)
                     cls._embedding_function(["test"])
                     print("OpenAI Embeddings verified.")
                 except Exception as e:
@@ -69,73 +77,238 @@ class RAGService:
             print(f"ERROR: Error initializing ChromaDB: {e}")
             return None
 
+    @classmethod
+    def get_text_splitter(cls):
+        if cls._text_splitter is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            cls._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=1000,
+                chunk_overlap=100
+            )
+        return cls._text_splitter
+
+    @classmethod
+    def embed_documents(cls, texts: List[str]) -> List[List[float]]:
+        """Embed a batch with the collection's embedding function (raises if vectors are unavailable)."""
+        if not cls.get_collection() or not cls._embedding_function:
+            raise RuntimeError("Vector database is not available")
+        return [[float(x) for x in e] for e in cls._embedding_function(texts)]
+
+    @classmethod
+    def upsert_chunks(cls, ids: List[str], texts: List[str], metadatas: List[Dict], embeddings: Optional[List[List[float]]] = None):
+        collection = cls.get_collection()
+        if not collection:
+            raise RuntimeError("Vector database is not available")
+        collection.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=embeddings)
+
+    @staticmethod
+    def chunk_id(source: str, page, text: str) -> str:
+        """Deterministic ID: same text at the same source/page always maps to the same chunk."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+        return f"{source}:{page if page is not None else '-'}:{digest}"
+
+    @classmethod
+    def build_chunks(cls, documents: List[Dict]) -> List[Dict]:
+        """Split documents into [{'id', 'text', 'metadata'}], dropping duplicate chunks."""
+        text_splitter = cls.get_text_splitter()
+        chunks, seen = [], set()
+        for doc in documents:
+            metadata = doc.get("metadata", {})
+            source = metadata.get("source", "unknown")
+            for text in text_splitter.split_text(doc["content"]):
+                chunk_id = cls.chunk_id(source, metadata.get("page"), text)
+                if chunk_id in seen:
+                    continue
+                seen.add(chunk_id)
+                chunks.append({"id": chunk_id, "text": text, "metadata": metadata})
+        return chunks
+
+    @classmethod
+    def get_existing_ids(cls, source: Optional[str] = None, ids: Optional[List[str]] = None) -> set:
+        """IDs already stored in the collection, filtered by source and/or a candidate ID list."""
+        collection = cls.get_collection()
+        if not collection:
+            return set()
+        kwargs = {"include": []}
+        if source is not None:
+            kwargs["where"] = {"source": source}
+        if ids is not None:
+            if not ids:
+                return set()
+            kwargs["ids"] = ids
+        return set(collection.get(**kwargs)["ids"])
+
+    @classmethod
+    def delete_chunks(cls, ids: List[str], batch_size: int = 500):
+        collection = cls.get_collection()
+        if not collection:
+            return
+        for i in range(0, len(ids), batch_size):
+            collection.delete(ids=ids[i:i + batch_size])
+
+    @classmethod
+    def _upsert_new_chunks(cls, chunks: List[Dict], batch_size: int) -> int:
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            cls.upsert_chunks(
+                ids=[c["id"] for c in batch],
+                texts=[c["text"] for c in batch],
+                metadatas=[c["metadata"] for c in batch]
+            )
+        return len(chunks)
+
     @classmethod
     def add_documents(cls, documents: List[Dict[str, str]], batch_size: int = 20):
         """
         Expects a list of dicts with 'content' and 'metadata'.
         Processed in small batches to prevent memory spikes.
+        Chunks that are already stored are skipped, so re-running is idempotent.
         """
         collection = cls.get_collection()
         if not collection:
             return
         
         try:
-            from langchain_text_splitters import RecursiveCharacterTextSplitter
-            
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=100
-            )
-            
             # Process documents one by one to avoid massive list building
             for doc in documents:
-                chunks = text_splitter.split_text(doc["content"])
-                source = doc.get("metadata", {}).get("source", "unknown")
-                
-                # Add chunks for this document in small batches
-                for i in range(0, len(chunks), batch_size):
-                    end = min(i + batch_size, len(chunks))
-                    batch_texts = chunks[i:end]
-                    batch_ids = [f"{source}_{int(time.time())}_{i+j}" for j in range(len(batch_texts))]
-                    batch_metadatas = [doc.get("metadata", {}) for _ in range(len(batch_texts))]
-                    
-                    collection.add(
-                        ids=batch_ids,
-                        documents=batch_texts,
-                        metadatas=batch_metadatas
-                    )
+                chunks = cls.build_chunks([doc])
+                existing = cls.get_existing_ids(ids=[c["id"] for c in chunks])
+                new_chunks = [c for c in chunks if c["id"] not in existing]
+                cls._upsert_new_chunks(new_chunks, batch_size)
                 
-                print(f"Indexed {len(chunks)} chunks from {source}")
+                source = doc.get("metadata", {}).get("source", "unknown")
+                print(f"Indexed {len(new_chunks)} new chunks from {source} ({len(chunks) - len(new_chunks)} unchanged)")
                 
         except Exception as e:
             print(f"Failed to add documents to Chroma: {e}")
 
     @classmethod
-    def query(cls, query_text: str, n_results: int = 3) -> List[str]:
-        # Try vector search first
+    def reindex_source(cls, source: str, documents: List[Dict], batch_size: int = 20) -> Dict:
+        """
+        Incremental re-index of everything stored under metadata.source == source:
+        embeds only chunks that are not stored yet and deletes stored chunks that no
+        longer exist in `documents`. An unchanged corpus costs zero embedding calls.
+        """
+        if not cls.get_collection():
+            return {"added": 0, "deleted": 0, "unchanged": 0}
+
+        chunks = cls.build_chunks(documents)
+        desired = {c["id"] for c in chunks}
+        existing = cls.get_existing_ids(source=source)
+
+        added = cls._upsert_new_chunks([c for c in chunks if c["id"] not in existing], batch_size)
+        stale = sorted(existing - desired)
+        cls.delete_chunks(stale)
+
+        stats = {"added": added, "deleted": len(stale), "unchanged": len(desired & existing)}
+        print(f"Re-indexed {source}: {stats}")
+        return stats
+
+    @classmethod
+    def _vector_search(cls, query_text: str, k: int) -> List[Dict]:
         collection = cls.get_collection()
-        if collection:
-            try:
-                results = collection.query(
-                    query_texts=[query_text],
-                    n_results=n_results
-                )
-                if results and results["documents"] and results["documents"][0]:
-                    return results["documents"][0]
-            except Exception as e:
-                print(f"Chroma query error: {e}")
-
-        # Keyword Fallback using TopicsService (Free/Local)
+        if not collection:
+            return []
+        try:
+            results = collection.query(
+                query_texts=[query_text],
+                n_results=k
+            )
+            if results and results["documents"] and results["documents"][0]:
+                return [
+                    {"id": chunk_id, "text": text}
+                    for chunk_id, text in zip(results["ids"][0], results["documents"][0])
+                ]
+        except Exception as e:
+            print(f"Chroma query error: {e}")
+        return []
+
+    @classmethod
+    def _lexical_search(cls, query_text: str, k: int) -> List[Dict]:
+        # In-memory BM25 over topics and PDF chunks (no Mongo round trip)
+        try:
+            from services.lexical_index import LexicalIndex
+            if LexicalIndex.is_ready():
+                return [
+                    {"id": hit["id"], "text": hit["text"]}
+                    for hit in LexicalIndex.search(query_text, k)
+                ]
+        except Exception as e:
+            print(f"Lexical search error: {e}")
+
+        # Last resort while the lexical index is still building
         try:
             from services.topics_service import TopicsService
             topics = TopicsService.search_topics(query_text)
-            if topics:
-                return [f"{t['title']}: {t['content']}" for t in topics[:n_results]]
+            return [
+                {"id": f"topic_{t['id']}", "text": f"{t['title']}: {t['content']}"}
+                for t in topics[:k]
+            ]
         except Exception as e:
             print(f"Fallback search error: {e}")
-            
         return []
 
+    @classmethod
+    def retrieve(cls, query_text: str, n_results: Optional[int] = None) -> List[Dict]:
+        """
+        Like query(), but returns [{'id': ..., 'text': ...}] so callers can key on the chunks used.
+
+        RETRIEVAL_MODE=hybrid (default) runs vector and lexical search concurrently,
+        fuses them with reciprocal-rank fusion and reranks locally within
+        RERANK_BUDGET_MS. 'vector' keeps the old vector-first behaviour with the
+        lexical index as fallback; 'lexical' skips the vector store entirely.
+
+        Questions naming an Article, Part or Schedule ("Article 21", "Part III")
+        are answered from ConstitutionIndex directly and skip similarity search.
+        """
+        from services.retrieval_fusion import reciprocal_rank_fusion, rerank
+        from services.constitution_index import ConstitutionIndex
+
+        n_results = n_results or RAG_TOP_K
+        direct = ConstitutionIndex.resolve(query_text)
+        if direct:
+            return direct[:n_results]
+
+        mode = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+        candidates = max(n_results, RAG_CANDIDATES)
+
+        if mode == "vector":
+            return cls._vector_search(query_text, n_results) or cls._lexical_search(query_text, n_results)
+
+        if mode == "lexical" or not cls.get_collection():
+            ranked = [cls._lexical_search(query_text, candidates)]
+        else:
+            vector_future = _search_pool.submit(cls._vector_search, query_text, candidates)
+            lexical_results = cls._lexical_search(query_text, candidates)
+            ranked = [vector_future.result(), lexical_results]
+
+        reranked = rerank(query_text, reciprocal_rank_fusion(ranked), budget_ms=RERANK_BUDGET_MS)
+        if not reranked:
+            return []
+
+        # Drop weak tail chunks: fewer, better chunks means a smaller prompt for Groq
+        cutoff = reranked[0]["score"] * RAG_RELATIVE_CUTOFF
+        return [
+            {"id": doc["id"], "text": doc["text"]}
+            for doc in reranked[:n_results]
+            if doc["score"] >= cutoff
+        ]
+
+    @classmethod
+    def query(cls, query_text: str, n_results: Optional[int] = None) -> List[str]:
+        return [doc["text"] for doc in cls.retrieve(query_text, n_results)]
+
+    @classmethod
+    def embed_query(cls, text: str) -> Optional[List[float]]:
+        """Embed a single string with the active embedding function, or None if vectors are unavailable."""
+        if not cls.get_collection() or not cls._embedding_function:
+            return None
+        try:
+            return [float(x) for x in cls._embedding_function([text])[0]]
+        except Exception as e:
+            print(f"Query embedding error: {e}")
+            return None
+
     @classmethod
     def initialize_with_topics(cls):
         """Seed the vector DB with constitutional data if empty."""
@@ -149,13 +322,9 @@ class RAGService:
 
         try:
             from database import topics_collection
-            if collection.count() > 0:
-                print("RAG database already contains data. Skipping initial seed.")
-                return
+            already_seeded = collection.count() > 0
             
-            print("Seeding RAG database with initial data...")
-            
-            # 1. Seed from MongoDB topics
+            # 1. Sync MongoDB topics (incremental: unchanged topics cost no embedding calls)
             topics = list(topics_collection.find({}))
             docs_to_add = [
                 {
@@ -164,9 +333,13 @@ class RAGService:
                 }
                 for t in topics
             ]
+            cls.reindex_source("default_topics", docs_to_add)
+
+            if already_seeded:
+                print("RAG database already contains data. Skipping PDF seed.")
+                return
             
-            if docs_to_add:
-                cls.add_documents(docs_to_add)
+            print("Seeding RAG database with initial data...")
                 
             # 2. Automatically try to ingest PDFs if they exist
             cls._auto_ingest_pdfs()
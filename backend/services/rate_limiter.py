@@ -0,0 +1,214 @@
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Tuple, Optional
+from fastapi import HTTPException, Request
+
+# memory (per worker) | mongo | redis (shared across workers)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = "constitutiongpt:ratelimit:"
+# Hard cap on tracked keys per limit for the memory backend; idle keys are evicted long before this
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+class MemoryBackend:
+    """
+    Per-process counters. Each limit keeps one OrderedDict of key -> [window, current, previous]
+    in least-recently-used order, so idle keys are always at the front and evicted in O(1).
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._counters: Dict[str, OrderedDict] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        with self._lock:
+            counters = self._counters.setdefault(name, OrderedDict())
+            entry = counters.get(key)
+            if entry is None:
+                entry = counters[key] = [window, 0, 0]
+            elif entry[0] != window:
+                # Roll forward: the old current window becomes the previous one if it is adjacent
+                entry[2] = entry[1] if entry[0] == window - 1 else 0
+                entry[1] = 0
+                entry[0] = window
+            entry[1] += 1
+            counters.move_to_end(key)
+            self._evict(counters, window)
+            return entry[2], entry[1]
+
+    def decrement(self, name: str, key: str, window: int):
+        with self._lock:
+            entry = self._counters.get(name, {}).get(key)
+            if entry and entry[0] == window and entry[1] > 0:
+                entry[1] -= 1
+
+    def _evict(self, counters: OrderedDict, window: int):
+        # Keys not seen in the current or previous window no longer affect any decision
+        while counters:
+            oldest_key, oldest = next(iter(counters.items()))
+            if oldest[0] >= window - 1 and len(counters) <= self.max_keys:
+                break
+            del counters[oldest_key]
+
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(c) for c in self._counters.values())
+
+class MongoBackend:
+    """Shared counters in `rate_limits`: one document per (limit, key, window), expired by a TTL index."""
+
+    def __init__(self):
+        from database import rate_limits_collection
+        self._collection = rate_limits_collection
+
+    def increment(self, name: str, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        from pymongo import ReturnDocument
+        expires_at = datetime.utcfromtimestamp((window + 2) * window_seconds)
+        current = self._collection.find_one_and_update(
+            {"_id": f"{name}:{key}:{window}"},
+            {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        previous = self._collection.find_one({"_id": f"{name}:{key}:{window - 1}"}, {"count": 1})
+        return (previous or {}).get("count", 0), current["count"]
+
+    def decrement(self, name: str, key: str, window: int):
+        self._collection.update_one({"_id": f"{name}:{key}:{window}"}, {"$inc": {"count": -1}})
+
+class RedisBackend:
+    """Shared counters in Redis: INCR on a per-window key that expires after the following window."""
+
+    def __init__(self, url: str = REDIS_URL):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._client.ping()
+
+    def increment(self, name: str, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        current_key = f"{REDIS_KEY_PREFIX}{name}:{key}:{window}"
+        pipe = self._client.pipeline()
+        pipe.incr(current_key)
+        pipe.expire(current_key, window_seconds * 2)
+        pipe.get(f"{REDIS_KEY_PREFIX}{name}:{key}:{window - 1}")
+        current, _, previous = pipe.execute()
+        return int(previous or 0), int(current)
+
+    def decrement(self, name: str, key: str, window: int):
+        self._client.decr(f"{REDIS_KEY_PREFIX}{name}:{key}:{window}")
+
+class RateLimiter:
+    """
+    Sliding-window counter: the count for the current fixed window plus the previous
+    window's count weighted by how much of it still overlaps the sliding window.
+    Two integers per key, whatever the request rate.
+    """
+    _backend = None
+    _backend_lock = threading.Lock()
+    _stats = {"allowed": 0, "rejected": 0, "errors": 0}
+    _stats_lock = threading.Lock()
+
+    def __init__(self, name: str, limit: int, window_seconds: int,
+                 detail: str = "Too many requests. Please try again later."):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.detail = detail
+
+    @classmethod
+    def _count(cls, stat: str):
+        # hit() runs on many threadpool threads at once
+        with cls._stats_lock:
+            cls._stats[stat] += 1
+
+    @classmethod
+    def backend(cls):
+        if cls._backend is None:
+            with cls._backend_lock:
+                if cls._backend is None:
+                    cls._backend = cls._create_backend()
+        return cls._backend
+
+    @staticmethod
+    def _create_backend():
+        try:
+            if RATE_LIMIT_BACKEND == "redis":
+                backend = RedisBackend()
+                print(f"Rate limiter: using Redis at {REDIS_URL}")
+                return backend
+            if RATE_LIMIT_BACKEND == "mongo":
+                backend = MongoBackend()
+                print("Rate limiter: using MongoDB")
+                return backend
+        except Exception as e:
+            print(f"Rate limiter: {RATE_LIMIT_BACKEND} backend unavailable ({e}); falling back to per-process counters")
+        return MemoryBackend()
+
+    def hit(self, key: str, now: Optional[float] = None) -> Tuple[bool, int]:
+        """Count one request for `key`. Returns (allowed, retry_after_seconds)."""
+        now = time.time() if now is None else now
+        window = int(now // self.window_seconds)
+        elapsed = now - window * self.window_seconds
+        backend = self.backend()
+        try:
+            previous, current = backend.increment(self.name, key, window, self.window_seconds)
+        except Exception as e:
+            # Fail open: a broken counter store must not take the API down with it
+            print(f"Rate limiter error ({self.name}): {e}")
+            self._count("errors")
+            return True, 0
+
+        estimate = previous * (self.window_seconds - elapsed) / self.window_seconds + current
+        if estimate <= self.limit:
+            self._count("allowed")
+            return True, 0
+
+        # Rejected requests are not counted, so a client that backs off is not penalised further
+        try:
+            backend.decrement(self.name, key, window)
+        except Exception as e:
+            print(f"Rate limiter error ({self.name}): {e}")
+        self._count("rejected")
+        return False, max(1, math.ceil(self.window_seconds - elapsed))
+
+    def check(self, key: str):
+        """hit() that raises 429 with a Retry-After header when the limit is exceeded."""
+        allowed, retry_after = self.hit(key)
+        if not allowed:
+            raise HTTPException(status_code=429, detail=self.detail, headers={"Retry-After": str(retry_after)})
+
+    @classmethod
+    def stats(cls) -> Dict:
+        backend = cls._backend
+        with cls._stats_lock:
+            counts = dict(cls._stats)
+        return {
+            **counts,
+            "backend": type(backend).__name__ if backend else None,
+            "tracked_keys": backend.size() if isinstance(backend, MemoryBackend) else None
+        }
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+def rate_limit(name: str, limit: int, window_seconds: int, key=client_ip,
+               detail: str = "Too many requests. Please try again later."):
+    """
+    Dependency factory for per-route limits. `key` is itself a dependency returning the
+    identity to count against (client IP by default):
+
+        @app.post("/login", dependencies=[Depends(rate_limit("login", 10, 60))])
+    """
+    from fastapi import Depends
+    limiter = RateLimiter(name, limit, window_seconds, detail)
+
+    # Sync so the Mongo/Redis round trip runs in the threadpool, not on the event loop
+    def dependency(identity: str = Depends(key)):
+        limiter.check(identity)
+
+    dependency.limiter = limiter
+    return dependency
@@ -0,0 +1,161 @@
+import os
+import json
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, Set, Optional
+
+REALTIME_BROKER = os.getenv("REALTIME_BROKER", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_CHANNEL_PREFIX = "constitutiongpt:user:"
+CONNECTION_QUEUE_SIZE = 100
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class InProcessBroker:
+    """Single-worker fan-out: publish delivers straight to this process's connections."""
+
+    def __init__(self, deliver):
+        self._deliver = deliver
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, user_id: str, payload: str):
+        self._deliver(user_id, payload)
+
+class RedisBroker:
+    """
+    Multi-worker fan-out over Redis pub/sub: every worker publishes to the user's
+    channel and a listener task in each worker delivers to its own connections.
+    """
+
+    def __init__(self, deliver, url: str = REDIS_URL):
+        import redis
+        import redis.asyncio as redis_async
+        self._deliver = deliver
+        self._publisher = redis.Redis.from_url(url)
+        self._subscriber = redis_async.Redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        pubsub = self._subscriber.pubsub()
+        await pubsub.psubscribe(f"{REDIS_CHANNEL_PREFIX}*")
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub):
+        async for message in pubsub.listen():
+            if message.get("type") != "pmessage":
+                continue
+            channel = message["channel"].decode("utf-8")
+            self._deliver(channel[len(REDIS_CHANNEL_PREFIX):], message["data"].decode("utf-8"))
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        await self._subscriber.close()
+
+    def publish(self, user_id: str, payload: str):
+        # Sync client: publish is called from threadpool routes as well as the event loop
+        self._publisher.publish(f"{REDIS_CHANNEL_PREFIX}{user_id}", payload)
+
+class RealtimeService:
+    """
+    Pushes events (new messages, read receipts, notifications) to users connected on /ws.
+    publish() is safe to call from sync routes running in the threadpool.
+    """
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _broker = None
+    _connections: Dict[str, Set[asyncio.Queue]] = {}
+    _lock = threading.Lock()
+    _stats = {"published": 0, "delivered": 0, "dropped": 0}
+
+    @classmethod
+    async def start(cls):
+        cls._loop = asyncio.get_running_loop()
+        if REALTIME_BROKER == "redis":
+            try:
+                cls._broker = RedisBroker(cls._deliver)
+                await cls._broker.start()
+                print(f"Realtime: using Redis broker at {REDIS_URL}")
+                return
+            except Exception as e:
+                print(f"Realtime: Redis broker unavailable ({e}); falling back to in-process delivery")
+        cls._broker = InProcessBroker(cls._deliver)
+        await cls._broker.start()
+
+    @classmethod
+    async def stop(cls):
+        if cls._broker:
+            await cls._broker.stop()
+
+    @classmethod
+    def connect(cls, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=CONNECTION_QUEUE_SIZE)
+        with cls._lock:
+            cls._connections.setdefault(user_id, set()).add(queue)
+        return queue
+
+    @classmethod
+    def disconnect(cls, user_id: str, queue: asyncio.Queue):
+        with cls._lock:
+            queues = cls._connections.get(user_id)
+            if queues:
+                queues.discard(queue)
+                if not queues:
+                    del cls._connections[user_id]
+
+    @classmethod
+    def publish(cls, user_id: str, event: str, data: dict):
+        if not cls._broker:
+            return
+        payload = json.dumps({"type": event, "data": data}, default=_json_default)
+        try:
+            cls._broker.publish(str(user_id), payload)
+            with cls._lock:
+                cls._stats["published"] += 1
+        except Exception as e:
+            # Realtime delivery is best-effort; clients resync through the REST endpoints
+            print(f"Realtime publish error: {e}")
+
+    @classmethod
+    def _deliver(cls, user_id: str, payload: str):
+        """Hand a payload to every local connection of user_id. Callable from any thread."""
+        with cls._lock:
+            queues = list(cls._connections.get(user_id, ()))
+        if not queues or not cls._loop:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for queue in queues:
+            if running is cls._loop:
+                cls._enqueue(queue, payload)
+            else:
+                cls._loop.call_soon_threadsafe(cls._enqueue, queue, payload)
+
+    @classmethod
+    def _enqueue(cls, queue: asyncio.Queue, payload: str):
+        try:
+            queue.put_nowait(payload)
+            cls._stats["delivered"] += 1
+        except asyncio.QueueFull:
+            # A stalled client must not grow memory without bound
+            cls._stats["dropped"] += 1
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            return {
+                **cls._stats,
+                "broker": type(cls._broker).__name__ if cls._broker else None,
+                "connected_users": len(cls._connections),
+                "connections": sum(len(q) for q in cls._connections.values())
+            }
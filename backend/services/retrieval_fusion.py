@@ -0,0 +1,80 @@
+import re
+import time
+import hashlib
+from typing import List, Dict
+
+from services.lexical_index import tokenize
+
+ARTICLE_REF_PATTERN = re.compile(r"\b(?:article|art\.?|anuchhed)\s*(\d{1,3}[A-Z]{0,2})\b", re.IGNORECASE)
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict]], k: int = 60) -> List[Dict]:
+    """
+    Fuse ranked lists of {'id', 'text'} with RRF: score = sum(1 / (k + rank)).
+    Documents are matched across lists by normalized text, so the same chunk
+    coming back from vector and lexical search is counted once.
+    """
+    fused: Dict[str, Dict] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = _text_key(doc["text"])
+            entry = fused.setdefault(key, {"id": doc["id"], "text": doc["text"], "fusion_score": 0.0})
+            entry["fusion_score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda d: d["fusion_score"], reverse=True)
+
+def extract_article_refs(text: str) -> List[str]:
+    return [ref.upper() for ref in ARTICLE_REF_PATTERN.findall(text)]
+
+def _proximity(query_terms: set, doc_terms: List[str]) -> float:
+    """matched_terms / length of the smallest window containing every matched term."""
+    positions = [(i, t) for i, t in enumerate(doc_terms) if t in query_terms]
+    matched = {t for _, t in positions}
+    if len(matched) < 2:
+        return 1.0 if matched else 0.0
+    best = len(doc_terms)
+    counts: Dict[str, int] = {}
+    left = 0
+    for right, (pos, term) in enumerate(positions):
+        counts[term] = counts.get(term, 0) + 1
+        while len(counts) == len(matched):
+            best = min(best, pos - positions[left][0] + 1)
+            left_term = positions[left][1]
+            counts[left_term] -= 1
+            if not counts[left_term]:
+                del counts[left_term]
+            left += 1
+    return len(matched) / best
+
+def rerank(query: str, candidates: List[Dict], budget_ms: float = 15.0) -> List[Dict]:
+    """
+    Cheap local rerank of fused candidates: exact article-number match boost,
+    query-term coverage and term proximity on top of the normalized fusion score.
+    Candidates not reached within budget_ms keep their fusion score only.
+    """
+    if not candidates:
+        return []
+    started = time.perf_counter()
+    query_terms = set(tokenize(query))
+    article_refs = extract_article_refs(query)
+    top_fusion = candidates[0]["fusion_score"] or 1.0
+
+    for doc in candidates:
+        base = doc["fusion_score"] / top_fusion
+        if (time.perf_counter() - started) * 1000 > budget_ms:
+            doc["score"] = base
+            continue
+        doc_terms = tokenize(doc["text"])
+        coverage = len(query_terms & set(doc_terms)) / len(query_terms) if query_terms else 0.0
+        article_boost = 0.0
+        for ref in article_refs:
+            # Article headings look like "21. Protection of life..." or "21A. Right to education"
+            if re.search(rf"(?:^|\n)\s*\[?{re.escape(ref)}\.\s", doc["text"], re.IGNORECASE):
+                article_boost = 1.0
+                break
+            if re.search(rf"\barticle\s+{re.escape(ref)}\b", doc["text"], re.IGNORECASE):
+                article_boost = max(article_boost, 0.5)
+        doc["score"] = base + 0.3 * coverage + 0.2 * _proximity(query_terms, doc_terms) + 0.5 * article_boost
+
+    return sorted(candidates, key=lambda d: d["score"], reverse=True)
@@ -0,0 +1,274 @@
+import os
+import sys
+import math
+import struct
+import asyncio
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+
+from services.executor import run_blocking
+
+STT_WORKERS = int(os.getenv("STT_WORKERS", "4"))
+# 16-bit RMS below which a frame counts as silence
+STT_SILENCE_RMS = int(os.getenv("STT_SILENCE_RMS", "500"))
+# A pause this long ends a segment
+STT_SILENCE_MS = int(os.getenv("STT_SILENCE_MS", "700"))
+# Segments are cut here even without a pause, which bounds memory per stream
+STT_MAX_SEGMENT_SECONDS = int(os.getenv("STT_MAX_SEGMENT_SECONDS", "15"))
+STT_MIN_SPEECH_MS = 250  # shorter bursts (clicks, breaths) are dropped
+STT_PREROLL_MS = 200  # silence kept before speech so word onsets aren't clipped
+# Largest stream the endpoints accept; 50 MB is about 27 minutes of 16 kHz mono PCM
+STT_MAX_STREAM_MB = int(os.getenv("STT_MAX_STREAM_MB", "50"))
+STT_MAX_PENDING_SEGMENTS = 4  # segments awaiting recognition before we stop reading input
+FRAME_MS = 30
+
+_executor = ThreadPoolExecutor(max_workers=STT_WORKERS, thread_name_prefix="stt")
+
+class AudioFormatError(ValueError):
+    pass
+
+class StreamTooLargeError(ValueError):
+    pass
+
+async def limit_stream(chunks: AsyncIterator[bytes], max_bytes: int = STT_MAX_STREAM_MB * 1024 * 1024) -> AsyncIterator[bytes]:
+    """Pass chunks through, raising StreamTooLargeError once more than `max_bytes` have arrived."""
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_bytes:
+            raise StreamTooLargeError(f"Audio stream exceeds {max_bytes // (1024 * 1024)} MB")
+        yield chunk
+
+class WavStreamParser:
+    """
+    Incremental WAV reader: buffers only until the `data` chunk starts, then passes
+    PCM through. The data chunk size is ignored so streaming writers (size 0 or
+    0xFFFFFFFF) work too.
+    """
+
+    def __init__(self):
+        self._header = bytearray()
+        self.sample_rate: Optional[int] = None
+        self.channels: Optional[int] = None
+        self.in_data = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self.in_data:
+            return chunk
+        self._header += chunk
+        if len(self._header) < 12:
+            return b""
+        if self._header[:4] != b"RIFF" or self._header[8:12] != b"WAVE":
+            raise AudioFormatError("Expected a WAV (RIFF/WAVE) stream")
+        pos = 12
+        while len(self._header) >= pos + 8:
+            chunk_id, size = self._header[pos:pos + 4], struct.unpack("<I", self._header[pos + 4:pos + 8])[0]
+            if chunk_id == b"data":
+                if self.sample_rate is None:
+                    raise AudioFormatError("WAV stream has no fmt chunk before its data")
+                self.in_data = True
+                rest = bytes(self._header[pos + 8:])
+                self._header = bytearray()
+                return rest
+            if len(self._header) < pos + 8 + size:
+                return b""
+            if chunk_id == b"fmt ":
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", self._header[pos + 8:pos + 24])
+                if audio_format != 1 or bits != 16:
+                    raise AudioFormatError("Only 16-bit PCM WAV is supported")
+                self.sample_rate, self.channels = sample_rate, channels
+            pos += 8 + size + (size & 1)  # chunks are word-aligned
+        return b""
+
+class SilenceSegmenter:
+    """Cuts a 16-bit PCM stream into utterances at pauses, using per-frame RMS."""
+
+    def __init__(self, sample_rate: int, channels: int = 1):
+        if channels not in (1, 2):
+            raise AudioFormatError("Only mono or stereo audio is supported")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_bytes = int(sample_rate * FRAME_MS / 1000) * 2 * channels
+        self.max_segment_bytes = STT_MAX_SEGMENT_SECONDS * sample_rate * 2
+        self._pending = bytearray()
+        self._preroll = deque(maxlen=max(1, STT_PREROLL_MS // FRAME_MS))
+        self._segment: Optional[bytearray] = None
+        self._speech_frames = 0
+        self._silent_frames = 0
+        self._position_ms = 0
+        self._segment_start_ms = 0
+
+    def _mono(self, frame: bytes) -> array:
+        samples = array("h", frame)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        if self.channels == 2:
+            samples = array("h", ((samples[i] + samples[i + 1]) // 2 for i in range(0, len(samples) - 1, 2)))
+        return samples
+
+    def feed(self, pcm: bytes) -> List[Dict]:
+        """Returns the segments completed by this chunk: [{"pcm", "start_ms", "end_ms"}]."""
+        self._pending += pcm
+        segments = []
+        while len(self._pending) >= self.frame_bytes:
+            frame = self._mono(bytes(self._pending[:self.frame_bytes]))
+            del self._pending[:self.frame_bytes]
+            segment = self._process(frame)
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def _process(self, samples: array) -> Optional[Dict]:
+        rms = math.sqrt(sum(s * s for s in samples) / len(samples)) if samples else 0
+        frame = samples.tobytes()
+        self._position_ms += FRAME_MS
+        loud = rms >= STT_SILENCE_RMS
+
+        if self._segment is None:
+            if not loud:
+                self._preroll.append(frame)
+                return None
+            self._segment = bytearray(b"".join(self._preroll))
+            self._segment_start_ms = self._position_ms - FRAME_MS * (len(self._preroll) + 1)
+            self._preroll.clear()
+
+        self._segment += frame
+        if loud:
+            self._speech_frames += 1
+            self._silent_frames = 0
+        else:
+            self._silent_frames += 1
+        if self._silent_frames * FRAME_MS >= STT_SILENCE_MS or len(self._segment) >= self.max_segment_bytes:
+            return self._emit()
+        return None
+
+    def _emit(self) -> Optional[Dict]:
+        segment, speech_ms = self._segment, self._speech_frames * FRAME_MS
+        self._segment, self._speech_frames, self._silent_frames = None, 0, 0
+        if segment is None or speech_ms < STT_MIN_SPEECH_MS:
+            return None
+        return {"pcm": bytes(segment), "start_ms": self._segment_start_ms, "end_ms": self._position_ms}
+
+    def finish(self) -> List[Dict]:
+        segment = self._emit()
+        return [segment] if segment else []
+
+def recognize_segment(pcm: bytes, sample_rate: int, lang: str) -> str:
+    import speech_recognition as sr
+    try:
+        return sr.Recognizer().recognize_google(sr.AudioData(pcm, sample_rate, 2), language=lang)
+    except sr.UnknownValueError:
+        return ""
+
+async def transcribe_stream(chunks: AsyncIterator[bytes], sample_rate: Optional[int] = None,
+                            channels: int = 1, lang: str = "en-US") -> AsyncIterator[Dict]:
+    """
+    Transcribe an audio byte stream incrementally. WAV is detected from its header;
+    anything else is raw 16-bit little-endian PCM at `sample_rate`.
+    Yields {"index", "text", "start_ms", "end_ms"} per recognised segment, in order.
+    Segments are recognised in parallel on the STT pool; reading input pauses while
+    STT_MAX_PENDING_SEGMENTS are in flight, so memory stays bounded for any length.
+    """
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Queue = asyncio.Queue()
+    in_flight = asyncio.Semaphore(STT_MAX_PENDING_SEGMENTS)
+
+    async def submit(segment: Dict, segmenter: SilenceSegmenter):
+        await in_flight.acquire()
+        future = loop.run_in_executor(_executor, recognize_segment, segment["pcm"], segmenter.sample_rate, lang)
+        pending.put_nowait((segment, future))
+
+    async def produce():
+        parser, segmenter = None, None
+        try:
+            async for chunk in chunks:
+                if parser is None and segmenter is None:
+                    parser = WavStreamParser() if chunk[:4] == b"RIFF" else None
+                    if parser is None:
+                        if not sample_rate:
+                            raise AudioFormatError("sample_rate is required for raw PCM audio")
+                        segmenter = SilenceSegmenter(sample_rate, channels)
+                if parser is not None:
+                    chunk = parser.feed(chunk)
+                    if not chunk:
+                        continue
+                    if segmenter is None:
+                        segmenter = SilenceSegmenter(parser.sample_rate, parser.channels)
+                for segment in await run_blocking(segmenter.feed, chunk):
+                    await submit(segment, segmenter)
+            for segment in segmenter.finish() if segmenter else []:
+                await submit(segment, segmenter)
+        finally:
+            pending.put_nowait(None)
+
+    producer = asyncio.create_task(produce())
+    index = 0
+    try:
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            segment, future = item
+            try:
+                text = await future
+            finally:
+                in_flight.release()
+            if text:
+                yield {"index": index, "text": text, "start_ms": segment["start_ms"], "end_ms": segment["end_ms"]}
+                index += 1
+        # Surfaces format errors raised while reading
+        await producer
+    finally:
+        producer.cancel()
+
+class TranscriptionSession:
+    """
+    Push-style wrapper around transcribe_stream for HTTP, where the request body has to
+    be read before the response starts (StreamingResponse listens on the same receive
+    channel). Recognition still runs while the upload is in progress; results queue up
+    and are streamed as soon as the response begins.
+    """
+
+    def __init__(self, sample_rate: Optional[int] = None, channels: int = 1, lang: str = "en-US"):
+        self._audio: asyncio.Queue = asyncio.Queue(maxsize=STT_MAX_PENDING_SEGMENTS * 2)
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(sample_rate, channels, lang))
+
+    async def _chunks(self):
+        while (chunk := await self._audio.get()) is not None:
+            yield chunk
+
+    async def _run(self, sample_rate, channels, lang):
+        try:
+            async for partial in transcribe_stream(self._chunks(), sample_rate, channels, lang):
+                self._results.put_nowait(partial)
+        except Exception as e:
+            self._results.put_nowait(e)
+        finally:
+            self._results.put_nowait(None)
+
+    async def feed(self, chunk: Optional[bytes]) -> bool:
+        """Queue a chunk (None ends the stream). False once transcription has stopped, e.g. on a format error."""
+        if self._task.done():
+            return False
+        put = asyncio.ensure_future(self._audio.put(chunk))
+        await asyncio.wait({put, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            return False
+        return True
+
+    async def close(self):
+        await self.feed(None)
+
+    def cancel(self):
+        """Stop transcribing, e.g. when the client has gone; segments in flight are abandoned."""
+        self._task.cancel()
+
+    async def __aiter__(self):
+        while (item := await self._results.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
@@ -1,10 +1,155 @@
 from gtts import gTTS
-import uuid
 import os
+import time
+import glob
+import hashlib
+import threading
+from typing import Dict
+
+TTS_CACHE_DIR = os.path.join(os.getenv("DATA_DIR", "."), "uploads")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024
+# A .part file that has not grown for this long belongs to a synthesis that died
+TTS_STALL_SECONDS = int(os.getenv("TTS_STALL_SECONDS", "30"))
+# How long speak() waits for the first sentence before handing out the filename anyway
+TTS_FIRST_CHUNK_TIMEOUT = float(os.getenv("TTS_FIRST_CHUNK_TIMEOUT", "15"))
+
+def audio_filename(text: str, lang: str) -> str:
+    digest = hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).hexdigest()[:32]
+    return f"tts_{digest}.mp3"
+
+def is_stalled(part_path: str) -> bool:
+    try:
+        return time.time() - os.path.getmtime(part_path) > TTS_STALL_SECONDS
+    except FileNotFoundError:
+        return False
+
+class TTSCache:
+    """
+    Content-addressed store for gTTS output: tts_<sha256(lang, text)>.mp3 in the uploads dir.
+    - A repeat request for the same text and language is a disk hit; gTTS is not called.
+    - Synthesis writes sentence-sized MP3 chunks (gTTS splits on punctuation) to <name>.part
+      and renames it when complete, so /audio can stream the file while it is generated.
+      Creating the .part with O_EXCL also stops two workers synthesising the same text.
+    - Total size is capped at TTS_CACHE_MAX_BYTES, evicting the least recently used files.
+    """
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "synthesized": 0, "joined": 0, "errors": 0, "evicted": 0}
+
+    @classmethod
+    def _count(cls, key: str, n: int = 1):
+        with cls._lock:
+            cls._stats[key] += n
+
+    @classmethod
+    def speak(cls, text: str, lang: str) -> str:
+        """Returns the audio filename once its first sentence is on disk (or it is already cached)."""
+        os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+        filename = audio_filename(text, lang)
+        path = os.path.join(TTS_CACHE_DIR, filename)
+        part_path = path + ".part"
+
+        if os.path.exists(path):
+            os.utime(path)  # LRU recency
+            cls._count("hits")
+            return filename
+
+        # Validates lang before we claim the .part
+        tts = gTTS(text=text, lang=lang)
+        try:
+            part = open(part_path, "xb")
+        except FileExistsError:
+            if not is_stalled(part_path):
+                # Someone is already synthesising it; /audio streams their .part
+                cls._count("joined")
+                return filename
+            os.remove(part_path)
+            part = open(part_path, "xb")
+
+        first_chunk = threading.Event()
+        errors = []
+        threading.Thread(
+            target=cls._synthesize, args=(tts, part, part_path, path, first_chunk, errors), daemon=True
+        ).start()
+        first_chunk.wait(TTS_FIRST_CHUNK_TIMEOUT)
+        if errors:
+            raise errors[0]
+        return filename
+
+    @classmethod
+    def _synthesize(cls, tts: gTTS, part, part_path: str, path: str, first_chunk: threading.Event, errors: list):
+        try:
+            with part:
+                for chunk in tts.stream():
+                    part.write(chunk)
+                    part.flush()
+                    first_chunk.set()
+            os.replace(part_path, path)
+            cls._count("synthesized")
+        except Exception as e:
+            print(f"TTS synthesis error: {e}")
+            errors.append(e)
+            cls._count("errors")
+            try:
+                os.remove(part_path)
+            except FileNotFoundError:
+                pass
+        finally:
+            first_chunk.set()
+        cls.enforce_size_cap()
+
+    @classmethod
+    def enforce_size_cap(cls, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        """Delete least recently used audio until the store fits in max_bytes."""
+        files = []
+        # audio_*.mp3 are uuid-named files from before the store was content-addressed
+        for pattern in ("tts_*.mp3", "audio_*.mp3"):
+            for file_path in glob.glob(os.path.join(TTS_CACHE_DIR, pattern)):
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, file_path))
+        total = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(file_path)
+                total -= size
+                cls._count("evicted")
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def paths(filename: str):
+        """(final_path, part_path) for a filename from /audio, or None if it is not a plain name."""
+        if os.path.basename(filename) != filename or filename.startswith("."):
+            return None
+        path = os.path.join(TTS_CACHE_DIR, filename)
+        return path, path + ".part"
+
+    @staticmethod
+    async def follow(part_path: str, chunk_size: int = 64 * 1024):
+        """Yield a .part file's bytes as they are written, until it is renamed (done) or removed."""
+        import asyncio
+        with open(part_path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if chunk:
+                    yield chunk
+                    continue
+                if not os.path.exists(part_path) or is_stalled(part_path):
+                    # Renamed or abandoned: whatever is left in our handle is the rest of the file
+                    rest = f.read()
+                    if rest:
+                        yield rest
+                    return
+                await asyncio.sleep(0.05)
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            return dict(cls._stats)
 
 def speak(text, lang):
-    filename = f"audio_{uuid.uuid4()}.mp3"
-    filepath = os.path.join("uploads", filename)
-    tts = gTTS(text=text, lang=lang)
-    tts.save(filepath)
-    return filename
+    return TTSCache.speak(text, lang)
@@ -2,6 +2,8 @@ from database import topics_collection, Topic
 from typing import List, Dict, Optional
 from datetime import datetime
 from bson import ObjectId
+from services.answer_cache import AnswerCache
+from services.lexical_index import LexicalIndex
 
 class TopicsService:
     @staticmethod
@@ -169,6 +171,8 @@ class TopicsService:
             "created_at": topic.created_at
         }
         result = topics_collection.insert_one(topic_doc)
+        LexicalIndex.upsert_topic(str(result.inserted_id), topic.title, topic.description, topic.content)
+        AnswerCache.invalidate()
         return {
             "success": True,
             "id": str(result.inserted_id),
@@ -189,6 +193,10 @@ class TopicsService:
             )
             if result.matched_count == 0:
                 return {"success": False, "message": "Topic not found"}
+            updated = topics_collection.find_one({"_id": ObjectId(topic_id)})
+            if updated:
+                LexicalIndex.upsert_topic(topic_id, updated["title"], updated.get("description", ""), updated["content"])
+            AnswerCache.invalidate()
             return {"success": True, "message": "Topic updated successfully"}
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
@@ -199,6 +207,8 @@ class TopicsService:
             result = topics_collection.delete_one({"_id": ObjectId(topic_id)})
             if result.deleted_count == 0:
                 return {"success": False, "message": "Topic not found"}
+            LexicalIndex.remove_topic(topic_id)
+            AnswerCache.invalidate()
             return {"success": True, "message": "Topic deleted successfully"}
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
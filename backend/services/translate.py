@@ -1,8 +1,241 @@
-from googletrans import Translator
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 
-translator = Translator()
+TRANSLATION_CACHE_PATH = os.getenv(
+    "TRANSLATION_CACHE_PATH",
+    os.path.join(os.getenv("DATA_DIR", "."), "translation_cache.sqlite3")
+)
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "5000"))
+TRANSLATION_WORKERS = int(os.getenv("TRANSLATION_WORKERS", "4"))
+# googletrans rejects requests over ~5000 characters
+TRANSLATION_BATCH_CHARS = int(os.getenv("TRANSLATION_BATCH_CHARS", "4000"))
+
+# Tags pass through untouched; only the text between them is translated
+HTML_TAG = re.compile(r"(<[^>]+>)")
+HAS_WORD = re.compile(r"[^\W\d_]")
+SENTENCE_END = re.compile(r"(?<=[.!?])(\s+)")
+
+def segment_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def split_segments(text: str) -> List[tuple]:
+    """
+    Split text into (is_translatable, piece) tuples whose concatenation is `text`.
+    HTML tags, whitespace and pieces without letters are kept verbatim; the rest
+    is split into lines so each line is cached and reused independently.
+    """
+    pieces = []
+    for part in HTML_TAG.split(text):
+        if not part:
+            continue
+        if HTML_TAG.fullmatch(part):
+            pieces.append((False, part))
+            continue
+        for line in re.split(r"(\n)", part):
+            core = line.strip()
+            if not core or not HAS_WORD.search(core):
+                if line:
+                    pieces.append((False, line))
+                continue
+            # Keep surrounding whitespace out of the translated (and cached) segment
+            start = line.index(core)
+            if start:
+                pieces.append((False, line[:start]))
+            pieces.extend(_split_long(core))
+            if start + len(core) < len(line):
+                pieces.append((False, line[start + len(core):]))
+    return pieces
+
+def _split_long(core: str) -> List[tuple]:
+    """Lines longer than a batch are split at sentence boundaries."""
+    if len(core) <= TRANSLATION_BATCH_CHARS:
+        return [(True, core)]
+    # re.split with a capture group alternates sentence, whitespace, sentence...
+    return [(i % 2 == 0, part) for i, part in enumerate(SENTENCE_END.split(core)) if part]
+
+class TranslationStore:
+    """On-disk translations keyed by (sha256(segment), lang), backed by SQLite."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "lang TEXT NOT NULL, text_hash TEXT NOT NULL, translated TEXT NOT NULL, "
+            "PRIMARY KEY (lang, text_hash))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, lang: str, hashes: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, translated FROM translations WHERE lang = ? AND text_hash IN ({placeholders})",
+                    [lang, *batch]
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, lang: str, items: Dict[str, str]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (lang, text_hash, translated) VALUES (?, ?, ?)",
+                [(lang, h, translated) for h, translated in items.items()]
+            )
+            self._conn.commit()
+
+class TranslationService:
+    """
+    Segment-level translation with a two-tier cache (in-memory LRU over SQLite).
+    Only segments never seen before reach googletrans; those are packed into
+    newline-joined batches and translated concurrently, one Translator per thread.
+    """
+    _memory: "OrderedDict[tuple, str]" = OrderedDict()
+    _store: Optional[TranslationStore] = None
+    _executor = ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS, thread_name_prefix="translate")
+    _local = threading.local()
+    _lock = threading.Lock()
+    _stats = {"memory_hits": 0, "disk_hits": 0, "translated_segments": 0, "api_calls": 0, "failed_segments": 0}
+
+    @classmethod
+    def _get_store(cls) -> TranslationStore:
+        with cls._lock:
+            if cls._store is None:
+                cls._store = TranslationStore(TRANSLATION_CACHE_PATH)
+            return cls._store
+
+    @classmethod
+    def _translator(cls):
+        # googletrans keeps an httpx client per Translator; don't share one across threads
+        if not hasattr(cls._local, "translator"):
+            from googletrans import Translator
+            cls._local.translator = Translator()
+        return cls._local.translator
+
+    @classmethod
+    def _remember(cls, lang: str, items: Dict[str, str]):
+        with cls._lock:
+            for h, translated in items.items():
+                cls._memory[(lang, h)] = translated
+                cls._memory.move_to_end((lang, h))
+            while len(cls._memory) > TRANSLATION_CACHE_MAX_ENTRIES:
+                cls._memory.popitem(last=False)
+
+    @classmethod
+    def _translate_batch(cls, segments: List[str], lang: str) -> Dict[str, str]:
+        """Translate one batch; returns {segment: translation} for the segments that succeeded."""
+        translator = cls._translator()
+        with cls._lock:
+            cls._stats["api_calls"] += 1
+        result = translator.translate("\n".join(segments), dest=lang).text
+        lines = result.split("\n")
+        if len(lines) == len(segments):
+            return dict(zip(segments, (line.strip() for line in lines)))
+
+        # The service merged or split lines; fall back to one call per segment
+        translated = {}
+        for segment in segments:
+            try:
+                with cls._lock:
+                    cls._stats["api_calls"] += 1
+                translated[segment] = translator.translate(segment, dest=lang).text
+            except Exception as e:
+                print(f"Translation error: {e}")
+        return translated
+
+    @classmethod
+    def _batches(cls, segments: List[str]) -> List[List[str]]:
+        batches, current, size = [], [], 0
+        for segment in segments:
+            if current and size + len(segment) + 1 > TRANSLATION_BATCH_CHARS:
+                batches.append(current)
+                current, size = [], 0
+            current.append(segment)
+            size += len(segment) + 1
+        if current:
+            batches.append(current)
+        return batches
+
+    @classmethod
+    def translate_segments(cls, segments: List[str], lang: str) -> Dict[str, str]:
+        """Returns {segment: translation}. Segments that could not be translated are left out."""
+        by_hash = {segment_hash(s): s for s in segments}
+        found: Dict[str, str] = {}
+
+        with cls._lock:
+            for h in by_hash:
+                cached = cls._memory.get((lang, h))
+                if cached is not None:
+                    cls._memory.move_to_end((lang, h))
+                    found[h] = cached
+            cls._stats["memory_hits"] += len(found)
+
+        missing = [h for h in by_hash if h not in found]
+        if missing:
+            from_disk = cls._get_store().get_many(lang, missing)
+            if from_disk:
+                cls._remember(lang, from_disk)
+                found.update(from_disk)
+                with cls._lock:
+                    cls._stats["disk_hits"] += len(from_disk)
+            missing = [h for h in missing if h not in from_disk]
+
+        if missing:
+            futures = [
+                cls._executor.submit(cls._translate_batch, batch, lang)
+                for batch in cls._batches([by_hash[h] for h in missing])
+            ]
+            fresh = {}
+            for future in futures:
+                try:
+                    for segment, translated in future.result().items():
+                        fresh[segment_hash(segment)] = translated
+                except Exception as e:
+                    print(f"Translation error: {e}")
+            if fresh:
+                cls._remember(lang, fresh)
+                cls._get_store().put_many(lang, fresh)
+                found.update(fresh)
+            with cls._lock:
+                cls._stats["translated_segments"] += len(fresh)
+                cls._stats["failed_segments"] += len(missing) - len(fresh)
+
+        return {by_hash[h]: translated for h, translated in found.items()}
+
+    @classmethod
+    def translate(cls, text: str, lang: str) -> str:
+        pieces = split_segments(text)
+        translations = cls.translate_segments(
+            list(dict.fromkeys(piece for translatable, piece in pieces if translatable)), lang
+        )
+        # Untranslated segments fall back to the original text
+        return "".join(translations.get(piece, piece) if translatable else piece for translatable, piece in pieces)
+
+    @classmethod
+    def pretranslate(cls, texts: List[str], langs: List[str]):
+        """Warm the cache for static strings (e.g. the disclaimer) so answers only pay for novel text."""
+        for lang in langs:
+            for text in texts:
+                cls.translate(text, lang)
+        print(f"Pretranslated {len(texts)} static string(s) into {', '.join(langs)}")
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            return {**cls._stats, "memory_entries": len(cls._memory)}
 
 def translate_text(text, lang):
     if lang == "en":
         return text
-    return translator.translate(text, dest=lang).text
+    return TranslationService.translate(text, lang)
@@ -0,0 +1,77 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from bson import ObjectId
+
+# How stale a profile may be in a worker that did not see the write itself
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))  # seconds
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# Profile fields get_current_user merges into the token payload
+PROFILE_FIELDS = ("city", "phone", "address", "consultation_fee", "specialization",
+                  "years_of_experience", "is_verified")
+
+class UserCache:
+    """
+    Per-process TTL cache of the profile fields attached to every authenticated request.
+    Writes that change them call invalidate() so this worker sees the change immediately;
+    other workers pick it up within USER_CACHE_TTL.
+    """
+    _entries: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (expires_at, profile or None)
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def get_profile(cls, user_id: str) -> Optional[Dict]:
+        """Profile fields for user_id, or None if the user does not exist."""
+        now = time.monotonic()
+        with cls._lock:
+            entry = cls._entries.get(user_id)
+            if entry and entry[0] > now:
+                cls._entries.move_to_end(user_id)
+                cls._stats["hits"] += 1
+                return entry[1]
+            cls._stats["misses"] += 1
+
+        profile = cls._load(user_id)
+        with cls._lock:
+            cls._entries[user_id] = (now + USER_CACHE_TTL, profile)
+            cls._entries.move_to_end(user_id)
+            while len(cls._entries) > USER_CACHE_MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+        return profile
+
+    @staticmethod
+    def _load(user_id: str) -> Optional[Dict]:
+        from database import users_collection
+        if not ObjectId.is_valid(user_id):
+            return None
+        user = users_collection.find_one({"_id": ObjectId(user_id)}, {field: 1 for field in PROFILE_FIELDS})
+        if not user:
+            return None
+        profile = {field: user.get(field) for field in PROFILE_FIELDS}
+        profile["is_verified"] = user.get("is_verified", False)
+        return profile
+
+    @classmethod
+    def invalidate(cls, user_id: str):
+        with cls._lock:
+            cls._entries.pop(str(user_id), None)
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def stats(cls) -> Dict:
+        with cls._lock:
+            lookups = cls._stats["hits"] + cls._stats["misses"]
+            return {
+                **cls._stats,
+                "entries": len(cls._entries),
+                "hit_rate": round(cls._stats["hits"] / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,26 @@
+from typing import Dict, Iterable, Tuple
+from bson import ObjectId
+
+from database import users_collection
+
+DEFAULT_USER_FIELDS = ("username", "email", "role")
+
+class UserLoader:
+    """
+    DataLoader-style batch resolver for user references in list endpoints.
+    Collect every user_id a response needs, then resolve them all with one
+    `$in` query instead of a find_one per row.
+    """
+
+    def __init__(self, fields: Tuple[str, ...] = DEFAULT_USER_FIELDS):
+        self.projection = {field: 1 for field in fields}
+        self._cache: Dict[str, dict] = {}
+
+    def load_many(self, user_ids: Iterable[str]) -> Dict[str, dict]:
+        """Returns {user_id: user_doc} for the ids that exist; unknown or malformed ids are left out."""
+        wanted = {str(uid) for uid in user_ids if uid}
+        missing = [ObjectId(uid) for uid in wanted - self._cache.keys() if ObjectId.is_valid(uid)]
+        if missing:
+            for user in users_collection.find({"_id": {"$in": missing}}, self.projection):
+                self._cache[str(user["_id"])] = user
+        return {uid: self._cache[uid] for uid in wanted if uid in self._cache}
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """The FastAPI app module, importable without real API keys; startup hooks (Mongo, Chroma) are not run."""
+    for name in ("GROQ_API_KEY", "OPENAI_API_KEY"):
+        monkeypatch.setenv(name, os.getenv(name) or "test")
+    import main
+    yield main
+    main.app.dependency_overrides.clear()
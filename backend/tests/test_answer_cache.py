@@ -0,0 +1,33 @@
+from services import answer_cache
+from services.answer_cache import AnswerCache
+
+def test_answer_cache_exact_hit_and_invalidation():
+    AnswerCache.invalidate()
+    AnswerCache.put("What are Fundamental Rights?", "en", ["c1", "c2"], "answer", "reply")
+
+    # Normalization ignores case, punctuation and extra whitespace; chunk order does not matter
+    hit = AnswerCache.get("what are   fundamental rights", "en", ["c2", "c1"])
+    assert hit["reply"] == "reply"
+    assert AnswerCache.get("what are fundamental rights", "hi", ["c1", "c2"]) is None
+    assert AnswerCache.get("what are fundamental rights", "en", ["c3"]) is None
+
+    AnswerCache.invalidate()
+    assert AnswerCache.get("what are fundamental rights", "en", ["c1", "c2"]) is None
+
+def test_answer_cache_semantic_tier_uses_closest_question(monkeypatch):
+    monkeypatch.setattr(answer_cache, "ANSWER_CACHE_SEMANTIC", True)
+    AnswerCache.invalidate()
+    AnswerCache.put("right to life", "en", ["c1"], "a1", "life", embedding=[1.0, 0.0, 0.0])
+    AnswerCache.put("right to equality", "en", ["c2"], "a2", "equality", embedding=[0.0, 1.0, 0.0])
+
+    # Different wording and chunks, nearly the same embedding
+    assert AnswerCache.get("is life protected", "en", ["c9"], embedding=[0.99, 0.05, 0.0])["reply"] == "life"
+    assert AnswerCache.get("is life protected", "hi", ["c9"], embedding=[0.99, 0.05, 0.0]) is None
+    assert AnswerCache.get("something else", "en", ["c9"], embedding=[0.5, 0.5, 0.7]) is None
+
+    # A put after scoring rebuilds the matrix, so the new entry is matched
+    AnswerCache.put("freedom of speech", "en", ["c3"], "a3", "speech", embedding=[0.0, 0.0, 2.0])
+    assert AnswerCache.get("speech rights", "en", ["c9"], embedding=[0.0, 0.1, 1.0])["reply"] == "speech"
+
+    AnswerCache.invalidate()
+    assert AnswerCache.get("is life protected", "en", ["c9"], embedding=[0.99, 0.05, 0.0]) is None
@@ -0,0 +1,97 @@
+import hashlib
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+from services import blob_store
+from services.auth_service import AuthService
+from services.blob_store import BlobStore, GCSBlobBackend, LocalBlobBackend, blob_key, hash_stream
+from services.password_hasher import PasswordHasherBusy
+
+def test_blob_keys_are_content_addressed_and_local_backend_round_trips(monkeypatch, tmp_path):
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(tmp_path))
+    data = b"%PDF-1.4 bar council id" * 100000
+    fileobj = io.BytesIO(data)
+    fileobj.seek(123)
+
+    sha256, size = hash_stream(fileobj)
+    assert sha256 == hashlib.sha256(data).hexdigest() and size == len(data)
+    assert fileobj.tell() == 0
+
+    key = blob_key(sha256, "Proof.PDF")
+    assert key == f"blobs/{sha256[:2]}/{sha256}.pdf"
+    assert blob_key(sha256, "../../etc/passwd") == f"blobs/{sha256[:2]}/{sha256}"
+
+    url = LocalBlobBackend.write(fileobj, key, "application/pdf", size)
+    assert url == f"/uploads/{key}" and LocalBlobBackend.exists(key)
+    assert (tmp_path / "blobs" / sha256[:2] / f"{sha256}.pdf").read_bytes() == data
+    assert BlobStore.sha256_of(url) == sha256
+    assert BlobStore.sha256_of(f"https://storage.googleapis.com/bucket/{key}") == sha256
+    # Files stored before the blob store are never reference counted
+    assert BlobStore.sha256_of("lawyer_proofs/1700000000_proof.pdf") is None
+
+    LocalBlobBackend.delete(key)
+    assert not LocalBlobBackend.exists(key)
+
+class FakeBlobs:
+    """The blobs_collection operations BlobStore uses, on a dict."""
+
+    def __init__(self):
+        self.docs = {}
+
+    @staticmethod
+    def _matches(doc, query):
+        refs = query.get("refs", {})
+        return ("$gt" not in refs or doc["refs"] > refs["$gt"]) and ("$lte" not in refs or doc["refs"] <= refs["$lte"])
+
+    def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        doc = self.docs.get(query["_id"])
+        if doc is None or not self._matches(doc, query):
+            if doc is not None or not upsert:
+                return None
+            doc = self.docs[query["_id"]] = {"_id": query["_id"], "refs": 0, **update.get("$setOnInsert", {})}
+        for field, n in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + n
+        doc.update(update.get("$set", {}))
+        return dict(doc)
+
+    def delete_one(self, query):
+        doc = self.docs.get(query["_id"])
+        deleted = doc is not None and self._matches(doc, query)
+        if deleted:
+            del self.docs[query["_id"]]
+        return type("DeleteResult", (), {"deleted_count": int(deleted)})()
+
+@pytest.mark.parametrize("outcome, status", [
+    ({"success": False, "message": "Username or email already registered"}, 400),
+    (PasswordHasherBusy("Password hashing queue is full"), 429),
+    (RuntimeError("connection reset"), 500),
+])
+def test_failed_lawyer_signup_releases_the_uploaded_proof(app_module, monkeypatch, tmp_path, outcome, status):
+    def register_user(*args):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def gcs_unavailable(key):
+        raise RuntimeError("no GCS credentials")
+
+    blobs = FakeBlobs()
+    monkeypatch.setattr(database, "blobs_collection", blobs)
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(tmp_path))
+    monkeypatch.setattr(GCSBlobBackend, "exists", staticmethod(gcs_unavailable))
+    monkeypatch.setattr(AuthService, "register_user", staticmethod(register_user))
+
+    proof = b"%PDF-1.4 bar council id"
+    sha256 = hashlib.sha256(proof).hexdigest()
+    response = TestClient(app_module.app, raise_server_exceptions=False).post("/register", data={
+        "username": "asha", "email": "asha@example.com", "password": "secret", "role": "lawyer",
+        "phone": "1", "address": "x", "city": "Pune", "lawyer_id_proof": "BAR/1", "specialization": "Civil"
+    }, files={"lawyer_proof_file": ("proof.pdf", proof, "application/pdf")})
+
+    assert response.status_code == status
+    # The reference put() took was dropped, so the blob and its file are gone
+    assert sha256 not in blobs.docs
+    assert not LocalBlobBackend.exists(blob_key(sha256, "proof.pdf"))
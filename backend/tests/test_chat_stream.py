@@ -0,0 +1,73 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.answer_cache import AnswerCache
+from services.chat_service import ChatService
+from services.context_assembler import ChatUsage
+
+def sse_events(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))], x_groq=None)
+
+class FakeCompletions:
+    def __init__(self, deltas=(), error=None):
+        self.deltas, self.error = deltas, error
+
+    async def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        if self.error:
+            raise self.error
+
+        async def stream():
+            for delta in self.deltas:
+                yield chunk(delta)
+        return stream()
+
+@pytest.fixture
+def stream_chat(app_module, monkeypatch):
+    saved = []
+
+    async def retrieve(message, lang):
+        return ["Article 21. Protection of life and personal liberty"], ["c1"], None, None
+
+    monkeypatch.setattr(app_module, "retrieve_with_cache", retrieve)
+    monkeypatch.setattr(AnswerCache, "put", classmethod(lambda cls, *args, **kwargs: None))
+    monkeypatch.setattr(ChatUsage, "record", classmethod(lambda cls, *args: None))
+    monkeypatch.setattr(ChatService, "save_chat_message", staticmethod(
+        lambda user_id, message, reply: saved.append((user_id, message, reply)) or {"chat_id": "chat1"}
+    ))
+
+    def post(completions, user_id):
+        monkeypatch.setattr(app_module, "client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+        app_module.app.dependency_overrides[app_module.get_current_user] = lambda: {"user_id": user_id}
+        response = TestClient(app_module.app).post("/chat/stream", json={"message": "Right to life?", "lang": "en"})
+        assert response.status_code == 200 and response.headers["content-type"].startswith("text/event-stream")
+        return sse_events(response.text)
+    return post, saved
+
+def test_tokens_stream_before_the_disclaimer_and_the_chat_is_saved_last(app_module, stream_chat):
+    post, saved = stream_chat
+    events = post(FakeCompletions(["Article 21 ", "protects life."]), "stream-user-1")
+
+    assert [name for name, _ in events] == ["token", "token", "disclaimer", "done"]
+    assert [data["content"] for _, data in events[:2]] == ["Article 21 ", "protects life."]
+    reply = "Article 21 protects life." + app_module.LEGAL_DISCLAIMER
+    assert events[-1][1] == {"chat_id": "chat1", "reply": reply}
+    assert saved == [("stream-user-1", "Right to life?", reply)]
+
+def test_generation_failure_is_an_error_event_and_nothing_is_saved(stream_chat):
+    post, saved = stream_chat
+    events = post(FakeCompletions(error=RuntimeError("upstream down")), "stream-user-2")
+
+    assert [name for name, _ in events] == ["error"]
+    assert events[0][1]["status"] == 500
+    assert saved == []
@@ -0,0 +1,24 @@
+from services.constitution_index import parse_constitution
+
+def test_parse_constitution_articles_parts_and_clauses():
+    pages = [
+        "Contents\nPART I\nTHE UNION AND ITS TERRITORY\n1. Name and territory of the Union",
+        "THE CONSTITUTION OF INDIA\n(Part I.—Union and its territory)\n2\n"
+        "PART I\nTHE UNION AND ITS TERRITORY\n"
+        "1. Name and territory of the Union. —(1) India, that is Bharat,\n"
+        "shall be a Union of States.\n"
+        "(2) The States and the territories thereof shall be as specified.\n"
+        "2. Admission or establishment of new\n"
+        "States.—Parliament may by law admit into the Union new States.\n"
+        "3[2A. [Sikkim to be associated with the Union. ] —Omitted.]\n"
+        "______________________________________________\n"
+        "3. Ins. by the Constitution (Thirty-fifth Amendment) Act, 1974.—note"
+    ]
+    data = parse_constitution(pages)
+
+    assert list(data["articles"]) == ["1", "2", "2A"]
+    assert data["articles"]["2"]["title"] == "Admission or establishment of new States"
+    assert data["articles"]["2"]["part"] == "I"
+    assert data["articles"]["2"]["page_start"] == 1
+    assert data["articles"]["1"]["clauses"]["2"].startswith("(2) The States")
+    assert data["parts"]["I"]["title"] == "The Union And Its Territory"
@@ -0,0 +1,15 @@
+from services.context_assembler import assemble_context, count_tokens, dedupe_chunks
+
+def test_context_assembler_dedupes_overlap_and_respects_budget():
+    first = "Article 21 protects life and personal liberty. " * 3 + "procedure established by law applies here."
+    second = "procedure established by law applies here. Article 22 covers arrest and detention."
+    deduped = dedupe_chunks([first, second, first])
+    assert len(deduped) == 2
+    assert deduped[1] == "Article 22 covers arrest and detention."
+
+    context, tokens = assemble_context([first, "x " * 5000], budget=count_tokens(first) + 5)
+    assert context == first.strip()
+    assert tokens <= count_tokens(first) + 5
+
+    context, tokens = assemble_context(["y " * 5000], budget=50)
+    assert 0 < tokens <= 50
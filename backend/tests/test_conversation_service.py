@@ -0,0 +1,46 @@
+from services import conversation_service
+from services.conversation_service import ConversationService
+
+def evaluate(expr, doc):
+    """Just enough of the aggregation language for the mark_read pipeline."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = doc
+        for part in expr[1:].split("."):
+            value = (value or {}).get(part)
+        return value
+    if isinstance(expr, dict):
+        (op, args), = expr.items()
+        args = [evaluate(arg, doc) for arg in args]
+        if op == "$ifNull":
+            return args[0] if args[0] is not None else args[1]
+        if op == "$subtract":
+            return args[0] - args[1]
+        if op == "$max":
+            return max(args)
+    return expr
+
+class FakeConversations:
+    def __init__(self, doc):
+        self.doc = doc
+
+    def find_one_and_update(self, query, pipeline, projection=None, return_document=None):
+        if query["_id"] != self.doc["_id"]:
+            return None
+        for stage in pipeline:
+            for path, expr in stage["$set"].items():
+                field, key = path.split(".")
+                self.doc.setdefault(field, {})[key] = evaluate(expr, self.doc)
+        return self.doc
+
+def test_mark_read_keeps_messages_that_arrived_after_the_read(monkeypatch):
+    # Two messages were marked read, and a third arrived before the counter was updated
+    conversations = FakeConversations({"_id": "a:b", "unread": {"a": 3, "b": 0}})
+    monkeypatch.setattr(conversation_service, "conversations_collection", conversations)
+    assert ConversationService.mark_read("a", "b", 2) == 1
+    assert conversations.doc["unread"] == {"a": 1, "b": 0}
+
+def test_mark_read_never_goes_negative(monkeypatch):
+    conversations = FakeConversations({"_id": "a:b", "unread": {"b": 0}})
+    monkeypatch.setattr(conversation_service, "conversations_collection", conversations)
+    assert ConversationService.mark_read("a", "b", 2) == 0
+    assert ConversationService.mark_read("a", "c", 1) == 0
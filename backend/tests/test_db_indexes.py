@@ -0,0 +1,121 @@
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+import db_indexes
+from db_indexes import HOT_QUERIES, INDEXES
+from services import auth_service
+from services.auth_service import AuthService
+from services.lawyer_stats import normalize_city
+from services.password_hasher import PasswordHasher
+
+def serves(model, query, sort) -> bool:
+    """True if the index can seek on the query's equality fields and then return rows in sort order."""
+    spec = model.document
+    keys = list(spec["key"].items())
+    partial = spec.get("partialFilterExpression", {})
+    if any(query.get(field) != value for field, value in partial.items()):
+        return False
+    equality = {field for field, value in query.items()
+                if not field.startswith("$") and not isinstance(value, dict) and field not in partial}
+    prefix = {field for field, _ in keys[:len(equality)]}
+    if prefix != equality:
+        return False
+    wanted = [(field, 1 if direction > 0 else -1) for field, direction in sort]
+    rest = keys[len(equality):len(equality) + len(wanted)]
+    # An index also serves the exact reverse of its order
+    return rest == wanted or rest == [(field, -direction) for field, direction in wanted]
+
+def test_every_sorted_hot_query_has_an_index_in_equality_sort_order():
+    for collection_name, query, sort in HOT_QUERIES:
+        if not sort or "$or" in query:
+            continue
+        assert any(serves(model, query, sort) for model in INDEXES[collection_name]), (collection_name, query, sort)
+
+def test_lawyer_directory_indexes_cover_each_sort_and_filter():
+    lawyer_queries = [(q, s) for c, q, s in HOT_QUERIES if c == "users" and q.get("is_verified")]
+    sorts = {tuple(s) for _, s in lawyer_queries}
+    assert {(("avg_rating", -1), ("_id", 1)), (("consultation_fee", 1), ("_id", 1)),
+            (("years_of_experience", -1), ("_id", 1))} <= sorts
+    assert any("city_key" in q for q, _ in lawyer_queries)
+    assert any("specialization" in q for q, _ in lawyer_queries)
+    assert "lawyer_directory" in db_indexes.OBSOLETE_INDEXES["users"]
+
+def test_city_filter_matches_on_a_normalized_key():
+    assert normalize_city("  New   Delhi ") == normalize_city("new delhi") == "new delhi"
+    assert normalize_city("") is None and normalize_city(None) is None
+
+class FakeCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def sort(self, sort):
+        return self
+
+    def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def create_indexes(self, models):
+        name = models[0].document["name"]
+        if (self.name, name) in self.db.conflicts:
+            self.db.conflicts.discard((self.name, name))
+            raise OperationFailure("IndexOptionsConflict", code=85)
+        self.db.created.append((self.name, name))
+
+    def drop_index(self, name):
+        self.db.dropped.append((self.name, name))
+
+    def index_information(self):
+        return {"lawyer_directory": {}} if self.name == "users" else {}
+
+    def find(self, query):
+        return FakeCursor(self.db.plans.get(self.name, {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}))
+
+class FakeDatabase:
+    def __init__(self, conflicts=(), plans=None):
+        self.conflicts = set(conflicts)
+        self.plans = plans or {}
+        self.created, self.dropped = [], []
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+def test_startup_never_drops_indexes_but_the_cli_migrates(monkeypatch):
+    startup_db = FakeDatabase(conflicts=[("users", "lawyer_by_rating")])
+    monkeypatch.setattr(db_indexes, "db", startup_db)
+    result = db_indexes.apply_indexes()
+    assert not result["success"] and startup_db.dropped == []
+
+    cli_db = FakeDatabase(conflicts=[("users", "lawyer_by_rating")])
+    monkeypatch.setattr(db_indexes, "db", cli_db)
+    assert db_indexes.main([]) == 0
+    assert ("users", "lawyer_by_rating") in cli_db.dropped
+    assert ("users", "lawyer_directory") in cli_db.dropped
+    assert cli_db.created.count(("users", "lawyer_by_rating")) == 1
+
+def test_check_fails_on_collection_scans_and_in_memory_sorts(monkeypatch):
+    monkeypatch.setattr(db_indexes, "db", FakeDatabase())
+    assert db_indexes.main(["--check"]) == 0
+
+    monkeypatch.setattr(db_indexes, "db", FakeDatabase(plans={"chats": {"stage": "COLLSCAN"}}))
+    assert db_indexes.main(["--check"]) == 1
+
+    sorted_in_memory = {"stage": "SORT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}
+    monkeypatch.setattr(db_indexes, "db", FakeDatabase(plans={"reviews": sorted_in_memory}))
+    offenders = db_indexes.check_query_plans()
+    assert offenders and all(o.startswith("reviews") and o.endswith("SORT") for o in offenders)
+
+def test_duplicate_registration_race_is_a_client_error(monkeypatch):
+    class RacingUsers:
+        def find_one(self, query):
+            return None
+
+        def insert_one(self, doc):
+            raise DuplicateKeyError("E11000 duplicate key error")
+
+    monkeypatch.setattr(auth_service, "users_collection", RacingUsers())
+    monkeypatch.setattr(PasswordHasher, "hash", classmethod(lambda cls, password: b"hash"))
+    result = AuthService.register_user("asha", "asha@example.com", "secret")
+    assert result == {"success": False, "message": "Username or email already registered"}
@@ -0,0 +1,40 @@
+import chromadb
+from chromadb.utils import embedding_functions
+
+from services import embedding_service
+from services.embedding_service import EmbeddingCache, EmbeddingService, chroma_embedding_function
+
+def fake_vectors(texts):
+    return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+def test_embed_is_cached_on_disk_and_deduplicated(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(EmbeddingService, "_cache", EmbeddingCache(str(tmp_path / "embeddings.sqlite3")))
+    monkeypatch.setattr(EmbeddingService, "_call_api", classmethod(lambda cls, texts: calls.append(list(texts)) or fake_vectors(texts)))
+
+    texts = [f"clause {i}" for i in range(40)] + ["clause 0"]
+    first = EmbeddingService.embed(texts)
+    assert first[0] == first[-1] == [8.0, 1.0, 0.0]
+    # One bulk call, and the repeated text was only sent once
+    assert len(calls) == 1 and len(calls[0]) == 40
+
+    assert EmbeddingService.embed(texts) == first
+    assert len(calls) == 1
+
+def test_wrapper_opens_collection_created_with_openai_embedding_function(monkeypatch, tmp_path):
+    monkeypatch.setattr(EmbeddingService, "embed", classmethod(lambda cls, texts: fake_vectors(texts)))
+    # With its key variable set, Chroma persists the "openai" config instead of treating it as legacy
+    monkeypatch.setenv("CHROMA_OPENAI_API_KEY", "sk-test")
+    path = str(tmp_path / "chroma_db")
+    legacy = embedding_functions.OpenAIEmbeddingFunction(
+        api_key="sk-test", model_name=embedding_service.EMBEDDING_MODEL
+    )
+    chromadb.PersistentClient(path=path).get_or_create_collection(name="indian_constitution_v3", embedding_function=legacy)
+
+    # Previously raised "Embedding function conflict: new: NotImplemented vs persisted: openai"
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection(
+        name="indian_constitution_v3", embedding_function=chroma_embedding_function()
+    )
+    collection.add(ids=["a", "b"], documents=["Article 21", "Article 14 equality"])
+    result = collection.query(query_texts=["Article 99"], n_results=1)
+    assert result["ids"] == [["a"]]
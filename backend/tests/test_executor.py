@@ -0,0 +1,38 @@
+import time
+import asyncio
+import inspect
+import threading
+
+from services.executor import run_blocking
+
+def test_run_blocking_keeps_the_event_loop_responsive():
+    def slow_lookup(delay, *, result):
+        time.sleep(delay)
+        return threading.current_thread().name, result
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        heartbeat = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(run_blocking(slow_lookup, 0.2, result=n) for n in range(4)))
+        heartbeat.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    assert [result for _, result in results] == [0, 1, 2, 3]
+    assert all(name.startswith("blocking-io") for name, _ in results)
+    # The four 200 ms calls overlapped and the loop kept ticking meanwhile
+    assert ticks >= 10
+
+def test_routes_doing_only_blocking_work_run_in_the_threadpool(app_module):
+    endpoints = {route.path: route.endpoint for route in app_module.app.routes if hasattr(route, "methods")}
+    for path in ("/login", "/history", "/topics", "/lawyers", "/messages/{other_id}", "/chat-inbox"):
+        assert not inspect.iscoroutinefunction(endpoints[path]), path
+    # Resolved in the threadpool too, since a cache miss hits Mongo
+    assert not inspect.iscoroutinefunction(app_module.get_current_user)
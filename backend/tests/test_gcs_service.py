@@ -0,0 +1,63 @@
+import io
+import threading
+
+from services import gcs_service
+from services.gcs_service import GCSService
+
+class FakeBlob:
+    def __init__(self, name, chunk_size=None):
+        self.name, self.chunk_size = name, chunk_size
+        self.cache_control = None
+        self.uploaded = None
+
+    def upload_from_file(self, fileobj, size=None, content_type=None):
+        self.uploaded = (fileobj.read(), size, content_type)
+
+class FakeBucket:
+    def __init__(self):
+        self.blobs = []
+
+    def blob(self, name, chunk_size=None):
+        self.blobs.append(FakeBlob(name, chunk_size))
+        return self.blobs[-1]
+
+class FakeClient:
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        FakeClient.instances += 1
+        self.buckets = {}
+
+    def bucket(self, name):
+        return self.buckets.setdefault(name, FakeBucket())
+
+def test_one_client_is_built_and_reused_across_threads(monkeypatch):
+    monkeypatch.delenv("GCP_CREDENTIALS_JSON", raising=False)
+    monkeypatch.setattr(gcs_service.storage, "Client", FakeClient)
+    monkeypatch.setattr(GCSService, "_client", None)
+    FakeClient.instances = 0
+
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(GCSService.get_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert FakeClient.instances == 1
+    assert all(client is clients[0] for client in clients)
+
+def test_upload_object_keeps_the_name_and_goes_resumable_only_for_large_files(monkeypatch):
+    monkeypatch.setattr(GCSService, "_client", FakeClient())
+    monkeypatch.setattr(gcs_service, "GCS_RESUMABLE_THRESHOLD", 10)
+    monkeypatch.setenv("GCS_BUCKET_NAME", "bucket")
+
+    small = io.BytesIO(b"abc")
+    small.seek(2)
+    url = GCSService.upload_object(small, "blobs/ab/abc.pdf", "application/pdf", cache_control="immutable")
+    assert url == "https://storage.googleapis.com/bucket/blobs/ab/abc.pdf"
+
+    GCSService.upload_object(io.BytesIO(b"x" * 11), "blobs/cd/large.pdf")
+    first, second = GCSService._client.bucket("bucket").blobs
+    assert first.name == "blobs/ab/abc.pdf" and first.chunk_size is None
+    assert first.uploaded == (b"abc", 3, "application/pdf") and first.cache_control == "immutable"
+    assert second.chunk_size == gcs_service.GCS_CHUNK_SIZE
@@ -0,0 +1,97 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import ingest_constitution
+from ingest_constitution import Progress, ingest_pdf, load_checkpoint
+
+class FakeVectorStore:
+    """Stands in for the RAGService calls the ingest pipeline makes."""
+
+    def __init__(self):
+        self.chunks = {}
+        self.batch_sizes = []
+        self.active = 0
+        self.peak_concurrency = 0
+        self.fail_on_upsert = None
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return [[float(len(t))] for t in texts]
+
+    def upsert_chunks(self, ids, texts, metadatas, embeddings=None):
+        if self.fail_on_upsert is not None:
+            if self.fail_on_upsert == 0:
+                raise RuntimeError("simulated crash")
+            self.fail_on_upsert -= 1
+        self.batch_sizes.append(len(ids))
+        self.chunks.update(zip(ids, texts))
+
+    def get_existing_ids(self, source=None, ids=None):
+        return set(self.chunks)
+
+    def delete_chunks(self, ids, batch_size=500):
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    store = FakeVectorStore()
+    pdf = {"pages": [f"page {n}" for n in range(40)], "fingerprint": "v1"}
+    for name in ("embed_documents", "upsert_chunks", "get_existing_ids", "delete_chunks"):
+        monkeypatch.setattr(ingest_constitution.RAGService, name, getattr(store, name))
+    monkeypatch.setattr(ingest_constitution, "CHECKPOINT_PATH", str(tmp_path / "checkpoint.json"))
+    # Extraction in threads so the fakes are visible to it
+    monkeypatch.setattr(ingest_constitution, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(ingest_constitution, "PdfReader", lambda path: type("Reader", (), {"pages": pdf["pages"]}))
+    monkeypatch.setattr(ingest_constitution, "extract_pages", lambda path, numbers: [(n, pdf["pages"][n]) for n in numbers])
+    monkeypatch.setattr(ingest_constitution, "file_fingerprint", lambda path: pdf["fingerprint"])
+    # Five chunks per page, identified by their text like the real content-hash IDs
+    monkeypatch.setattr(ingest_constitution, "chunk_pages", lambda source, pages: [
+        {"id": f"{text}#{i}", "text": f"{text}#{i}", "metadata": {"source": source, "page": n}}
+        for n, text in pages for i in range(5)
+    ])
+    return store, pdf
+
+def run(checkpoint=None, incremental=False):
+    checkpoint = load_checkpoint() if checkpoint is None else checkpoint
+    ingest_pdf("constitution.pdf", checkpoint, Progress(), workers=2, embed_concurrency=4,
+               batch_size=64, pages_per_task=8, incremental=incremental)
+    return checkpoint
+
+def test_embedding_batches_span_extraction_tasks_and_run_concurrently(pipeline):
+    store, _ = pipeline
+    checkpoint = run({})
+
+    # 8 pages x 5 chunks = 40 per task, but batches are still filled to 64
+    assert store.batch_sizes[:-1] == [64] * (len(store.batch_sizes) - 1)
+    assert sum(store.batch_sizes) == 200
+    assert store.peak_concurrency > 1
+    assert sorted(checkpoint["constitution.pdf"]["pages_done"]) == list(range(40))
+
+def test_incremental_reindex_resumes_after_a_crash_and_removes_stale_chunks(pipeline):
+    store, pdf = pipeline
+    run({})
+    assert "page 3#0" in store.chunks
+
+    pdf["pages"][3] = "amended page 3"
+    pdf["fingerprint"] = "v2"
+    store.fail_on_upsert = 0
+    with pytest.raises(RuntimeError):
+        run()
+    # The new fingerprint is on disk, but so is the unfinished incremental run
+    assert load_checkpoint()["constitution.pdf"]["incremental_pending"] is True
+
+    store.fail_on_upsert = None
+    run()
+    assert "page 3#0" not in store.chunks
+    assert "amended page 3#0" in store.chunks
+    assert "incremental_pending" not in load_checkpoint()["constitution.pdf"]
@@ -0,0 +1,62 @@
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+import database
+
+class FakeCursor:
+    def __init__(self, rows, calls):
+        self.rows, self.calls = rows, calls
+
+    def sort(self, sort):
+        self.calls["sort"] = sort
+        return self
+
+    def skip(self, n):
+        self.calls["skip"] = n
+        return self
+
+    def limit(self, n):
+        self.calls["limit"] = n
+        return iter(self.rows[self.calls["skip"]:self.calls["skip"] + n])
+
+class FakeUsers:
+    def __init__(self, rows):
+        self.rows, self.calls = rows, {}
+
+    def find(self, query, projection):
+        self.calls.update(query=query, projection=projection)
+        return FakeCursor(self.rows, self.calls)
+
+@pytest.fixture
+def directory(app_module, monkeypatch):
+    rows = [
+        {"_id": ObjectId(), "username": f"lawyer{n}", "email": f"l{n}@example.com", "avg_rating": 4.26, "review_count": 3}
+        for n in range(5)
+    ]
+    users = FakeUsers(rows)
+    monkeypatch.setattr(database, "users_collection", users)
+    return TestClient(app_module.app), users
+
+def test_lawyers_are_one_indexed_find_with_offset_pages(directory):
+    client, users = directory
+    page = client.get("/lawyers", params={"city": " New  Delhi", "specialization": "Criminal", "sort": "fee_asc", "limit": 2}).json()
+
+    assert users.calls["query"] == {"role": "lawyer", "is_verified": True, "city_key": "new delhi", "specialization": "Criminal"}
+    assert users.calls["sort"] == [("consultation_fee", 1), ("_id", 1)]
+    # One extra row tells whether there is a next page
+    assert users.calls["limit"] == 3
+    assert not {"password", "lawyer_id_proof", "lawyer_proof_file"} & users.calls["projection"].keys()
+    assert [l["username"] for l in page["lawyers"]] == ["lawyer0", "lawyer1"]
+    assert page["lawyers"][0]["avg_rating"] == 4.3
+    assert page["has_more"] is True and page["next_offset"] == 2
+
+    last = client.get("/lawyers", params={"offset": 4, "limit": 2}).json()
+    assert [l["username"] for l in last["lawyers"]] == ["lawyer4"]
+    assert last["has_more"] is False and last["next_offset"] is None
+    assert users.calls["sort"] == [("avg_rating", -1), ("_id", 1)]
+
+def test_lawyer_page_size_is_capped(app_module, directory):
+    client, users = directory
+    assert client.get("/lawyers", params={"limit": 10000}).json()["limit"] == app_module.LAWYERS_MAX_PAGE_SIZE
+    assert users.calls["limit"] == app_module.LAWYERS_MAX_PAGE_SIZE + 1
@@ -0,0 +1,55 @@
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+import database
+from services.lawyer_stats import LawyerStatsService
+
+class FakeUsers:
+    def __init__(self, lawyer_id):
+        self.lawyer_id = lawyer_id
+
+    def find_one(self, query, projection=None):
+        return {"_id": self.lawyer_id} if query == {"_id": self.lawyer_id, "role": "lawyer"} else None
+
+class FakeReviews:
+    def __init__(self, fail=False):
+        self.fail, self.docs = fail, []
+
+    def insert_one(self, doc):
+        if self.fail:
+            raise RuntimeError("write concern error")
+        self.docs.append(doc)
+
+@pytest.fixture
+def review_client(app_module, monkeypatch):
+    lawyer_id = ObjectId()
+    recorded = []
+    monkeypatch.setattr(database, "users_collection", FakeUsers(lawyer_id))
+    monkeypatch.setattr(LawyerStatsService, "record_review", staticmethod(lambda lid, rating: recorded.append((lid, rating)) or True))
+    app_module.app.dependency_overrides[app_module.get_current_user] = lambda: {"user_id": "client1"}
+
+    def post(reviews, target=str(lawyer_id), rating=4):
+        monkeypatch.setattr(database, "reviews_collection", reviews)
+        client = TestClient(app_module.app, raise_server_exceptions=False)
+        return client.post(f"/lawyer/{target}/review", data={"rating": rating, "comment": "Helpful"})
+    return post, recorded, str(lawyer_id)
+
+def test_review_is_counted_only_after_it_is_stored(review_client):
+    post, recorded, lawyer_id = review_client
+    reviews = FakeReviews()
+    assert post(reviews).status_code == 200
+    assert [r["rating"] for r in reviews.docs] == [4]
+    assert recorded == [(lawyer_id, 4)]
+
+def test_failed_review_insert_leaves_the_aggregates_alone(review_client):
+    post, recorded, _ = review_client
+    assert post(FakeReviews(fail=True)).status_code == 500
+    assert recorded == []
+
+def test_review_for_an_unknown_lawyer_is_404(review_client):
+    post, recorded, _ = review_client
+    reviews = FakeReviews()
+    assert post(reviews, target=str(ObjectId())).status_code == 404
+    assert post(reviews, target="not-an-id").status_code == 404
+    assert reviews.docs == [] and recorded == []
@@ -0,0 +1,17 @@
+from services.lexical_index import BM25Index
+
+def test_bm25_index_ranks_and_updates_incrementally():
+    index = BM25Index()
+    index.add("a", "Right to life and personal liberty under Article 21")
+    index.add("b", "Money Bills and the Consolidated Fund")
+    index.add("c", "Freedom of speech and expression")
+
+    results = index.search("what protects my personal liberty?", k=2)
+    assert results[0]["id"] == "a"
+
+    index.add("a", "Election Commission superintends elections")
+    assert all(r["id"] != "a" for r in index.search("personal liberty"))
+
+    index.remove("b")
+    assert index.search("money bill") == []
+    assert len(index) == 2
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from services.pagination import decode_cursor, encode_cursor
+
+def test_pagination_cursor_round_trip():
+    doc = {"_id": ObjectId(), "timestamp": datetime(2024, 5, 1, 12, 30, 15, 123000)}
+    value, doc_id = decode_cursor(encode_cursor(doc, "timestamp"))
+    assert value == doc["timestamp"]
+    assert doc_id == doc["_id"]
+
+    value, doc_id = decode_cursor(encode_cursor(doc, "_id"))
+    assert value is None and doc_id == doc["_id"]
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
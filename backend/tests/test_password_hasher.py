@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services import password_hasher
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+def test_password_hasher_verify_rehash_and_shedding(monkeypatch):
+    monkeypatch.setattr(password_hasher, "BCRYPT_ROUNDS", 4)
+    hashed = PasswordHasher.hash("s3cret-pass")
+    assert PasswordHasher.verify("s3cret-pass", hashed)
+    assert not PasswordHasher.verify("wrong", hashed)
+    assert not PasswordHasher.needs_rehash(hashed)
+
+    monkeypatch.setattr(password_hasher, "BCRYPT_ROUNDS", 5)
+    assert PasswordHasher.needs_rehash(hashed)
+
+    monkeypatch.setattr(password_hasher, "PASSWORD_HASH_MAX_PENDING", 0)
+    with pytest.raises(PasswordHasherBusy):
+        PasswordHasher.verify("s3cret-pass", hashed)
+
+def test_stats_count_admitted_work_only(monkeypatch):
+    monkeypatch.setattr(password_hasher, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(PasswordHasher, "_stats", {"hashed": 0, "verified": 0, "rehashed": 0, "shed": 0})
+    hashed = PasswordHasher.hash("s3cret-pass")
+
+    # Counters are updated from many request threads at once
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: PasswordHasher.verify("s3cret-pass", hashed), range(16)))
+
+    monkeypatch.setattr(password_hasher, "PASSWORD_HASH_MAX_PENDING", 0)
+    with pytest.raises(PasswordHasherBusy):
+        PasswordHasher.hash("another-pass")
+
+    stats = PasswordHasher.stats()
+    assert (stats["hashed"], stats["verified"], stats["shed"]) == (1, 16, 1)
@@ -0,0 +1,40 @@
+import threading
+
+from services.rate_limiter import MemoryBackend, RateLimiter
+
+def test_rate_limiter_sliding_window_and_eviction(monkeypatch):
+    backend = MemoryBackend()
+    monkeypatch.setattr(RateLimiter, "_backend", backend)
+    limiter = RateLimiter("test", 3, 60)
+
+    assert all(limiter.hit("a", now=600 + i)[0] for i in range(3))
+    allowed, retry_after = limiter.hit("a", now=610)
+    assert not allowed and retry_after == 50
+    # Halfway into the next window the previous window still weighs 1.5 requests
+    assert limiter.hit("a", now=690)[0]
+    assert not limiter.hit("a", now=691)[0]
+
+    limiter.hit("b", now=700)
+    # Two windows later "a" and "b" no longer matter and are dropped on the next hit
+    limiter.hit("c", now=900)
+    assert backend.size() == 1
+
+def test_rate_limiter_stats_are_exact_under_concurrent_hits(monkeypatch):
+    monkeypatch.setattr(RateLimiter, "_backend", MemoryBackend())
+    monkeypatch.setattr(RateLimiter, "_stats", {"allowed": 0, "rejected": 0, "errors": 0})
+    limiter = RateLimiter("concurrent", 100, 60)
+
+    def burst(n):
+        for i in range(500):
+            limiter.hit(f"client{i % 4}", now=600)
+
+    threads = [threading.Thread(target=burst, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = RateLimiter.stats()
+    # Every one of the 4000 hits is counted exactly once, and most were over the limit
+    assert stats["allowed"] + stats["rejected"] == 4000
+    assert stats["rejected"] > stats["allowed"]
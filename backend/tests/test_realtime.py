@@ -0,0 +1,54 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+from services import realtime
+from services.realtime import InProcessBroker, RealtimeService
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(realtime, "REALTIME_BROKER", "memory")
+    monkeypatch.setattr(RealtimeService, "_connections", {})
+    monkeypatch.setattr(RealtimeService, "_stats", {"published": 0, "delivered": 0, "dropped": 0})
+    monkeypatch.setattr(RealtimeService, "_broker", None)
+    monkeypatch.setattr(RealtimeService, "_loop", None)
+    return RealtimeService
+
+def test_publish_reaches_every_connection_of_the_user_from_any_thread(service):
+    async def scenario():
+        await service.start()
+        tab_a, tab_b = service.connect("u1"), service.connect("u1")
+        other = service.connect("u2")
+
+        # Sync routes publish from the threadpool
+        worker = threading.Thread(target=service.publish, args=("u1", "message", {"text": "hi"}))
+        worker.start()
+        worker.join()
+        frames = [json.loads(await asyncio.wait_for(q.get(), 1)) for q in (tab_a, tab_b)]
+
+        service.disconnect("u1", tab_a)
+        service.publish("u1", "read", {"reader_id": "u2"})
+        return frames, tab_a.qsize(), json.loads(tab_b.get_nowait()), other.qsize()
+
+    frames, closed_backlog, read, other_backlog = asyncio.run(scenario())
+    assert frames == [{"type": "message", "data": {"text": "hi"}}] * 2
+    assert read == {"type": "read", "data": {"reader_id": "u2"}}
+    assert closed_backlog == 0 and other_backlog == 0
+    stats = service.stats()
+    assert stats["broker"] == InProcessBroker.__name__
+    assert stats["delivered"] == 3 and stats["connected_users"] == 2
+
+def test_a_stalled_client_drops_events_instead_of_buffering_forever(service, monkeypatch):
+    monkeypatch.setattr(realtime, "CONNECTION_QUEUE_SIZE", 2)
+
+    async def scenario():
+        await service.start()
+        queue = service.connect("u1")
+        for n in range(5):
+            service.publish("u1", "notification", {"n": n})
+        return queue.qsize()
+
+    assert asyncio.run(scenario()) == 2
+    assert service.stats()["dropped"] == 3
@@ -0,0 +1,37 @@
+from services.constitution_index import ConstitutionIndex
+from services.rag_service import RAGService
+from services.retrieval_fusion import _proximity, reciprocal_rank_fusion, rerank
+
+def test_fusion_counts_a_chunk_found_by_both_searches_once():
+    vector = [{"id": "v1", "text": "Right to  equality"}, {"id": "v2", "text": "Freedom of speech"}]
+    lexical = [{"id": "l1", "text": "Freedom of religion"}, {"id": "l2", "text": "Right to equality"}]
+    fused = reciprocal_rank_fusion([vector, lexical], k=60)
+
+    assert len(fused) == 3
+    assert fused[0]["id"] == "v1"
+    assert fused[0]["fusion_score"] == 1 / 61 + 1 / 62
+
+def test_rerank_lifts_the_article_heading_over_a_passing_mention():
+    candidates = [
+        {"id": "a", "text": "Article 21 is often cited alongside other rights.", "fusion_score": 0.025},
+        {"id": "b", "text": "21. Protection of life and personal liberty", "fusion_score": 0.024},
+        {"id": "c", "text": "Schedule on elections", "fusion_score": 0.01},
+    ]
+    assert [doc["id"] for doc in rerank("article 21 personal liberty", candidates)] == ["b", "a", "c"]
+    assert _proximity({"personal", "liberty"}, ["personal", "liberty", "x"]) == 1.0
+    assert _proximity({"personal", "liberty"}, ["personal", "x", "x", "liberty"]) == 0.5
+
+def test_hybrid_retrieve_fuses_both_searches_and_drops_the_weak_tail(monkeypatch):
+    monkeypatch.setenv("RETRIEVAL_MODE", "hybrid")
+    monkeypatch.setattr(ConstitutionIndex, "resolve", classmethod(lambda cls, query: None))
+    monkeypatch.setattr(RAGService, "get_collection", classmethod(lambda cls: object()))
+    monkeypatch.setattr(RAGService, "_vector_search", classmethod(lambda cls, query, k: [
+        {"id": "v1", "text": "Police may arrest without warrant in cognizable offences"},
+        {"id": "v2", "text": "Budget allocation for railways"},
+    ]))
+    monkeypatch.setattr(RAGService, "_lexical_search", classmethod(lambda cls, query, k: [
+        {"id": "l1", "text": "Police may arrest without warrant in cognizable offences"},
+    ]))
+    assert RAGService.retrieve("can police arrest without warrant", n_results=3) == [
+        {"id": "v1", "text": "Police may arrest without warrant in cognizable offences"}
+    ]
@@ -1,7 +1,8 @@
 import pytest
+from bson import ObjectId
+
 from services.auth_service import AuthService
 from services.rag_service import RAGService
-from bson import ObjectId
 
 def test_auth_service_token_creation():
     user_data = {
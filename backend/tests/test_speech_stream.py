@@ -0,0 +1,50 @@
+import math
+import struct
+import asyncio
+
+import pytest
+
+from services.speech_stream import SilenceSegmenter, StreamTooLargeError, TranscriptionSession, WavStreamParser, limit_stream
+
+def test_silence_segmenter_splits_on_pauses_and_drops_clicks():
+    rate = 16000
+    tone = lambda sec: b"".join(struct.pack("<h", int(8000 * math.sin(i / 5))) for i in range(int(rate * sec)))
+    silence = lambda sec: b"\0\0" * int(rate * sec)
+    pcm = tone(1) + silence(1) + tone(0.1) + silence(1) + tone(0.5)
+
+    segmenter = SilenceSegmenter(rate)
+    segments = []
+    for i in range(0, len(pcm), 3000):
+        segments += segmenter.feed(pcm[i:i + 3000])
+    segments += segmenter.finish()
+    assert len(segments) == 2
+    assert segments[0]["start_ms"] == 0 and 1000 <= segments[0]["end_ms"] <= 2000
+    assert segments[1]["start_ms"] >= 2900
+
+    header = b"RIFF\0\0\0\0WAVEfmt " + struct.pack("<IHHIIHH", 16, 1, 1, rate, rate * 2, 2, 16) + b"data\0\0\0\0"
+    parser = WavStreamParser()
+    assert parser.feed(header[:20]) == b""
+    assert parser.feed(header[20:] + b"\1\2") == b"\1\2"
+    assert parser.sample_rate == rate and parser.channels == 1
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+async def source(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+def test_limit_stream_rejects_streams_over_the_cap():
+    assert asyncio.run(collect(limit_stream(source(b"ab", b"cd"), max_bytes=4))) == [b"ab", b"cd"]
+    with pytest.raises(StreamTooLargeError):
+        asyncio.run(collect(limit_stream(source(b"ab", b"cd", b"e"), max_bytes=4)))
+
+def test_cancelled_session_stops_waiting_for_audio():
+    async def abandoned_upload():
+        session = TranscriptionSession(sample_rate=16000)
+        assert await session.feed(b"\0\0" * 1600)
+        # The client disconnects without ever ending the stream
+        session.cancel()
+        return await asyncio.wait_for(collect(session), timeout=5)
+
+    assert asyncio.run(abandoned_upload()) == []
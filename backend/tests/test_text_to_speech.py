@@ -0,0 +1,35 @@
+import os
+import time
+
+from services import text_to_speech
+from services.text_to_speech import TTSCache
+
+def test_tts_cache_is_content_addressed_and_size_capped(monkeypatch, tmp_path):
+    synthesized = []
+
+    class FakeTTS:
+        def __init__(self, text, lang):
+            synthesized.append(text)
+            self.text = text
+
+        def stream(self):
+            for sentence in self.text.split(". "):
+                yield sentence.encode("utf-8")
+
+    monkeypatch.setattr(text_to_speech, "gTTS", FakeTTS)
+    monkeypatch.setattr(text_to_speech, "TTS_CACHE_DIR", str(tmp_path))
+
+    first = TTSCache.speak("Article 21. Right to life", "en")
+    path = tmp_path / first
+    for _ in range(50):
+        if path.exists():
+            break
+        time.sleep(0.01)
+    assert path.read_bytes() == b"Article 21Right to life"
+    assert TTSCache.speak("Article 21. Right to life", "en") == first
+    assert len(synthesized) == 1
+    assert TTSCache.speak("Article 21. Right to life", "hi") != first
+
+    os.utime(path, (1, 1))
+    TTSCache.enforce_size_cap(max_bytes=0)
+    assert not path.exists()
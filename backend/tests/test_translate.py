@@ -0,0 +1,24 @@
+from collections import OrderedDict
+
+from services.translate import TranslationService, TranslationStore, split_segments
+
+def test_translation_keeps_html_and_only_translates_new_segments(monkeypatch, tmp_path):
+    calls = []
+
+    class FakeTranslator:
+        def translate(self, text, dest):
+            calls.append(text)
+            return type("Result", (), {"text": text.upper()})()
+
+    monkeypatch.setattr(TranslationService, "_translator", classmethod(lambda cls: FakeTranslator()))
+    monkeypatch.setattr(TranslationService, "_store", TranslationStore(str(tmp_path / "translations.sqlite3")))
+    monkeypatch.setattr(TranslationService, "_memory", OrderedDict())
+
+    html = "<div style='x'><strong>Disclaimer:</strong> <em>Not legal advice.</em></div>"
+    assert "".join(piece for _, piece in split_segments(html)) == html
+    assert TranslationService.translate(html, "hi") == "<div style='x'><strong>DISCLAIMER:</strong> <em>NOT LEGAL ADVICE.</em></div>"
+    assert calls == ["Disclaimer:\nNot legal advice."]
+
+    reply = "Article 21 protects life.\n" + html
+    assert TranslationService.translate(reply, "hi").startswith("ARTICLE 21 PROTECTS LIFE.\n<div")
+    assert calls[-1] == "Article 21 protects life."
@@ -0,0 +1,14 @@
+from services.user_cache import UserCache
+
+def test_user_cache_serves_hits_until_invalidated(monkeypatch):
+    loads = []
+    monkeypatch.setattr(UserCache, "_load", staticmethod(lambda uid: loads.append(uid) or {"city": f"City{len(loads)}"}))
+    UserCache.clear()
+
+    assert UserCache.get_profile("u1") == {"city": "City1"}
+    assert UserCache.get_profile("u1") == {"city": "City1"}
+    assert loads == ["u1"]
+
+    UserCache.invalidate("u1")
+    assert UserCache.get_profile("u1") == {"city": "City2"}
+    UserCache.clear()
@@ -0,0 +1,54 @@
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+import database
+from services import user_loader
+from services.user_loader import UserLoader
+
+class FakeUsers:
+    def __init__(self, users):
+        self.users = {user["_id"]: user for user in users}
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append((query, projection))
+        return [self.users[_id] for _id in query["_id"]["$in"] if _id in self.users]
+
+def test_load_many_is_one_in_query_and_caches_per_loader(monkeypatch):
+    known = [{"_id": ObjectId(), "username": f"user{n}", "email": f"u{n}@example.com", "role": "user"} for n in range(3)]
+    users = FakeUsers(known)
+    monkeypatch.setattr(user_loader, "users_collection", users)
+    ids = [str(u["_id"]) for u in known]
+
+    loader = UserLoader(fields=("username",))
+    found = loader.load_many(ids + ids + [str(ObjectId()), "not-an-id", None])
+    assert {uid: u["username"] for uid, u in found.items()} == {ids[n]: f"user{n}" for n in range(3)}
+    assert len(users.queries) == 1
+    assert len(users.queries[0][0]["_id"]["$in"]) == 4
+    assert users.queries[0][1] == {"username": 1}
+
+    assert loader.load_many(ids[:2]).keys() == set(ids[:2])
+    assert len(users.queries) == 1
+
+def test_appointment_list_resolves_all_lawyers_in_one_query(app_module, monkeypatch):
+    lawyers = [{"_id": ObjectId(), "username": f"lawyer{n}", "role": "lawyer"} for n in range(3)]
+    users = FakeUsers(lawyers)
+    missing_lawyer = str(ObjectId())
+    appointments = [
+        {"_id": ObjectId(), "user_id": "client1", "lawyer_id": str(lawyers[n % 3]["_id"]) if n < 19 else missing_lawyer,
+         "date": f"2026-01-{n + 1:02d}", "time_slot": "10:00", "status": "pending"}
+        for n in range(20)
+    ]
+
+    class FakeAppointments:
+        def find(self, query):
+            return type("Cursor", (), {"sort": lambda self, *args: iter(appointments)})()
+
+    monkeypatch.setattr(user_loader, "users_collection", users)
+    monkeypatch.setattr(database, "appointments_collection", FakeAppointments())
+    app_module.app.dependency_overrides[app_module.get_current_user] = lambda: {"user_id": "client1"}
+
+    result = TestClient(app_module.app).get("/appointments/user").json()["appointments"]
+    assert len(users.queries) == 1
+    assert [a["lawyer_name"] for a in result[:4]] == ["lawyer0", "lawyer1", "lawyer2", "lawyer0"]
+    assert result[-1]["lawyer_name"] == "Unknown"
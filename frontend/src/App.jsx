@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useCallback } from "react";
 import { BrowserRouter, Routes, Route, Navigate, Link, useNavigate } from "react-router-dom";
 import LoginPage from "./pages/LoginPage";
 import RegisterPage from "./pages/RegisterPage";
@@ -19,6 +19,7 @@ import LawyerAppointmentsPage from "./pages/LawyerAppointmentsPage";
 import TopicDetailsPage from "./pages/TopicDetailsPage";
 import TopicManagementPage from "./pages/TopicManagementPage";
 import ApiService from "./services/api";
+import useRealtime from "./hooks/useRealtime";
 import "./App.css";
 import "bootstrap-icons/font/bootstrap-icons.css";
 
@@ -61,13 +62,26 @@ export default function App() {
     }
   };
 
+  const { connected: realtimeConnected } = useRealtime(useCallback((event) => {
+    if (event.type === "notification") {
+      setNotifications(prev => [event.data, ...prev]);
+      setUnreadCount(prev => prev + 1);
+    }
+  }, []), !!user);
+
   useEffect(() => {
     if (user) {
       fetchNotifications();
+    }
+  }, [user]);
+
+  useEffect(() => {
+    // Notifications are pushed over the realtime socket; poll only while it is down
+    if (user && !realtimeConnected) {
       const intervalId = setInterval(fetchNotifications, 30000);
       return () => clearInterval(intervalId);
     }
-  }, [user]);
+  }, [user, realtimeConnected]);
 
   const handleNotificationClick = async (notif) => {
     if (!notif.is_read) {
@@ -0,0 +1,102 @@
+import { useState, useEffect, useRef } from 'react';
+import ApiService from '../services/api';
+
+const MAX_RECONNECT_DELAY = 30000;
+
+// One /ws connection per tab, shared by every component using the hook. It is
+// opened by the first subscriber and closed when the last one unmounts.
+const channel = {
+    socket: null,
+    connected: false,
+    subscribers: new Set(),
+    retryTimer: null,
+    pingTimer: null,
+    attempts: 0,
+};
+
+const setConnected = (connected) => {
+    channel.connected = connected;
+    channel.subscribers.forEach(sub => sub.onStatus(connected));
+};
+
+const connect = () => {
+    channel.retryTimer = null;
+    const url = ApiService.getRealtimeUrl();
+    if (!url) return;
+    const socket = new WebSocket(url);
+    channel.socket = socket;
+
+    socket.onopen = () => {
+        channel.attempts = 0;
+        setConnected(true);
+        channel.pingTimer = setInterval(() => socket.readyState === WebSocket.OPEN && socket.send('ping'), 25000);
+    };
+    socket.onmessage = (e) => {
+        try {
+            const event = JSON.parse(e.data);
+            if (event.type !== 'pong') channel.subscribers.forEach(sub => sub.handlerRef.current?.(event));
+        } catch (err) {
+            console.error('Bad realtime frame', err);
+        }
+    };
+    socket.onclose = () => {
+        clearInterval(channel.pingTimer);
+        // A socket replaced or torn down by disconnect() must not reconnect
+        if (channel.socket !== socket) return;
+        channel.socket = null;
+        setConnected(false);
+        if (!channel.subscribers.size) return;
+        // Exponential backoff; the token may have been refreshed in the meantime
+        const delay = Math.min(1000 * 2 ** channel.attempts, MAX_RECONNECT_DELAY);
+        channel.attempts += 1;
+        channel.retryTimer = setTimeout(connect, delay);
+    };
+};
+
+const disconnect = () => {
+    const socket = channel.socket;
+    channel.socket = null;
+    channel.attempts = 0;
+    clearTimeout(channel.retryTimer);
+    channel.retryTimer = null;
+    clearInterval(channel.pingTimer);
+    channel.connected = false;
+    socket?.close();
+};
+
+const subscribe = (subscriber) => {
+    channel.subscribers.add(subscriber);
+    // Also retries a tab that had no token when the first subscriber mounted
+    if (!channel.socket && !channel.retryTimer) connect();
+    return () => {
+        channel.subscribers.delete(subscriber);
+        if (!channel.subscribers.size) disconnect();
+    };
+};
+
+// Subscribes to the backend /ws push channel. `onEvent` receives {type, data}
+// for "message", "read" and "notification" events. `connected` lets callers
+// fall back to polling while the socket is down.
+const useRealtime = (onEvent, enabled = true) => {
+    const [connected, setConnectedState] = useState(channel.connected);
+    const handlerRef = useRef(onEvent);
+
+    useEffect(() => {
+        handlerRef.current = onEvent;
+    }, [onEvent]);
+
+    useEffect(() => {
+        if (!enabled || typeof WebSocket === 'undefined') return;
+
+        setConnectedState(channel.connected);
+        const unsubscribe = subscribe({ handlerRef, onStatus: setConnectedState });
+        return () => {
+            unsubscribe();
+            setConnectedState(false);
+        };
+    }, [enabled]);
+
+    return { connected };
+};
+
+export default useRealtime;
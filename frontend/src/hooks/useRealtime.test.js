@@ -0,0 +1,73 @@
+import { afterEach, beforeEach, expect, test, vi } from 'vitest';
+import { act, renderHook } from '@testing-library/react';
+import useRealtime from './useRealtime';
+
+vi.mock('../services/api', () => ({
+    default: { getRealtimeUrl: () => 'ws://localhost/ws?token=t' },
+}));
+
+class FakeWebSocket {
+    static OPEN = 1;
+    static CLOSED = 3;
+    static instances = [];
+
+    constructor(url) {
+        this.url = url;
+        this.readyState = 0;
+        FakeWebSocket.instances.push(this);
+    }
+
+    send() {}
+
+    close() {
+        this.readyState = FakeWebSocket.CLOSED;
+        this.onclose?.();
+    }
+
+    open() {
+        this.readyState = FakeWebSocket.OPEN;
+        this.onopen?.();
+    }
+
+    receive(event) {
+        this.onmessage?.({ data: JSON.stringify(event) });
+    }
+}
+
+beforeEach(() => {
+    FakeWebSocket.instances = [];
+    vi.stubGlobal('WebSocket', FakeWebSocket);
+});
+
+afterEach(() => {
+    vi.unstubAllGlobals();
+});
+
+test('components share one socket that closes after the last one unmounts', () => {
+    const onBell = vi.fn();
+    const onInbox = vi.fn();
+    const bell = renderHook(() => useRealtime(onBell));
+    const inbox = renderHook(() => useRealtime(onInbox));
+    expect(FakeWebSocket.instances).toHaveLength(1);
+
+    const socket = FakeWebSocket.instances[0];
+    act(() => socket.open());
+    expect(bell.result.current.connected).toBe(true);
+    expect(inbox.result.current.connected).toBe(true);
+
+    const event = { type: 'message', data: { id: 'm1' } };
+    act(() => socket.receive(event));
+    expect(onBell).toHaveBeenCalledWith(event);
+    expect(onInbox).toHaveBeenCalledWith(event);
+
+    bell.unmount();
+    expect(socket.readyState).toBe(FakeWebSocket.OPEN);
+    inbox.unmount();
+    expect(socket.readyState).toBe(FakeWebSocket.CLOSED);
+    expect(FakeWebSocket.instances).toHaveLength(1);
+});
+
+test('a disabled hook does not connect', () => {
+    renderHook(() => useRealtime(() => {}, false));
+    expect(FakeWebSocket.instances).toHaveLength(0);
+});
@@ -11,31 +11,49 @@ export default function AdminPage() {
     const [queries, setQueries] = useState([])
     const [queriesLoading, setQueriesLoading] = useState(false)
     const [queriesError, setQueriesError] = useState('')
+    // Cursors for the next page of each list; null once everything is loaded
+    const [lawyersCursor, setLawyersCursor] = useState(null)
+    const [queriesCursor, setQueriesCursor] = useState(null)
+    const [loadingMore, setLoadingMore] = useState(false)
 
-    const fetchAllLawyers = async () => {
-        setLoading(true)
+    const fetchAllLawyers = async (before = null) => {
+        if (before) setLoadingMore(true)
+        else setLoading(true)
         try {
-            const data = await ApiService.adminGetLawyers()
-            setLawyers(data.lawyers)
+            const data = await ApiService.adminGetLawyers(before)
+            setLawyers(prev => before ? [...prev, ...data.lawyers] : data.lawyers)
+            setLawyersCursor(data.has_more ? data.next_before : null)
         } catch (err) {
             setError('Failed to load lawyers for verification')
         } finally {
             setLoading(false)
+            setLoadingMore(false)
         }
     }
 
-    const fetchAllQueries = async () => {
-        setQueriesLoading(true)
+    const fetchAllQueries = async (before = null) => {
+        if (before) setLoadingMore(true)
+        else setQueriesLoading(true)
         try {
-            const data = await ApiService.adminGetQueries()
-            setQueries(data.queries)
+            const data = await ApiService.adminGetQueries(before)
+            setQueries(prev => before ? [...prev, ...data.queries] : data.queries)
+            setQueriesCursor(data.has_more ? data.next_before : null)
         } catch (err) {
             setQueriesError('Failed to load user queries')
         } finally {
             setQueriesLoading(false)
+            setLoadingMore(false)
         }
     }
 
+    const renderLoadMore = (cursor, onLoad) => cursor && (
+        <div className="text-center mt-3">
+            <button className="btn btn-outline-primary" onClick={() => onLoad(cursor)} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+        </div>
+    )
+
     useEffect(() => {
         if (activeTab === 'lawyers') {
             fetchAllLawyers()
@@ -193,6 +211,7 @@ export default function AdminPage() {
                             </tbody>
                         </table>
                     </div>
+                    {renderLoadMore(lawyersCursor, fetchAllLawyers)}
                 </div>
             </div>
             )}
@@ -260,6 +279,7 @@ export default function AdminPage() {
                                 </div>
                             )}
                         </div>
+                        {renderLoadMore(queriesCursor, fetchAllQueries)}
                     </div>
                 </div>
             )}
@@ -16,11 +16,18 @@ export default function ConnectLawyerPage() {
     const [selectedLawyer, setSelectedLawyer] = useState(null)
     const [bookingData, setBookingData] = useState({ date: '', timeSlot: '10:00 AM', notes: '' })
 
+    // Filters of the current result list, so "Load more" pages through the same search
+    const [appliedFilters, setAppliedFilters] = useState(['', 0, '', '', ''])
+    const [nextOffset, setNextOffset] = useState(null)
+    const [loadingMore, setLoadingMore] = useState(false)
+
     const fetchLawyers = async (city = '', minRating = 0, specialization = '', sort = '', name = '') => {
         setLoading(true)
         try {
             const data = await ApiService.getLawyers(city, minRating, specialization, sort, name)
             setLawyers(data.lawyers)
+            setNextOffset(data.next_offset)
+            setAppliedFilters([city, minRating, specialization, sort, name])
         } catch (err) {
             setError('Failed to load lawyers')
         } finally {
@@ -28,6 +35,19 @@ export default function ConnectLawyerPage() {
         }
     }
 
+    const loadMoreLawyers = async () => {
+        setLoadingMore(true)
+        try {
+            const data = await ApiService.getLawyers(...appliedFilters, nextOffset)
+            setLawyers(prev => [...prev, ...data.lawyers])
+            setNextOffset(data.next_offset)
+        } catch (err) {
+            setError('Failed to load lawyers')
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
     const handleBooking = async (e) => {
         e.preventDefault()
         try {
@@ -217,6 +237,13 @@ export default function ConnectLawyerPage() {
                             </div>
                         </div>
                     )}
+                    {nextOffset !== null && nextOffset !== undefined && (
+                        <div className="col-12 text-center">
+                            <button className="btn btn-outline-primary" onClick={loadMoreLawyers} disabled={loadingMore}>
+                                {loadingMore ? 'Loading...' : 'Load more lawyers'}
+                            </button>
+                        </div>
+                    )}
                 </div>
             )}
 
@@ -6,19 +6,24 @@ export default function HistoryPage(){
   const [history, setHistory] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     loadHistory()
   }, [])
 
-  const loadHistory = async () => {
+  const loadHistory = async (before = null) => {
+    if (before) setLoadingMore(true)
     try {
-      const response = await ApiService.getHistory()
-      setHistory(response.history || [])
+      const response = await ApiService.getHistory(before)
+      setHistory(prev => before ? [...prev, ...(response.history || [])] : (response.history || []))
+      setNextCursor(response.has_more ? response.next_before : null)
     } catch (err) {
       setError(err.message || 'Failed to load history')
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -97,6 +102,15 @@ export default function HistoryPage(){
                   </div>
                 </div>
               ))}
+              {nextCursor && (
+                <button
+                  className="list-group-item list-group-item-action text-center text-primary"
+                  onClick={() => loadHistory(nextCursor)}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Loading...' : 'Load older chats'}
+                </button>
+              )}
             </div>
           )}
         </div>
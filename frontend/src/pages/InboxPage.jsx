@@ -1,26 +1,33 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useCallback } from 'react'
 import { Link } from 'react-router-dom'
 import ApiService from '../services/api'
+import useRealtime from '../hooks/useRealtime'
 
 export default function InboxPage() {
     const [conversations, setConversations] = useState([])
     const [loading, setLoading] = useState(true)
     const [error, setError] = useState('')
 
-    useEffect(() => {
-        const fetchInbox = async () => {
-            try {
-                const data = await ApiService.getChatInbox()
-                setConversations(data.conversations)
-            } catch (err) {
-                setError('Failed to load inbox')
-            } finally {
-                setLoading(false)
-            }
+    const fetchInbox = async () => {
+        try {
+            const data = await ApiService.getChatInbox()
+            setConversations(data.conversations)
+        } catch (err) {
+            setError('Failed to load inbox')
+        } finally {
+            setLoading(false)
         }
+    }
+
+    useEffect(() => {
         fetchInbox()
     }, [])
 
+    // Refresh previews and unread counts when a message arrives
+    useRealtime(useCallback((event) => {
+        if (event.type === 'message' || event.type === 'read') fetchInbox()
+    }, []))
+
     if (loading) return <div className="p-5 text-center"><div className="spinner-border"></div></div>
 
     return (
@@ -1,11 +1,17 @@
-import { useState, useEffect, useRef } from 'react'
+import { useState, useEffect, useRef, useCallback, useMemo } from 'react'
 import { useParams, Link } from 'react-router-dom'
 import ApiService from '../services/api'
 import useSpeechToText from '../hooks/useSpeechToText'
+import useRealtime from '../hooks/useRealtime'
 
 export default function MessagingPage() {
     const { otherId } = useParams()
-    const [messages, setMessages] = useState([])
+    // latest: the newest page, refetched on every update; older: pages loaded with "Load older messages"
+    const [latest, setLatest] = useState([])
+    const [older, setOlder] = useState([])
+    const [olderCursor, setOlderCursor] = useState(null)
+    const [loadingOlder, setLoadingOlder] = useState(false)
+    const olderLoadedRef = useRef(false)
     const [newMessage, setNewMessage] = useState('')
     const [selectedFile, setSelectedFile] = useState(null)
     const [loading, setLoading] = useState(true)
@@ -25,10 +31,17 @@ export default function MessagingPage() {
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" })
     }
 
+    const messages = useMemo(() => {
+        const latestIds = new Set(latest.map(m => m.id))
+        return [...older.filter(m => !latestIds.has(m.id)), ...latest]
+    }, [older, latest])
+
     const fetchMessages = async () => {
         try {
             const data = await ApiService.getMessages(otherId)
-            setMessages(data.messages)
+            setLatest(data.messages)
+            // Once older pages are loaded, their own cursor keeps paging further back
+            if (!olderLoadedRef.current) setOlderCursor(data.has_more ? data.next_before : null)
         } catch (err) {
             setError('Failed to load messages')
         } finally {
@@ -36,16 +49,50 @@ export default function MessagingPage() {
         }
     }
 
+    const loadOlderMessages = async () => {
+        setLoadingOlder(true)
+        try {
+            const data = await ApiService.getMessages(otherId, olderCursor)
+            olderLoadedRef.current = true
+            setOlder(prev => [...data.messages, ...prev])
+            setOlderCursor(data.has_more ? data.next_before : null)
+        } catch (err) {
+            setError('Failed to load messages')
+        } finally {
+            setLoadingOlder(false)
+        }
+    }
+
+    const { connected } = useRealtime(useCallback((event) => {
+        if (event.type === 'message' && (event.data.sender_id === otherId || event.data.receiver_id === otherId)) {
+            // Refetch rather than append: it also marks the new message read on the server
+            fetchMessages()
+        } else if (event.type === 'read' && event.data.reader_id === otherId) {
+            const markRead = m => m.receiver_id === otherId ? { ...m, is_read: true } : m
+            setLatest(prev => prev.map(markRead))
+            setOlder(prev => prev.map(markRead))
+        }
+    }, [otherId]))
+
     useEffect(() => {
+        setLatest([])
+        setOlder([])
+        setOlderCursor(null)
+        olderLoadedRef.current = false
         fetchMessages()
-        // Poll for new messages every 5 seconds
+    }, [otherId])
+
+    useEffect(() => {
+        // Fall back to polling only while the realtime socket is down
+        if (connected) return
         const interval = setInterval(fetchMessages, 5000)
         return () => clearInterval(interval)
-    }, [otherId])
+    }, [otherId, connected])
 
     useEffect(() => {
+        // Only new messages scroll; loading older ones keeps the reader's position
         scrollToBottom()
-    }, [messages])
+    }, [latest])
 
     const handleSendMessage = async (e) => {
         e.preventDefault()
@@ -100,6 +147,13 @@ export default function MessagingPage() {
                 </div>
 
                 <div className="card-body flex-grow-1 overflow-auto p-4 bg-light" style={{ display: 'flex', flexDirection: 'column' }}>
+                    {olderCursor && (
+                        <div className="text-center mb-3">
+                            <button className="btn btn-sm btn-outline-secondary rounded-pill" onClick={loadOlderMessages} disabled={loadingOlder}>
+                                {loadingOlder ? 'Loading...' : 'Load older messages'}
+                            </button>
+                        </div>
+                    )}
                     {messages.length > 0 ? messages.map((msg, index) => {
                         const isMe = msg.sender_id !== otherId;
                         return (
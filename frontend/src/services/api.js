@@ -199,8 +199,13 @@ class ApiService {
     });
   }
 
-  async getHistory() {
-    return this.request('/history');
+  // List endpoints return one page at a time; pass the previous response's next_before to get the next one
+  withCursor(endpoint, before) {
+    return before ? `${endpoint}${endpoint.includes('?') ? '&' : '?'}before=${encodeURIComponent(before)}` : endpoint;
+  }
+
+  async getHistory(before = null) {
+    return this.request(this.withCursor('/history', before));
   }
 
   async getChat(chatId) {
@@ -247,16 +252,17 @@ class ApiService {
   }
 
   // Lawyer & Admin endpoints
-  async getLawyers(city = '', minRating = 0, specialization = '', sort = '', name = '') {
+  async getLawyers(city = '', minRating = 0, specialization = '', sort = '', name = '', offset = 0) {
     let url = `/lawyers?city=${city}&min_rating=${minRating}`;
     if (specialization) url += `&specialization=${specialization}`;
     if (sort) url += `&sort=${sort}`;
     if (name) url += `&name=${name}`;
+    if (offset) url += `&offset=${offset}`;
     return this.request(url);
   }
 
-  async adminGetLawyers() {
-    return this.request('/admin/lawyers');
+  async adminGetLawyers(before = null) {
+    return this.request(this.withCursor('/admin/lawyers', before));
   }
 
   async verifyLawyer(lawyerId, isVerified) {
@@ -285,8 +291,8 @@ class ApiService {
     });
   }
 
-  async getLawyerReviews(lawyerId) {
-    return this.request(`/lawyer/${lawyerId}/reviews`);
+  async getLawyerReviews(lawyerId, before = null) {
+    return this.request(this.withCursor(`/lawyer/${lawyerId}/reviews`, before));
   }
 
   // Person-to-Person Messaging
@@ -305,8 +311,8 @@ class ApiService {
     });
   }
 
-  async getMessages(otherId) {
-    return this.request(`/messages/${otherId}`);
+  async getMessages(otherId, before = null) {
+    return this.request(this.withCursor(`/messages/${otherId}`, before));
   }
 
   async getChatInbox() {
@@ -358,8 +364,8 @@ class ApiService {
     });
   }
 
-  async adminGetQueries() {
-    return this.request('/admin/queries');
+  async adminGetQueries(before = null) {
+    return this.request(this.withCursor('/admin/queries', before));
   }
 
   async adminUpdateQueryStatus(queryId, status) {
@@ -369,6 +375,12 @@ class ApiService {
     });
   }
 
+  // Realtime push channel (messages, read receipts, notifications)
+  getRealtimeUrl() {
+    if (!this.token) return null;
+    return `${API_BASE_URL.replace(/^http/, 'ws')}/ws?token=${encodeURIComponent(this.token)}`;
+  }
+
   // Notifications
   async getNotifications() {
     return this.request('/notifications');